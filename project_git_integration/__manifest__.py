@@ -15,7 +15,7 @@ Long description of module's purpose
     # Check https://github.com/odoo/odoo/blob/15.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     'category': 'Project',
-    'version': '19.0.0.0',
+    'version': '19.0.0.3',
 
     # any module necessary for this one to work correctly
     'depends': ['project'],
@@ -23,9 +23,16 @@ Long description of module's purpose
     # always loaded
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/project_views.xml',
+        'views/git_history_views.xml',
         'views/project_task_views.xml',
-        'views/res_config_setting.xml'
+        'views/res_config_setting.xml',
+        'views/git_sync_run_views.xml',
+        'views/git_activity_stat_views.xml',
+        'views/git_repository_provision_views.xml',
+        'views/git_credential_views.xml',
+        'views/git_job_views.xml',
     ],
 }
 
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import hmac
+import json
+import logging
+
+from odoo import http
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+
+class GitWebhookController(http.Controller):
+
+    @http.route('/project_git_integration/webhook', type='http', auth='public', methods=['POST'], csrf=False)
+    def github_webhook(self, **kwargs):
+        """
+        Receives GitHub `push` and `pull_request` webhooks, signed with the shared
+        secret configured in the settings.
+        """
+        httprequest = request.httprequest
+        body = httprequest.get_data()
+
+        secret = request.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_webhook_secret')
+        if not secret or not self._verify_signature(secret, body, httprequest.headers.get('X-Hub-Signature-256')):
+            _logger.warning("Rejected GitHub webhook with an invalid signature")
+            return request.make_json_response({'error': 'Invalid signature'}, status=403)
+
+        try:
+            if httprequest.mimetype == 'application/x-www-form-urlencoded':
+                payload = json.loads(httprequest.form.get('payload') or '')
+            else:
+                payload = json.loads(body)
+        except ValueError:
+            return request.make_json_response({'error': 'Invalid payload'}, status=400)
+
+        event = httprequest.headers.get('X-GitHub-Event')
+        Task = request.env['project.task'].sudo()
+        if event == 'push':
+            synced = Task._git_webhook_push(payload)
+        elif event == 'pull_request':
+            synced = Task._git_webhook_pull_request(payload)
+        else:
+            return request.make_json_response({'status': 'ignored', 'event': event})
+        return request.make_json_response({'status': 'ok', 'event': event, 'synced': synced})
+
+    @staticmethod
+    def _verify_signature(secret, body, signature):
+        if not signature:
+            return False
+        expected = 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
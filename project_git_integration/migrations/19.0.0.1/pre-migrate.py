@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """
+    Drop duplicate commit logs before the UNIQUE(task_id, commit_hash) constraint
+    is created, keeping the oldest row of each pair.
+    """
+    if not version:
+        return
+    cr.execute("""
+        DELETE FROM git_commit_log duplicate
+              USING git_commit_log original
+              WHERE duplicate.task_id = original.task_id
+                AND duplicate.commit_hash = original.commit_hash
+                AND duplicate.id > original.id
+    """)
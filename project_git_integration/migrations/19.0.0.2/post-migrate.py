@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Move the commit data duplicated on every git.commit.log row into one
+    git.commit row per (repository, sha), link the logs to it and record the
+    branch membership of each commit.
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        INSERT INTO git_commit (repository, sha, message, author, date, url,
+                                create_uid, write_uid, create_date, write_date)
+        SELECT DISTINCT ON (repository, log.commit_hash)
+               p.git_repository_owner || '/' || p.git_repository_name AS repository,
+               log.commit_hash, log.commit_message, log.commit_author, log.commit_date, log.commit_url,
+               log.create_uid, log.write_uid, log.create_date, log.write_date
+          FROM git_commit_log log
+          JOIN project_task t ON t.id = log.task_id
+          JOIN project_project p ON p.id = t.project_id
+         WHERE log.commit_id IS NULL
+           AND p.git_repository_owner IS NOT NULL
+           AND p.git_repository_name IS NOT NULL
+         ORDER BY repository, log.commit_hash, log.id
+        ON CONFLICT (repository, sha) DO NOTHING
+    """)
+    cr.execute("""
+        UPDATE git_commit_log log
+           SET commit_id = c.id
+          FROM project_task t, project_project p, git_commit c
+         WHERE t.id = log.task_id
+           AND p.id = t.project_id
+           AND c.repository = p.git_repository_owner || '/' || p.git_repository_name
+           AND c.sha = log.commit_hash
+           AND log.commit_id IS NULL
+    """)
+    # Logs of tasks whose project lost its repository keep their history under
+    # a placeholder repository per project (or per task without a project)
+    cr.execute("""
+        INSERT INTO git_commit (repository, sha, message, author, date, url,
+                                create_uid, write_uid, create_date, write_date)
+        SELECT DISTINCT ON (repository, log.commit_hash)
+               COALESCE('unlinked/project-' || t.project_id, 'unlinked/task-' || log.task_id) AS repository,
+               log.commit_hash, log.commit_message, log.commit_author, log.commit_date, log.commit_url,
+               log.create_uid, log.write_uid, log.create_date, log.write_date
+          FROM git_commit_log log
+          JOIN project_task t ON t.id = log.task_id
+         WHERE log.commit_id IS NULL
+         ORDER BY repository, log.commit_hash, log.id
+        ON CONFLICT (repository, sha) DO NOTHING
+    """)
+    cr.execute("""
+        UPDATE git_commit_log log
+           SET commit_id = c.id
+          FROM project_task t, git_commit c
+         WHERE t.id = log.task_id
+           AND c.repository = COALESCE('unlinked/project-' || t.project_id, 'unlinked/task-' || log.task_id)
+           AND c.sha = log.commit_hash
+           AND log.commit_id IS NULL
+    """)
+    if cr.rowcount:
+        _logger.warning("%s commit logs of projects without a repository were kept under 'unlinked/...' placeholder repositories", cr.rowcount)
+    cr.execute("DELETE FROM git_commit_log WHERE commit_id IS NULL")
+    if cr.rowcount:
+        _logger.warning("%s commit logs without a commit hash were dropped", cr.rowcount)
+    cr.execute("ALTER TABLE git_commit_log ALTER COLUMN commit_id SET NOT NULL")
+
+    cr.execute("""
+        INSERT INTO git_branch (project_id, name, create_date, write_date)
+        SELECT DISTINCT t.project_id, log.branch_name, now() at time zone 'UTC', now() at time zone 'UTC'
+          FROM git_commit_log log
+          JOIN project_task t ON t.id = log.task_id
+         WHERE log.branch_name IS NOT NULL
+           AND t.project_id IS NOT NULL
+        ON CONFLICT (project_id, name) DO NOTHING
+    """)
+    cr.execute("""
+        INSERT INTO git_branch_commit_rel (branch_id, commit_id)
+        SELECT DISTINCT b.id, log.commit_id
+          FROM git_commit_log log
+          JOIN project_task t ON t.id = log.task_id
+          JOIN git_branch b ON b.project_id = t.project_id AND b.name = log.branch_name
+        ON CONFLICT DO NOTHING
+    """)
+
+    # The data now lives in git_commit only
+    cr.execute("""
+        ALTER TABLE git_commit_log
+            DROP COLUMN IF EXISTS commit_message,
+            DROP COLUMN IF EXISTS commit_author,
+            DROP COLUMN IF EXISTS commit_url
+    """)
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """
+    Fill the activity statistics from the history synced so far.
+    """
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['git.activity.stat']._rebuild()
@@ -3,7 +3,16 @@
 from . import project
 from . import res_config_settings
 from . import project_task
+from . import git_commit
 from . import git_commit_log
 from . import git_pull_request
-
-
+from . import github_service
+from . import git_http_cache
+from . import git_branch
+from . import git_rate_limit
+from . import git_credential
+from . import git_sync_run
+from . import git_activity_stat
+from . import git_repository_provision
+from . import git_circuit_breaker
+from . import git_job
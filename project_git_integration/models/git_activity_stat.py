@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class GitActivityStat(models.Model):
+    _name = 'git.activity.stat'
+    _description = 'Git Activity Statistics'
+    _order = 'day desc'
+    _rec_name = 'day'
+
+    # One row per (project, task, author, day), maintained incrementally by the
+    # sync so reports do not aggregate the raw commit logs and pull requests.
+    project_id = fields.Many2one('project.project', string="Project", required=True, ondelete='cascade', index=True)
+    task_id = fields.Many2one('project.task', string="Task", required=True, ondelete='cascade', index=True)
+    author = fields.Char(string="Author", required=True)
+    day = fields.Date(string="Day", required=True, index=True)
+    commit_count = fields.Integer(string="Commits")
+    pr_opened_count = fields.Integer(string="Pull Requests Opened")
+    pr_merged_count = fields.Integer(string="Pull Requests Merged")
+    pr_lead_time_hours = fields.Float(string="Lead Time (h, total)", help="Sum of the time from opening to merge of the pull requests merged that day; divide by the merged count for the average.")
+
+    _key_uniq = models.Constraint('UNIQUE(project_id, task_id, author, day)', "Statistics are kept once per project, task, author and day.")
+
+    _COUNTERS = ('commit_count', 'pr_opened_count', 'pr_merged_count', 'pr_lead_time_hours')
+
+    def _upsert_sql(self, rows_sql):
+        """
+        Adds the counters of `rows_sql`, a query or VALUES list producing
+        (project_id, task_id, author, day, *counters), to the matching rows.
+        """
+        return SQL(
+            """
+            INSERT INTO git_activity_stat (project_id, task_id, author, day, %(counters)s,
+                                           create_uid, write_uid, create_date, write_date)
+            SELECT rows.*, %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM (%(rows)s) AS rows
+            ON CONFLICT (project_id, task_id, author, day) DO UPDATE SET %(increments)s
+            """,
+            counters=SQL(", ").join(SQL.identifier(counter) for counter in self._COUNTERS),
+            uid=self.env.uid,
+            rows=rows_sql,
+            increments=SQL(", ").join(
+                SQL("%s = git_activity_stat.%s + EXCLUDED.%s", *(SQL.identifier(counter),) * 3)
+                for counter in self._COUNTERS
+            ),
+        )
+
+    @api.model
+    def _add_commit_logs(self, log_ids):
+        """
+        Counts newly created commit logs, in one statement.
+        """
+        if not log_ids:
+            return
+        self.env.cr.execute(self._upsert_sql(SQL(
+            """
+            SELECT t.project_id, log.task_id, COALESCE(c.author, ''), c.date::date,
+                   count(*), 0, 0, 0.0
+              FROM git_commit_log log
+              JOIN git_commit c ON c.id = log.commit_id
+              JOIN project_task t ON t.id = log.task_id
+             WHERE log.id = ANY(%s) AND t.project_id IS NOT NULL AND c.date IS NOT NULL
+             GROUP BY 1, 2, 3, 4
+            """,
+            list(log_ids),
+        )))
+        self.invalidate_model()
+
+    @api.model
+    def _add_pull_request_events(self, opened, merged):
+        """
+        Counts pull requests newly opened and newly merged; both are
+        git.pull.request recordsets.
+        """
+        rows = []
+        for pr in opened.filtered(lambda pr: pr.task_id.project_id and pr.pr_created_on):
+            rows.append(SQL("(%s, %s, %s, %s::date, 0, 1, 0, 0.0)",
+                            pr.task_id.project_id.id, pr.task_id.id, pr.pr_author_login or '', pr.pr_created_on))
+        for pr in merged.filtered(lambda pr: pr.task_id.project_id and pr.pr_merged_on):
+            lead_time = (pr.pr_merged_on - pr.pr_created_on).total_seconds() / 3600 if pr.pr_created_on else 0.0
+            rows.append(SQL("(%s, %s, %s, %s::date, 0, 0, 1, %s)",
+                            pr.task_id.project_id.id, pr.task_id.id, pr.pr_author_login or '', pr.pr_merged_on, lead_time))
+        if not rows:
+            return
+        # Several events may hit the same row: sum them first, ON CONFLICT may
+        # only touch a row once per statement
+        self.env.cr.execute(self._upsert_sql(SQL(
+            """
+            SELECT project_id, task_id, author, day, sum(commits), sum(opened), sum(merged), sum(lead_time)
+              FROM (VALUES %s) AS events(project_id, task_id, author, day, commits, opened, merged, lead_time)
+             GROUP BY 1, 2, 3, 4
+            """,
+            SQL(", ").join(rows),
+        )))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """
+        Recomputes every row from the commit logs and pull requests, e.g. after
+        installing the module on existing data or to repair drifted counters.
+        """
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM git_activity_stat")
+        self.env.cr.execute(self._upsert_sql(SQL(
+            """
+            SELECT project_id, task_id, author, day,
+                   sum(commits)::int, sum(opened)::int, sum(merged)::int, sum(lead_time)
+              FROM (
+                    SELECT t.project_id, log.task_id, COALESCE(c.author, '') AS author, c.date::date AS day,
+                           1 AS commits, 0 AS opened, 0 AS merged, 0.0 AS lead_time
+                      FROM git_commit_log log
+                      JOIN git_commit c ON c.id = log.commit_id
+                      JOIN project_task t ON t.id = log.task_id
+                     WHERE c.date IS NOT NULL
+                 UNION ALL
+                    SELECT t.project_id, pr.task_id, COALESCE(pr.pr_author_login, ''), pr.pr_created_on::date,
+                           0, 1, 0, 0.0
+                      FROM git_pull_request pr
+                      JOIN project_task t ON t.id = pr.task_id
+                     WHERE pr.pr_created_on IS NOT NULL
+                 UNION ALL
+                    SELECT t.project_id, pr.task_id, COALESCE(pr.pr_author_login, ''), pr.pr_merged_on::date,
+                           0, 0, 1, COALESCE(EXTRACT(EPOCH FROM pr.pr_merged_on - pr.pr_created_on) / 3600, 0.0)
+                      FROM git_pull_request pr
+                      JOIN project_task t ON t.id = pr.task_id
+                     WHERE pr.pr_status = 'merged' AND pr.pr_merged_on IS NOT NULL
+                   ) AS events
+             WHERE project_id IS NOT NULL
+             GROUP BY 1, 2, 3, 4
+            """
+        )))
+        self.invalidate_model()
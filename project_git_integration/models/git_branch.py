@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class GitBranch(models.Model):
+    _name = 'git.branch'
+    _description = 'Git Branch Sync State'
+    _order = 'project_id, name'
+
+    name = fields.Char(string="Branch", required=True)
+    project_id = fields.Many2one('project.project', string="Project", required=True, ondelete='cascade', index=True)
+    head_sha = fields.Char(string="Last Synced Head SHA")
+    last_commit_date = fields.Datetime(
+        string="Last Commit Date",
+        help="Latest committer date synced, the `since` cursor of the next listing. Committer, not author, "
+             "dates, as GitHub filters on them and rebased commits keep their older author date.",
+    )
+    last_synced_on = fields.Datetime(string="Last Synced On")
+    commit_ids = fields.Many2many('git.commit', 'git_branch_commit_rel', 'branch_id', 'commit_id', string="Commits")
+
+    # Branch status reconciliation (see project.project._git_merged_branches)
+    diverged = fields.Boolean(string="Diverged", help="Seen with commits the default branch did not have: once the default branch contains its head again, it is merged.")
+    compared_on = fields.Datetime(string="Last Compared On")
+
+    # Checkpoint of a commit listing too long for one sync: the next sync resumes
+    # from `import_next_url`, and the high-water mark only moves once it is done
+    import_next_url = fields.Char(string="Import Resumes From")
+    import_head_sha = fields.Char(string="Import Head SHA")
+    import_last_commit_date = fields.Datetime(string="Import Last Commit Date")
+
+    _project_name_uniq = models.Constraint('UNIQUE(project_id, name)', "A branch can only be tracked once per project.")
+
+    @api.model
+    def _get_or_create_many(self, project, names):
+        branches = self.search([('project_id', '=', project.id), ('name', 'in', list(names))])
+        missing = set(names).difference(branches.mapped('name'))
+        return branches | self.create([{'project_id': project.id, 'name': name} for name in sorted(missing)])
+
+    @api.model
+    def _get_or_create(self, project, name):
+        branch = self.search([('project_id', '=', project.id), ('name', '=', name)], limit=1)
+        if not branch:
+            branch = self.create({'project_id': project.id, 'name': name})
+        return branch
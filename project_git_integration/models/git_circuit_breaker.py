@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class GitCircuitBreaker(models.Model):
+    _name = 'git.circuit.breaker'
+    _description = 'GitHub Circuit Breaker'
+    _rec_name = 'host'
+
+    # Maintained in SQL by tools.circuit_breaker.CircuitBreaker
+    host = fields.Char(string="Host", required=True)
+    failure_count = fields.Integer(string="Consecutive Failures")
+    last_failure_on = fields.Datetime(string="Last Failure")
+    opened_until = fields.Datetime(string="Open Until")
+
+    _host_uniq = models.Constraint('UNIQUE(host)', "A breaker already exists for this host.")
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class GitCommit(models.Model):
+    _name = 'git.commit'
+    _description = 'Git Commit'
+    _order = 'date desc'
+    _rec_name = 'sha'
+
+    repository = fields.Char(string="Repository", required=True, help="owner/name of the GitHub repository")
+    sha = fields.Char(string="Commit ID", required=True)
+    message = fields.Text(string="Commit Message")
+    author = fields.Char(string="Author")
+    date = fields.Datetime(string="Date", index=True)
+    url = fields.Char(string="Commit URL")
+    branch_ids = fields.Many2many('git.branch', 'git_branch_commit_rel', 'commit_id', 'branch_id', string="Branches")
+
+    _repository_sha_uniq = models.Constraint('UNIQUE(repository, sha)', "A commit is stored once per repository.")
+
+    _UPSERT_COLUMNS = ('sha', 'message', 'author', 'date', 'url')
+
+    @api.model
+    def _upsert(self, repository, vals_list):
+        """
+        Stores the given commits of a repository, skipping the ones already known,
+        with a single INSERT ... ON CONFLICT DO NOTHING, so known rows are neither
+        rewritten nor locked. Returns the records of all the given commits, new
+        or not.
+        """
+        unique_vals = list({vals['sha']: vals for vals in vals_list if vals.get('sha')}.values())
+        if not unique_vals:
+            return self.browse()
+        self.env.flush_all()
+        values = SQL(", ").join(
+            SQL(
+                "(%s, %s, %s, %s, %s, %s, %s, %s, now() at time zone 'UTC', now() at time zone 'UTC')",
+                repository,
+                *(vals.get(column) or None for column in self._UPSERT_COLUMNS),
+                self.env.uid, self.env.uid,
+            )
+            for vals in unique_vals
+        )
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO git_commit (repository, %s, create_uid, write_uid, create_date, write_date)
+            VALUES %s
+            ON CONFLICT (repository, sha) DO NOTHING
+            RETURNING id, sha
+            """,
+            SQL(", ").join(SQL.identifier(column) for column in self._UPSERT_COLUMNS),
+            values,
+        ))
+        ids = {sha: commit_id for commit_id, sha in self.env.cr.fetchall()}
+        # RETURNING skips the rows that already existed: look them up
+        known = [vals['sha'] for vals in unique_vals if vals['sha'] not in ids]
+        if known:
+            self.env.cr.execute(SQL(
+                "SELECT sha, id FROM git_commit WHERE repository = %s AND sha = ANY(%s)",
+                repository, known,
+            ))
+            ids.update(self.env.cr.fetchall())
+        return self.browse([ids[vals['sha']] for vals in unique_vals if vals['sha'] in ids])
+
+    def _add_to_branch(self, branch):
+        """
+        Records that the commits of `self` belong to the branch.
+        """
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO git_branch_commit_rel (branch_id, commit_id)
+            SELECT %s, unnest(%s::int[])
+            ON CONFLICT DO NOTHING
+            """,
+            branch.id, list(self.ids),
+        ))
+        self.invalidate_recordset(['branch_ids'])
+        branch.invalidate_recordset(['commit_ids'])
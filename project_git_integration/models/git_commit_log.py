@@ -1,17 +1,100 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields
+from odoo import models, fields, api
+from odoo.tools import SQL
 
 class GitCommitLog(models.Model):
     _name = 'git.commit.log'
     _description = 'Git Commit Log'
     _order = 'commit_date desc'
 
-    commit_hash = fields.Char(string="Commit ID", required=True)
-    commit_message = fields.Text(string="Commit Message")
-    commit_author = fields.Char(string="Author")
-    commit_date = fields.Datetime(string="Date")
-    commit_url = fields.Char(string="Commit URL")
+    # Links a task to a commit stored once per repository in git.commit; only
+    # the columns needed to search and sort a task's commits are kept here.
+    commit_id = fields.Many2one('git.commit', string="Commit", required=True, ondelete='cascade', index=True)
+    commit_hash = fields.Char(string="Commit ID", related='commit_id.sha', store=True, index=True)
+    commit_message = fields.Text(string="Commit Message", related='commit_id.message')
+    commit_author = fields.Char(string="Author", related='commit_id.author')
+    commit_date = fields.Datetime(string="Date", related='commit_id.date', store=True, index=True)
+    commit_url = fields.Char(string="Commit URL", related='commit_id.url')
     branch_name = fields.Char(string="Branch")
     name = fields.Char(string="Name")
     task_id = fields.Many2one('project.task', string="Task", ondelete='cascade')
+
+    # Also serves lookups by task, as its leading column
+    _task_commit_uniq = models.Constraint('UNIQUE(task_id, commit_id)', "A commit can only be logged once per task.")
+    # Matches the task's commit list: WHERE task_id = ? ORDER BY commit_date DESC
+    _task_date_idx = models.Index('(task_id, commit_date DESC)')
+
+    _INSERT_COLUMNS = ('commit_id', 'commit_hash', 'commit_date', 'branch_name', 'task_id')
+
+    @api.model
+    def _insert_ignore_existing(self, vals_list):
+        """
+        Bulk-inserts commit logs with INSERT ... ON CONFLICT DO NOTHING on
+        (task_id, commit_id): links a task already has are skipped by the unique
+        index instead of being filtered in Python. `commit_hash` and `commit_date`
+        must be given, as the stored related fields are not computed here.
+        Returns the created records.
+        """
+        if not vals_list:
+            return self.browse()
+        self.env.flush_all()
+        values = SQL(", ").join(
+            SQL(
+                "(%s, %s, %s, %s, %s, %s, %s, now() at time zone 'UTC', now() at time zone 'UTC')",
+                *(vals.get(column) or None for column in self._INSERT_COLUMNS),
+                self.env.uid, self.env.uid,
+            )
+            for vals in vals_list
+        )
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO git_commit_log (%s, create_uid, write_uid, create_date, write_date)
+            VALUES %s
+            ON CONFLICT (task_id, commit_id) DO NOTHING
+            RETURNING id
+            """,
+            SQL(", ").join(SQL.identifier(column) for column in self._INSERT_COLUMNS),
+            values,
+        ))
+        records = self.browse([row[0] for row in self.env.cr.fetchall()])
+        self.env['git.activity.stat']._add_commit_logs(records.ids)
+        self._invalidate_tasks(self.env['project.task'].browse({vals['task_id'] for vals in vals_list}))
+        return records
+
+    @api.model
+    def _insert_from_branch(self, tasks, branch):
+        """
+        Links every commit stored for the branch to the given tasks, in one
+        INSERT ... SELECT. Returns the number of links created.
+        """
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO git_commit_log (commit_id, commit_hash, commit_date, branch_name, task_id,
+                                        create_uid, write_uid, create_date, write_date)
+            SELECT c.id, c.sha, c.date, %(branch_name)s, task.id,
+                   %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM unnest(%(task_ids)s::int[]) AS task(id)
+              JOIN git_branch_commit_rel rel ON rel.branch_id = %(branch_id)s
+              JOIN git_commit c ON c.id = rel.commit_id
+            ON CONFLICT (task_id, commit_id) DO NOTHING
+            RETURNING id
+            """,
+            branch_name=branch.name, uid=self.env.uid, task_ids=list(tasks.ids), branch_id=branch.id,
+        ))
+        log_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env['git.activity.stat']._add_commit_logs(log_ids)
+        self._invalidate_tasks(tasks)
+        return len(log_ids)
+
+    @api.model
+    def _invalidate_tasks(self, tasks):
+        """
+        Brings the tasks in line with commit logs inserted in SQL: their commit
+        lists are reloaded and their commit counters recomputed.
+        """
+        # The task's commit lists no longer match the database
+        tasks.invalidate_recordset(['commit_ids'])
+        for field_name in ('git_commit_count', 'git_last_commit_date'):
+            self.env.add_to_compute(tasks._fields[field_name], tasks)
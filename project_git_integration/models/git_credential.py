@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class GitCredential(models.Model):
+    _name = 'git.credential'
+    _description = 'GitHub Credential'
+    _order = 'owner, name, id'
+
+    name = fields.Char(string="Name", required=True)
+    token = fields.Char(string="Token", required=True, copy=False)
+    owner = fields.Char(
+        string="Repository Owner",
+        help="User or organization whose repositories are accessed with this token. "
+             "Leave empty to add the token to the shared pool, used with the token of the settings."
+    )
+    active = fields.Boolean(string="Active", default=True)
+
+    # Token pools are cached per worker (see git.github.service._get_token_pool)
+    @api.model_create_multi
+    def create(self, vals_list):
+        credentials = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return credentials
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+# Validators not refreshed for this long are dropped; the next request just gets a full response
+STALE_AFTER = timedelta(days=30)
+
+
+class GitHttpCache(models.Model):
+    _name = 'git.http.cache'
+    _description = 'GitHub Response Validator Cache'
+
+    key = fields.Char(string="Key", required=True, index=True)
+    url = fields.Char(string="Endpoint")
+    etag = fields.Char(string="ETag")
+    last_modified = fields.Char(string="Last-Modified")
+    empty = fields.Boolean(string="Empty Listing", help="The response the validators belong to listed nothing.")
+
+    _key_uniq = models.Constraint('UNIQUE(key)', "A cache entry already exists for this request.")
+
+    @api.autovacuum
+    def _gc_stale_entries(self):
+        """
+        Drops the entries not written for `STALE_AFTER`, e.g. the ones of a task
+        batch that no longer syncs together.
+        """
+        self.search([('write_date', '<', fields.Datetime.now() - STALE_AFTER)]).unlink()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+from ..tools.circuit_breaker import CircuitOpen
+from ..tools.github_client import is_transient_error
+from ..tools.rate_limit import RateLimitExceeded
+
+_logger = logging.getLogger(__name__)
+
+# Longest delay between two attempts of a job, in seconds
+MAX_RETRY_DELAY = 3600
+
+
+class GitJob(models.Model):
+    _name = 'git.job'
+    _description = 'GitHub Job'
+    _order = 'id desc'
+    _rec_name = 'operation'
+
+    operation = fields.Selection(
+        [
+            ('commits', "Commits"),
+            ('pull_requests', "Pull Requests"),
+            ('activity', "Commits & Pull Requests"),
+            ('create_repository', "Create Repository"),
+            ('assign_repository', "Link Repository"),
+            ('create_branch', "Create Branch"),
+            ('branch_status', "Branch Status"),
+        ],
+        string="Operation",
+        required=True
+    )
+    state = fields.Selection(
+        [
+            ('pending', "Pending"),
+            ('running', "Running"),
+            ('done', "Done"),
+            ('failed', "Failed"),
+            ('cancelled', "Cancelled")
+        ],
+        string="Status",
+        default="pending",
+        required=True,
+        index=True
+    )
+    res_model = fields.Char(string="Model", required=True)
+    res_ids = fields.Char(string="Record IDs", required=True, help="Comma-separated ids of the records the action runs on.")
+    method = fields.Char(string="Action", required=True)
+    user_id = fields.Many2one('res.users', string="Requested By", required=True, default=lambda self: self.env.user)
+    project_id = fields.Many2one('project.project', string="Project", ondelete='cascade', index=True)
+    task_ids = fields.Many2many('project.task', 'git_job_task_rel', 'job_id', 'task_id', string="Tasks")
+    attempts = fields.Integer(string="Attempts")
+    max_attempts = fields.Integer(string="Max Attempts", default=5)
+    next_attempt_on = fields.Datetime(string="Next Attempt", default=fields.Datetime.now, index=True)
+    done_on = fields.Datetime(string="Finished On")
+    result = fields.Char(string="Result")
+    last_error = fields.Char(string="Last Error")
+
+    @api.model
+    def _defer(self, records, method, operation):
+        """
+        Queues `records.method()` when GitHub actions run in the background (see
+        the `github_background_actions` setting) and returns the notification
+        to show instead of its result. Returns False when the action must run
+        right away: the setting is off, or the job itself is running it.
+        """
+        if self.env.context.get('git_job_run'):
+            return False
+        ICP = self.env['ir.config_parameter'].sudo()
+        if not ICP.get_param('project_git_integration.github_background_actions'):
+            return False
+
+        res_ids = ','.join(map(str, sorted(records.ids)))
+        job = self.sudo().search([
+            ('state', '=', 'pending'),
+            ('res_model', '=', records._name),
+            ('res_ids', '=', res_ids),
+            ('method', '=', method),
+        ], limit=1)
+        if job:
+            message = "This action is already queued, it will run shortly."
+        else:
+            projects = records if records._name == 'project.project' else records.project_id
+            self.sudo().create({
+                'operation': operation,
+                'res_model': records._name,
+                'res_ids': res_ids,
+                'method': method,
+                'user_id': self.env.uid,
+                'project_id': projects.id if len(projects) == 1 else False,
+                'task_ids': [fields.Command.set(records.ids)] if records._name == 'project.task' else False,
+            })
+            self.env.ref('project_git_integration.ir_cron_git_jobs')._trigger()
+            message = "The action is queued and runs in the background; its status shows on the task's Git Integration tab."
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Queued',
+                'message': message,
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def action_retry(self):
+        self.write({'state': 'pending', 'attempts': 0, 'next_attempt_on': fields.Datetime.now(), 'last_error': False})
+        self.env.ref('project_git_integration.ir_cron_git_jobs')._trigger()
+
+    def action_cancel(self):
+        self.filtered(lambda job: job.state == 'pending').write({'state': 'cancelled'})
+
+    @api.model
+    def _cron_run_jobs(self):
+        """
+        Runs the due jobs one by one, each in its own transaction, until none is
+        left or the run's time budget is spent. Jobs are claimed with SKIP LOCKED
+        so several workers can drain the queue together.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        deadline = time.monotonic() + float(ICP.get_param('project_git_integration.github_sync_time_budget', 240))
+        # Jobs left running by an interrupted worker
+        self.search([
+            ('state', '=', 'running'),
+            ('write_date', '<', fields.Datetime.now() - timedelta(hours=1)),
+        ]).write({'state': 'pending'})
+        self.env.cr.commit()
+
+        while time.monotonic() < deadline:
+            self.env.cr.execute("""
+                SELECT id
+                  FROM git_job
+                 WHERE state = 'pending' AND next_attempt_on <= now() at time zone 'UTC'
+                 ORDER BY next_attempt_on, id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+            """)
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job.write({'state': 'running', 'attempts': job.attempts + 1})
+            self.env.cr.commit()
+            job._run()
+            self.env.cr.commit()
+
+    def _run(self):
+        """
+        Runs the job's action as the user who queued it. Transient failures
+        (network errors, timeouts, GitHub server errors) are retried with an
+        exponential backoff; an open circuit breaker or an exhausted rate limit
+        postpones the job without counting the attempt.
+        """
+        self.ensure_one()
+        records = self.env[self.res_model].with_user(self.user_id).with_context(git_job_run=True).browse(
+            [int(res_id) for res_id in self.res_ids.split(',') if res_id]).exists()
+        try:
+            with self.env.cr.savepoint():
+                action = getattr(records, self.method)()
+        except (CircuitOpen, RateLimitExceeded) as e:
+            retry_at = getattr(e, 'retry_at', None) or getattr(e, 'reset_at', None)
+            self.write({
+                'state': 'pending',
+                'attempts': self.attempts - 1,
+                'next_attempt_on': retry_at or fields.Datetime.now() + timedelta(minutes=1),
+                'last_error': str(e)[:255],
+            })
+            return
+        except Exception as e:
+            if not isinstance(e, UserError):
+                _logger.exception("GitHub job %s failed", self.id)
+            if is_transient_error(e) and self.attempts < self.max_attempts:
+                delay = min(MAX_RETRY_DELAY, 30 * 2 ** (self.attempts - 1))
+                self.write({
+                    'state': 'pending',
+                    'next_attempt_on': fields.Datetime.now() + timedelta(seconds=delay),
+                    'last_error': str(e)[:255],
+                })
+            else:
+                self.write({'state': 'failed', 'done_on': fields.Datetime.now(), 'last_error': str(e)[:255]})
+            return
+
+        message = isinstance(action, dict) and (action.get('params') or {}).get('message')
+        self.write({'state': 'done', 'done_on': fields.Datetime.now(), 'result': message or False, 'last_error': False})
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+
+from odoo import models, fields, api
+
+
+class GitPullRequest(models.Model):
+    _name = 'git.pull.request'
+    _description = 'Git Pull Request'
+    _order = 'pr_number desc'
+    _rec_name = 'pr_title'
+
+    pr_number = fields.Integer(string="PR Number", required=True)
+    pr_title = fields.Char(string="Title")
+    pr_url = fields.Char(string="PR URL")
+    pr_status = fields.Selection(
+        [
+            ('open', "Open"),
+            ('closed', "Closed"),
+            ('merged', "Merged")
+        ],
+        string="Status",
+        default="open"
+    )
+    pr_source_branch = fields.Char(string="Source Branch", index=True)
+    pr_target_branch = fields.Char(string="Target Branch")
+    pr_created_on = fields.Datetime(string="Created On")
+    pr_merged_on = fields.Datetime(string="Merged On")
+    pr_updated_on = fields.Datetime(string="Updated On")
+    pr_author_login = fields.Char(string="Author Login")
+    pr_created_by = fields.Many2one('res.users', string="Created By")
+    pr_content_hash = fields.Char(string="Content Hash", help="Hash of the synced values, used to skip unchanged pull requests.")
+    task_id = fields.Many2one('project.task', string="Task", ondelete='cascade')
+
+    # Also serves lookups by task, as its leading column
+    _task_number_uniq = models.Constraint('UNIQUE(task_id, pr_number)', "A pull request can only be linked once per task.")
+    _task_status_idx = models.Index('(task_id, pr_status)')
+
+    @api.model
+    def _content_hash(self, vals):
+        return hashlib.sha1(json.dumps(vals, sort_keys=True, default=str).encode()).hexdigest()
+
+    @api.model
+    def _upsert_for_tasks(self, tasks, prs_vals):
+        """
+        Syncs the given pull requests (values without task) on every task: missing
+        ones are created in one batch, existing ones are only written when their
+        content hash changed (e.g. open -> merged), one write per pull request for
+        all the tasks holding it. Returns the number of records created and updated.
+        """
+        prs_vals = [dict(vals, pr_content_hash=self._content_hash(vals)) for vals in prs_vals if vals.get('pr_number')]
+        if not tasks or not prs_vals:
+            return 0, 0
+
+        existing = {}
+        for row in self.search_read(
+            [('task_id', 'in', tasks.ids), ('pr_number', 'in', [vals['pr_number'] for vals in prs_vals])],
+            ['task_id', 'pr_number', 'pr_content_hash', 'pr_status'], load=False,
+        ):
+            existing[row['task_id'], row['pr_number']] = row
+
+        to_create = []
+        updated = 0
+        newly_merged = self.browse()
+        for vals in prs_vals:
+            stale_ids = []
+            for task in tasks:
+                row = existing.get((task.id, vals['pr_number']))
+                if row is None:
+                    existing[task.id, vals['pr_number']] = {'id': None, 'pr_content_hash': vals['pr_content_hash']}
+                    to_create.append(dict(vals, task_id=task.id))
+                elif row['pr_content_hash'] != vals['pr_content_hash']:
+                    stale_ids.append(row['id'])
+                    if vals.get('pr_status') == 'merged' and row['pr_status'] != 'merged':
+                        newly_merged |= self.browse(row['id'])
+            if stale_ids:
+                self.browse(stale_ids).write(vals)
+                updated += len(stale_ids)
+
+        # One batched create for every task
+        created = self.create(to_create) if to_create else self.browse()
+        self.env['git.activity.stat']._add_pull_request_events(
+            created, newly_merged | created.filtered(lambda pr: pr.pr_status == 'merged'))
+        return len(created), updated
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class GitRateLimit(models.Model):
+    _name = 'git.rate.limit'
+    _description = 'GitHub Rate Limit Budget'
+    _rec_name = 'key'
+
+    key = fields.Char(string="Key", required=True, index=True)
+    resource = fields.Char(string="Resource")
+    rate_limit = fields.Integer(string="Limit")
+    remaining = fields.Integer(string="Remaining")
+    reset_at = fields.Datetime(string="Resets At")
+    blocked_until = fields.Datetime(string="Blocked Until")
+    rejected_until = fields.Datetime(string="Rejected Until", help="GitHub refused the token: pooled calls use the other tokens until then.")
+
+    _key_uniq = models.Constraint('UNIQUE(key)', "A budget already exists for this token and resource.")
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+import requests
+
+from ..tools.github_client import error_message
+
+
+def _provision_repository(client, login, repo_name, payload):
+    """
+    Looks `login/repo_name` up, creating it from `payload` when missing.
+    Returns [(status, repository payload or error message)].
+    """
+    try:
+        response = client.get(f"repos/{login}/{repo_name}")
+        if response.status_code == 200:
+            return [('linked', response.json())]
+        if response.status_code != 404:
+            return [('failed', f"GitHub API Error ({response.status_code}): {error_message(response)}")]
+        if payload is None:
+            return [('failed', f"No existing repository found with name '{repo_name}' for user '{login}'.")]
+        response = client.post("user/repos", json=payload)
+        if response.status_code == 201:
+            return [('created', response.json())]
+        return [('failed', f"GitHub API Error ({response.status_code}): {error_message(response)}")]
+    except requests.exceptions.RequestException as e:
+        return [('failed', f"Network error connecting to GitHub: {str(e)}")]
+    except UserError as e:  # e.g. the rate limit budget is exhausted
+        return [('failed', str(e))]
+
+
+class GitRepositoryProvision(models.TransientModel):
+    _name = 'git.repository.provision'
+    _description = 'Link or Create GitHub Repositories'
+
+    project_ids = fields.Many2many('project.project', string="Projects")
+    mode = fields.Selection(
+        [
+            ('link', "Link existing repositories"),
+            ('create', "Link, or create the missing repositories")
+        ],
+        string="Mode",
+        default="link",
+        required=True
+    )
+    private = fields.Boolean(string="Create Private Repositories")
+    state = fields.Selection(
+        [
+            ('draft', "Draft"),
+            ('done', "Done")
+        ],
+        default="draft"
+    )
+    line_ids = fields.One2many('git.repository.provision.line', 'provision_id', string="Report")
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if 'project_ids' in fields_list and self.env.context.get('active_model') == 'project.project':
+            res['project_ids'] = [fields.Command.set(self.env.context.get('active_ids') or [])]
+        return res
+
+    def action_provision(self):
+        """
+        Links (or creates) the repository of every selected project: the token's
+        login is resolved once, the projects are checked concurrently and the
+        results written together, with one report line per project.
+        """
+        self.ensure_one()
+        if not self.project_ids:
+            raise UserError("Select at least one project.")
+
+        service = self.env['git.github.service']
+        client = service._get_client()
+        operation = 'create_repository' if self.mode == 'create' else 'assign_repository'
+        with service._instrument(client, operation, task_count=0) as metrics:
+            login, scopes = service._get_identity(client)
+            # Classic tokens list their scopes; fine-grained ones do not
+            if self.mode == 'create' and scopes and not {'repo', 'public_repo'} & set(scopes):
+                raise UserError("The GitHub token is not allowed to create repositories (scope 'repo' or 'public_repo').")
+
+            lines, jobs, projects = [], {}, {}
+            for project in self.project_ids:
+                repo_name = project._git_repository_slug()
+                if project.git_repository_name:
+                    lines.append((project, project.git_repository_name, 'skipped', "Already linked."))
+                elif not repo_name:
+                    lines.append((project, False, 'failed', "Project name is required to search for a repository."))
+                elif repo_name in jobs:
+                    lines.append((project, repo_name, 'failed', f"Another selected project maps to repository '{repo_name}'."))
+                else:
+                    payload = project._git_repository_payload(repo_name, self.private) if self.mode == 'create' else None
+                    projects[repo_name] = project
+                    jobs[repo_name] = lambda repo_name=repo_name, payload=payload: _provision_repository(
+                        client, login, repo_name, payload)
+
+            found = {}
+            for repo_name, (status, result) in service._get_fetch_engine().imap(jobs):
+                if status == 'failed':
+                    lines.append((projects[repo_name], repo_name, status, result))
+                else:
+                    found[repo_name] = (status, result)
+
+            with metrics.timer('db'):
+                for repo_name, (status, repo_data) in found.items():
+                    project = projects[repo_name]
+                    project.write(project._git_repository_vals(repo_data))
+                    lines.append((project, repo_data.get('name'), status, False))
+                self.env['project.project'].flush_model()
+            metrics.count_rows(updated=len(found), skipped=len(self.project_ids) - len(found))
+
+        self.line_ids.unlink()
+        self.write({
+            'state': 'done',
+            'line_ids': [
+                fields.Command.create({
+                    'project_id': project.id,
+                    'repository_name': repo_name,
+                    'status': status,
+                    'message': message,
+                })
+                for project, repo_name, status, message in lines
+            ],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+            'name': 'Repository Provisioning Report',
+        }
+
+
+class GitRepositoryProvisionLine(models.TransientModel):
+    _name = 'git.repository.provision.line'
+    _description = 'Repository Provisioning Report Line'
+    _order = 'status, id'
+
+    provision_id = fields.Many2one('git.repository.provision', required=True, ondelete='cascade')
+    project_id = fields.Many2one('project.project', string="Project", ondelete='cascade')
+    repository_name = fields.Char(string="Repository")
+    status = fields.Selection(
+        [
+            ('failed', "Failed"),
+            ('created', "Created"),
+            ('linked', "Linked"),
+            ('skipped', "Skipped")
+        ],
+        string="Status"
+    )
+    message = fields.Char(string="Message")
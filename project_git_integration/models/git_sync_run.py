@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class GitSyncRun(models.Model):
+    _name = 'git.sync.run'
+    _description = 'Git Sync Run'
+    _order = 'started_on desc, id desc'
+    _rec_name = 'operation'
+
+    operation = fields.Selection(
+        [
+            ('commits', "Commits"),
+            ('pull_requests', "Pull Requests"),
+            ('activity', "Commits & Pull Requests"),
+            ('create_repository', "Create Repository"),
+            ('assign_repository', "Link Repository"),
+            ('create_branch', "Create Branch"),
+            ('branch_status', "Branch Status"),
+        ],
+        string="Operation",
+        required=True
+    )
+    trigger = fields.Selection(
+        [
+            ('manual', "Manual"),
+            ('cron', "Scheduled")
+        ],
+        string="Trigger",
+        default="manual"
+    )
+    state = fields.Selection(
+        [
+            ('done', "Done"),
+            ('failed', "Failed")
+        ],
+        string="Status",
+        default="done"
+    )
+    error = fields.Char(string="Error")
+    user_id = fields.Many2one('res.users', string="User")
+    project_id = fields.Many2one('project.project', string="Project", ondelete='set null', index=True)
+    task_count = fields.Integer(string="Tasks")
+    started_on = fields.Datetime(string="Started On", index=True)
+    duration = fields.Float(string="Duration (s)", aggregator='avg')
+
+    http_time = fields.Float(string="HTTP Time (s)", aggregator='avg', help="Summed over concurrent requests.")
+    json_time = fields.Float(string="JSON Time (s)", aggregator='avg', help="Summed over concurrent requests.")
+    parse_time = fields.Float(string="Parse Time (s)", aggregator='avg', help="Mapping GitHub payloads to record values, dates included.")
+    db_time = fields.Float(string="Database Time (s)", aggregator='avg')
+    http_requests = fields.Integer(string="Requests")
+    http_bytes = fields.Integer(string="Bytes Received")
+    status_codes = fields.Char(string="Status Codes")
+    rate_limit_remaining = fields.Integer(string="Lowest Rate Limit Remaining", aggregator='min')
+
+    rows_inserted = fields.Integer(string="Rows Inserted")
+    rows_updated = fields.Integer(string="Rows Updated")
+    rows_skipped = fields.Integer(string="Rows Skipped")
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from odoo import models, fields, api, SUPERUSER_ID
+from odoo.exceptions import UserError
+from odoo.tools import config, ormcache
+import requests
+
+from ..tools.circuit_breaker import CircuitBreaker
+from ..tools.fetch_engine import FetchEngine
+from ..tools.git_mirror import GitMirror
+from ..tools.github_client import GITHUB_API_URL, GitHubClient
+from ..tools.rate_limit import RateLimitGovernor
+from ..tools.sync_metrics import SyncMetrics
+
+_logger = logging.getLogger(__name__)
+
+# Settings of the GitHub client, cached per worker by `_get_credentials`
+Credentials = namedtuple('Credentials', [
+    'token', 'api_url', 'timeout', 'pool_size', 'max_retries', 'backoff_factor',
+    'rate_limit_reserve', 'rate_limit_max_wait', 'circuit_threshold', 'circuit_cooldown',
+])
+
+# Part of the cache key of the worker's credentials, token pools and
+# identities: bumped when GitHub rejects a token, it reloads them without
+# clearing the other caches of the registry
+_credentials_epoch = 0
+
+
+def _forget_credentials():
+    global _credentials_epoch
+    _credentials_epoch += 1
+
+
+class GitGithubService(models.AbstractModel):
+    _name = 'git.github.service'
+    _description = 'GitHub API Service'
+
+    @api.model
+    def _credentials_epoch(self):
+        """
+        Returns the generation of this worker's cached credentials (see
+        `_forget_credentials`).
+        """
+        return _credentials_epoch
+
+    @api.model
+    @ormcache('self._credentials_epoch()')
+    def _get_credentials(self):
+        """
+        Returns the `Credentials` of the GitHub client, read from the system
+        parameters once per worker. Changing the settings clears the registry
+        cache and so reloads them, as does GitHub rejecting a token.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        return Credentials(
+            token=ICP.get_param('project_git_integration.github_token') or False,
+            api_url=ICP.get_param('project_git_integration.github_api_url') or GITHUB_API_URL,
+            timeout=float(ICP.get_param('project_git_integration.github_timeout', 10)),
+            pool_size=int(ICP.get_param('project_git_integration.github_pool_size', 10)),
+            max_retries=int(ICP.get_param('project_git_integration.github_max_retries', 3)),
+            backoff_factor=float(ICP.get_param('project_git_integration.github_retry_backoff', 0.5)),
+            rate_limit_reserve=int(ICP.get_param('project_git_integration.github_rate_limit_reserve', 200)),
+            rate_limit_max_wait=float(ICP.get_param('project_git_integration.github_rate_limit_max_wait', 30)),
+            circuit_threshold=int(ICP.get_param('project_git_integration.github_circuit_threshold', 5)),
+            circuit_cooldown=float(ICP.get_param('project_git_integration.github_circuit_cooldown', 60)),
+        )
+
+    @api.model
+    @ormcache('self._credentials_epoch()', 'owner', 'credential_id')
+    def _get_token_pool(self, owner=None, credential_id=None):
+        """
+        Returns the tokens to access a repository with, the primary one first:
+        the project's own credential, else the active credentials of the
+        repository owner, else the token of the settings and the shared pool.
+        Cached per worker; editing credentials clears the cache.
+        """
+        Credential = self.env['git.credential'].sudo()
+        if credential_id:
+            credential = Credential.browse(credential_id).exists()
+            if credential.active:
+                return (credential.token,)
+        if owner:
+            tokens = tuple(Credential.search([('owner', '=ilike', owner)]).mapped('token'))
+            if tokens:
+                return tokens
+        shared = Credential.search([('owner', 'in', (False, ''))]).mapped('token')
+        return tuple(dict.fromkeys(token for token in [self._get_credentials().token, *shared] if token))
+
+    @api.model
+    def _project_tokens(self, project=None):
+        """
+        Returns the token pool of the project's repository (see `_get_token_pool`),
+        or the default pool without a project.
+        """
+        if not project:
+            return self._get_token_pool()
+        return self._get_token_pool(project.git_repository_owner or None, project.sudo().git_credential_id.id or None)
+
+    @api.model
+    def _get_client(self, project=None):
+        """
+        Returns a GitHub client bound to the tokens of the project's repository
+        (see `_get_token_pool`), sharing the worker's pooled session, failing
+        fast while GitHub is down (see `CircuitBreaker`) and governed by the
+        shared rate limit budget, which spreads reads over the tokens. Calls
+        made with `git_sync_background` in the context keep headroom for users.
+        """
+        credentials = self._get_credentials()
+        tokens = self._project_tokens(project)
+        if not tokens:
+            raise UserError("No GitHub Token found. Please configure it in General Settings.")
+        client = GitHubClient(
+            tokens[0],
+            timeout=credentials.timeout,
+            pool_size=credentials.pool_size,
+            max_retries=credentials.max_retries,
+            backoff_factor=credentials.backoff_factor,
+            base_url=credentials.api_url,
+            pool=tokens[1:],
+        )
+        # The breaker goes first, so calls it refuses do not spend rate limit budget
+        breaker = CircuitBreaker(
+            self.env.registry,
+            threshold=credentials.circuit_threshold,
+            cooldown=credentials.circuit_cooldown,
+        )
+        client.before_request.append(breaker.before_request)
+        client.after_response.append(breaker.after_response)
+        client.on_error.append(breaker.on_error)
+        governor = RateLimitGovernor(
+            self.env.registry,
+            interactive=not self.env.context.get('git_sync_background'),
+            reserve=credentials.rate_limit_reserve,
+            max_wait=credentials.rate_limit_max_wait,
+        )
+        client.before_request.append(governor.before_request)
+        client.after_response.append(governor.after_response)
+
+        def forget_rejected_credentials(client, method, url, response, fingerprint=None):
+            # Revoked or rotated token: the next client reloads the settings and
+            # identity, once per token however many calls it fails
+            fingerprint = fingerprint or client.fingerprint
+            if response.status_code == 401 and fingerprint not in client.rejected:
+                client.rejected.add(fingerprint)
+                _forget_credentials()
+
+        client.after_response.append(forget_rejected_credentials)
+        return client
+
+    @api.model
+    @ormcache('self._credentials_epoch()', 'client.fingerprint')
+    def _get_identity(self, client):
+        """
+        Returns the login of the user owning the client's token and the OAuth
+        scopes granted to the token (empty for fine-grained tokens), asked to
+        GitHub once per worker and token.
+        """
+        try:
+            user_response = client.get("user", rotate=False)
+            user_response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise UserError(f"Failed to fetch GitHub user info: {str(e)}")
+        scopes = user_response.headers.get('X-OAuth-Scopes') or ''
+        return user_response.json().get('login'), tuple(scope.strip() for scope in scopes.split(',') if scope.strip())
+
+    @api.model
+    def _get_login(self, client):
+        """
+        Returns the login of the user owning the client's token.
+        """
+        return self._get_identity(client)[0]
+
+    @api.model
+    @contextmanager
+    def _instrument(self, client, operation, project=None, task_count=0):
+        """
+        Attaches fresh metrics to the client for the duration of the block and
+        records them as a git.sync.run, also when the block fails. The run is
+        written with its own cursor so it survives the rollback of a failed sync.
+        """
+        metrics = client.metrics = SyncMetrics()
+        started_on = fields.Datetime.now()
+        error = False
+        try:
+            yield metrics
+        except Exception as e:
+            error = str(e)[:255] or type(e).__name__
+            raise
+        finally:
+            client.metrics = None
+            vals = {
+                'operation': operation,
+                'trigger': 'cron' if self.env.context.get('git_sync_background') else 'manual',
+                'state': 'failed' if error else 'done',
+                'error': error,
+                'user_id': self.env.uid,
+                'project_id': project.id if project else False,
+                'task_count': task_count,
+                'started_on': started_on,
+                'duration': metrics.duration(),
+                'http_time': metrics.phases['http'],
+                'json_time': metrics.phases['json'],
+                'parse_time': metrics.phases['parse'],
+                'db_time': metrics.phases['db'],
+                'http_requests': metrics.requests,
+                'http_bytes': metrics.bytes_received,
+                'status_codes': ', '.join(f"{code}: {count}" for code, count in sorted(metrics.status_codes.items())),
+                'rate_limit_remaining': metrics.rate_limit_remaining,
+                'rows_inserted': metrics.rows['inserted'],
+                'rows_updated': metrics.rows['updated'],
+                'rows_skipped': metrics.rows['skipped'],
+            }
+            try:
+                with self.env.registry.cursor() as cr:
+                    self.env(cr=cr, user=SUPERUSER_ID)['git.sync.run'].create(vals)
+            except Exception:
+                _logger.exception("Could not record the GitHub sync run")
+
+    @api.model
+    def _get_fetch_engine(self):
+        """
+        Returns the engine running concurrent GitHub listings for this sync.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        return FetchEngine(max_workers=int(ICP.get_param('project_git_integration.github_max_workers', 4)))
+
+    @api.model
+    def _get_mirror(self, project):
+        """
+        Returns the local bare mirror of the project's repository, kept under the
+        `git_mirror_dir` system parameter (by default in the data directory).
+        """
+        if not project.git_repository_url:
+            raise UserError("The project has no repository URL to mirror.")
+        ICP = self.env['ir.config_parameter'].sudo()
+        base_dir = ICP.get_param('project_git_integration.git_mirror_dir') or os.path.join(
+            config['data_dir'], 'git_mirrors', self.env.cr.dbname)
+        return GitMirror(
+            os.path.join(base_dir, f"project-{project.id}.git"),
+            project.git_repository_url,
+            token=(self._project_tokens(project) or (False,))[0],
+            timeout=float(ICP.get_param('project_git_integration.git_mirror_timeout', 600)),
+        )
+
+    @api.model
+    def _conditional_headers(self, client, path, params=None, scope=None):
+        """
+        Returns the cache key of a GET request and the If-None-Match /
+        If-Modified-Since headers stored from the previous 200 response to the same
+        endpoint, query and scope. The scope (e.g. the branch or tasks the response is
+        applied to) ensures a 304 is only trusted by the records that consumed the
+        original payload.
+        """
+        query = urlencode(sorted((params or {}).items()))
+        scope_key = f"{scope._name},{','.join(map(str, sorted(scope.ids)))}" if scope is not None else ''
+        raw_key = f"{client.fingerprint}|{scope_key}|{client.url(path)}?{query}"
+        key = hashlib.sha256(raw_key.encode()).hexdigest()
+
+        entry = self.env['git.http.cache'].sudo().search([('key', '=', key)], limit=1)
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        elif entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return key, headers
+
+    @api.model
+    def _store_validators(self, key, url, response_headers, empty=False):
+        """
+        Remembers the validators of a 200 response under the given cache key, and
+        whether the listing it carried was empty.
+        """
+        validators = {
+            'etag': response_headers.get('ETag') or False,
+            'last_modified': response_headers.get('Last-Modified') or False,
+            'empty': empty,
+        }
+        Cache = self.env['git.http.cache'].sudo()
+        entry = Cache.search([('key', '=', key)], limit=1)
+        if entry:
+            entry.write(validators)
+        elif validators['etag'] or validators['last_modified']:
+            Cache.create(dict(validators, key=key, url=url))
+
+    @api.model
+    def _cached_empty(self, key):
+        """
+        Tells whether the response stored under the cache key was an empty listing.
+        """
+        return bool(self.env['git.http.cache'].sudo().search([('key', '=', key)], limit=1).empty)
+
+    @api.model
+    def _conditional_get(self, client, path, params=None, scope=None):
+        """
+        GET with the validators of the previous response (see `_conditional_headers`).
+        Callers must treat a 304 as "nothing changed since the last sync" and skip
+        processing.
+        """
+        key, headers = self._conditional_headers(client, path, params=params, scope=scope)
+        response = client.get(path, params=params, headers=headers)
+        if response.status_code == 200:
+            self._store_validators(key, client.url(path), response.headers)
+        return response
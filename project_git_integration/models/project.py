@@ -2,8 +2,22 @@
 
 from odoo import models, fields, api
 from odoo.exceptions import UserError
+import functools
+import itertools
+import logging
 import requests
 
+from ..tools.circuit_breaker import CircuitOpen
+from ..tools.fetch_engine import fetch_pages
+from ..tools.github_client import error_message
+from ..tools.rate_limit import RateLimitExceeded
+from ..tools.task_references import TaskReferenceMatcher
+
+_logger = logging.getLogger(__name__)
+
+# Branches compared with the default branch through the API per reconciliation
+MAX_BRANCH_COMPARES = 20
+
 
 class ProjectProject(models.Model):
 	_inherit = 'project.project'
@@ -24,59 +38,173 @@ class ProjectProject(models.Model):
 	)
 
 	git_connected_on = fields.Datetime(string="Linked On")
+	git_sync_backend = fields.Selection(
+		[
+			('rest', "REST API"),
+			('graphql', "GraphQL (bulk)"),
+			('mirror', "Local Git Mirror")
+		],
+		string="Sync Backend",
+		default="rest",
+		required=True,
+		help="GraphQL fetches the commits and pull requests of all the project's branches with a few aliased queries. "
+			 "Local Git Mirror reads commits from a bare clone kept on the server, without using the API quota; "
+			 "pull requests still come from the REST API."
+	)
+	git_branch_ids = fields.One2many('git.branch', 'project_id', string="Tracked Branches")
+	git_link_by_reference = fields.Boolean(
+		string="Link Commits by Message References",
+		help="Sync every branch of the repository and also link each commit to the tasks its message refers to: "
+			 "#<task id>, task-<task id>, or the task's branch name. Best used with the Local Git Mirror backend."
+	)
+	git_credential_id = fields.Many2one(
+		'git.credential',
+		string="GitHub Credential",
+		groups="base.group_system",
+		help="Token used for this project's repository, instead of the tokens of its owner or the shared pool."
+	)
+	git_sync_interval = fields.Integer(
+		string="Background Sync Interval (min)",
+		default=60,
+		help="Tasks are synced in the background once their last sync is older than this. 0 disables the scheduled sync."
+	)
 
 
-	def action_create_repository(self):
+	def _git_repository_key(self):
 		"""
-		Creates a GitHub repository for this project using a token from company settings.
+		Returns the owner/name identifying the linked repository in git.commit.
 		"""
 		self.ensure_one()
-		
-		# 1. Get Token
-		github_token = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
-		if not github_token:
-			raise UserError("No GitHub Token found. Please configure it in General Settings.")
+		return f"{self.git_repository_owner}/{self.git_repository_name}"
 
-		# 2. Sanitize Name (Simple version: Replace spaces with hyphens, remove special chars if needed)
-		if not self.name:
-			raise UserError("Project name is required to create a repository.")
-			
-		# Very basic sanitization: alphanumeric and hyphens/underscores only
-		repo_name = "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in self.name)
+	@api.model
+	def _git_find_by_repository(self, repository):
+		"""
+		Returns the projects linked to a repository as described in GitHub payloads.
+		"""
+		owner = repository.get('owner') or {}
+		owner_login = owner.get('login') or owner.get('name')
+		if not owner_login or not repository.get('name'):
+			return self.browse()
+		return self.search([
+			('git_repository_owner', '=', owner_login),
+			('git_repository_name', '=', repository['name']),
+		])
+
+	def _git_repository_branches(self, client):
+		"""
+		Returns the head sha of every branch of the linked repository, read from
+		the local mirror or from the GitHub branch listing.
+		"""
+		self.ensure_one()
+		if self.git_sync_backend == 'mirror':
+			mirror = self.env['git.github.service']._get_mirror(self)
+			mirror.update()
+			return mirror.heads()
+
+		heads = {}
+		path = f"repos/{self.git_repository_owner}/{self.git_repository_name}/branches"
+		try:
+			for page in fetch_pages(client, path, {'per_page': 100}):
+				if page.status_code != 200:
+					raise UserError(f"GitHub API Error ({page.status_code}): {page.error}")
+				heads.update((branch['name'], (branch.get('commit') or {}).get('sha')) for branch in page.data)
+		except requests.exceptions.RequestException as e:
+			raise UserError(f"Network error listing branches: {str(e)}")
+		return heads
+
+	def _git_reference_matcher(self):
+		"""
+		Returns the matcher of the task references in commit messages for this
+		project, rebuilt only when the project's tasks change.
+		"""
+		self.ensure_one()
+		[(count, last_write)] = self.env['project.task'].with_context(active_test=False)._read_group(
+			[('project_id', '=', self.id)], [], ['__count', 'write_date:max'])
+		stamp = (self.id, count, last_write)
+		matchers = self.env.cr.cache.setdefault('git_reference_matchers', {})
+		if stamp not in matchers:
+			tasks = self.env['project.task'].search_read(
+				[('project_id', '=', self.id)], ['name', 'git_dev_branch', 'create_date'], load=False)
+			matchers[stamp] = TaskReferenceMatcher(
+				(task['id'], task['name'], task['git_dev_branch'], task['create_date']) for task in tasks)
+		return matchers[stamp]
+
+	def _git_repository_slug(self):
+		"""
+		Returns the repository name derived from the project name: alphanumerics,
+		hyphens and underscores only.
+		"""
+		self.ensure_one()
+		repo_name = "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in self.name or '')
 		# Remove duplicate hyphens
 		while '--' in repo_name:
 			repo_name = repo_name.replace('--', '-')
-		repo_name = repo_name.strip('-')
+		return repo_name.strip('-')
 
-		url = "https://api.github.com/user/repos"
-		headers = {
-			"Authorization": f"Bearer {github_token}",
-			"Accept": "application/vnd.github+json",
-			"X-GitHub-Api-Version": "2022-11-28"
-		}
-		data = {
+	def _git_repository_payload(self, repo_name, private=False):
+		"""
+		Returns the body of the GitHub request creating the project's repository.
+		"""
+		self.ensure_one()
+		return {
 			"name": repo_name,
-			"private": False, # Or make this configurable
+			"private": private,
 			"description": f"Repository for Odoo Project: {self.name}",
 			"auto_init": True
 		}
 
+	@api.model
+	def _git_repository_vals(self, repo_data):
+		"""
+		Returns the values linking a project to the repository described by a
+		GitHub repository payload.
+		"""
+		return {
+			'git_repository_name': repo_data.get('name'),
+			'git_repository_url': repo_data.get('html_url'),
+			'git_repository_id': str(repo_data.get('id')),
+			'git_repository_owner': repo_data.get('owner', {}).get('login'),
+			'git_default_branch': repo_data.get('default_branch', 'main'),
+			'git_connection_status': 'connected',
+			'git_connected_on': fields.Datetime.now(),
+		}
+
+	def action_create_repository(self):
+		"""
+		Creates a GitHub repository for this project using a token from company settings.
+		"""
+		self.ensure_one()
+		
+		queued = self.env['git.job']._defer(self, 'action_create_repository', 'create_repository')
+		if queued:
+			return queued
+
+		# 1. Get Client (raises if no token is configured)
+		service = self.env['git.github.service']
+		client = service._get_client(self)
+		with service._instrument(client, 'create_repository', project=self):
+			return self._git_create_repository(client)
+
+	def _git_create_repository(self, client):
+		"""
+		Creates the repository on GitHub with the given client and links it.
+		"""
+		# 2. Sanitize Name
+		if not self.name:
+			raise UserError("Project name is required to create a repository.")
+		repo_name = self._git_repository_slug()
+
+		data = self._git_repository_payload(repo_name)
+
 		try:
-			response = requests.post(url, json=data, headers=headers, timeout=10)
+			response = client.post("user/repos", json=data)
 		except requests.exceptions.RequestException as e:
 			raise UserError(f"Network error connecting to GitHub: {str(e)}")
 
 		if response.status_code == 201:
 			repo_data = response.json()
-			self.write({
-				'git_repository_name': repo_data.get('name'),
-				'git_repository_url': repo_data.get('html_url'),
-				'git_repository_id': str(repo_data.get('id')),
-				'git_repository_owner': repo_data.get('owner', {}).get('login'),
-				'git_default_branch': repo_data.get('default_branch', 'main'),
-				'git_connection_status': 'connected',
-				'git_connected_on': fields.Datetime.now(),
-			})
+			self.write(self._git_repository_vals(repo_data))
 			return {
 				'type': 'ir.actions.client',
 				'tag': 'display_notification',
@@ -89,14 +217,7 @@ class ProjectProject(models.Model):
 				}
 			}
 		else:
-			error_msg = response.text
-			try:
-				error_json = response.json()
-				if 'message' in error_json:
-					error_msg = error_json['message']
-			except ValueError:
-				pass
-			raise UserError(f"GitHub API Error ({response.status_code}): {error_msg}")
+			raise UserError(f"GitHub API Error ({response.status_code}): {error_message(response)}")
 
 	def action_git_assign_repo(self):
 		"""
@@ -105,52 +226,37 @@ class ProjectProject(models.Model):
 		"""
 		self.ensure_one()
 
-		# 1. Get Token
-		github_token = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
-		if not github_token:
-			raise UserError("No GitHub Token found. Please configure it in General Settings.")
+		queued = self.env['git.job']._defer(self, 'action_git_assign_repo', 'assign_repository')
+		if queued:
+			return queued
+
+		# 1. Get Client (raises if no token is configured)
+		service = self.env['git.github.service']
+		client = service._get_client(self)
+		with service._instrument(client, 'assign_repository', project=self):
+			return self._git_assign_repo(client)
 
+	def _git_assign_repo(self, client):
+		"""
+		Looks the repository up on GitHub with the given client and links it.
+		"""
 		# 2. Sanitize Name
 		if not self.name:
 			raise UserError("Project name is required to search for a repository.")
-		repo_name = "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in self.name)
-		while '--' in repo_name:
-			repo_name = repo_name.replace('--', '-')
-		repo_name = repo_name.strip('-')
+		repo_name = self._git_repository_slug()
 
 		# 3. Get Current User (Owner)
-		user_url = "https://api.github.com/user"
-		headers = {
-			"Authorization": f"Bearer {github_token}",
-			"Accept": "application/vnd.github+json",
-			"X-GitHub-Api-Version": "2022-11-28"
-		}
-		
-		try:
-			user_response = requests.get(user_url, headers=headers, timeout=10)
-			user_response.raise_for_status()
-			username = user_response.json().get('login')
-		except requests.exceptions.RequestException as e:
-			raise UserError(f"Failed to fetch GitHub user info: {str(e)}")
+		username = self.env['git.github.service']._get_login(client)
 
 		# 4. Check if Repo Exists
-		repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
 		try:
-			response = requests.get(repo_url, headers=headers, timeout=10)
+			response = client.get(f"repos/{username}/{repo_name}")
 		except requests.exceptions.RequestException as e:
 			raise UserError(f"Network error searching for repository: {str(e)}")
 
 		if response.status_code == 200:
 			repo_data = response.json()
-			self.write({
-				'git_repository_name': repo_data.get('name'),
-				'git_repository_url': repo_data.get('html_url'),
-				'git_repository_id': str(repo_data.get('id')),
-				'git_repository_owner': repo_data.get('owner', {}).get('login'),
-				'git_default_branch': repo_data.get('default_branch', 'main'),
-				'git_connection_status': 'connected',
-				'git_connected_on': fields.Datetime.now(),
-			})
+			self.write(self._git_repository_vals(repo_data))
 			return {
 				'type': 'ir.actions.client',
 				'tag': 'display_notification',
@@ -165,11 +271,222 @@ class ProjectProject(models.Model):
 		elif response.status_code == 404:
 			raise UserError(f"No existing repository found with name '{repo_name}' for user '{username}'.")
 		else:
-			error_msg = response.text
+			raise UserError(f"GitHub API Error ({response.status_code}): {error_message(response)}")
+
+	def action_fetch_git_activity(self):
+		"""
+		Fetches commits and pull requests for every task of the linked projects,
+		with a single GitHub listing per distinct branch.
+		"""
+		projects = self.filtered('git_repository_name')
+		if not projects:
+			raise UserError("The project must be linked to a GitHub repository first.")
+
+		queued = self.env['git.job']._defer(projects, 'action_fetch_git_activity', 'activity')
+		if queued:
+			return queued
+
+		tasks = self.env['project.task'].search([('project_id', 'in', projects.ids)])
+		commit_count, pr_count = tasks._git_sync()
+		params = {
+			'title': 'Success',
+			'message': f'{commit_count} new commits and {pr_count} Pull Requests fetched for {len(tasks)} tasks.',
+			'type': 'success',
+			'sticky': False,
+			'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+		}
+		if projects._git_import_pending():
+			params.update({
+				'title': 'Import Incomplete',
+				'message': f'{commit_count} new commits and {pr_count} Pull Requests fetched for {len(tasks)} tasks. '
+						   'Older history is left to import: fetch again, or let the scheduled sync finish it.',
+				'type': 'warning',
+			})
+		return {
+			'type': 'ir.actions.client',
+			'tag': 'display_notification',
+			'params': params,
+		}
+
+	def _git_import_pending(self):
+		"""
+		Whether a commit history import of the projects was cut at the page limit
+		and is left for the next sync.
+		"""
+		return bool(self.env['git.branch'].search_count(
+			[('project_id', 'in', self.ids), ('import_next_url', '!=', False)], limit=1,
+		))
+
+	def action_git_reconcile_branches(self):
+		"""
+		Refreshes the branch status (active, merged, deleted) of every task of the
+		linked projects.
+		"""
+		projects = self.filtered('git_repository_name')
+		if not projects:
+			raise UserError("The project must be linked to a GitHub repository first.")
+
+		queued = self.env['git.job']._defer(projects, 'action_git_reconcile_branches', 'branch_status')
+		if queued:
+			return queued
+
+		changed = projects._git_reconcile_branches()
+		return {
+			'type': 'ir.actions.client',
+			'tag': 'display_notification',
+			'params': {
+				'title': 'Success',
+				'message': f'Branch status updated on {changed} tasks.',
+				'type': 'success',
+				'sticky': False,
+				'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+			}
+		}
+
+	@api.model
+	def _cron_git_reconcile_branches(self):
+		"""
+		Refreshes the branch status of the tasks of every linked project, one
+		project per transaction. An exhausted rate limit or an open circuit
+		breaker ends the run.
+		"""
+		projects = self.with_context(git_sync_background=True).search([('git_repository_name', '!=', False)])
+		for project in projects:
 			try:
-				error_json = response.json()
-				if 'message' in error_json:
-					error_msg = error_json['message']
-			except ValueError:
-				pass
-			raise UserError(f"GitHub API Error ({response.status_code}): {error_msg}")
+				with self.env.cr.savepoint():
+					project._git_reconcile_branches()
+			except (RateLimitExceeded, CircuitOpen) as e:
+				_logger.warning("GitHub branch status: %s", e)
+				break
+			except UserError as e:
+				_logger.warning("GitHub branch status of project %s failed: %s", project.id, e)
+			self.env.cr.commit()
+
+	def _git_reconcile_branches(self):
+		"""
+		Reconciles the branch status of the tasks of the projects, each run
+		recorded as a git.sync.run. Returns the number of tasks updated.
+		"""
+		service = self.env['git.github.service']
+		changed = 0
+		for project in self:
+			client = service._get_client(project)
+			with service._instrument(client, 'branch_status', project=project) as metrics:
+				changed += project._git_reconcile_branch_status(client, metrics)
+		return changed
+
+	def _git_reconcile_branch_status(self, client, metrics):
+		"""
+		Sets the branch status of the project's tasks from a single listing of the
+		repository's branches: missing branches are deleted, branches merged into
+		the default branch (see `_git_merged_branches`) are merged, the others are
+		active, except the ones left undecided, which keep their status. Tasks are
+		written once per status. Returns the number of tasks updated.
+		"""
+		self.ensure_one()
+		Task = self.env['project.task']
+		tasks = Task.search([
+			('project_id', '=', self.id),
+			('git_dev_branch', '!=', False),
+			('git_dev_branch', '!=', self.git_default_branch),
+		])
+		if not tasks:
+			return 0
+
+		heads = self._git_repository_branches(client)
+		merged, undecided = self._git_merged_branches(client, tasks, heads)
+
+		updates = {}
+		for task in tasks:
+			if task.git_dev_branch not in heads:
+				status = 'deleted'
+			elif task.git_dev_branch in merged:
+				status = 'merged'
+			elif task.git_dev_branch in undecided and task.git_branch_status != 'deleted':
+				continue
+			else:
+				status = 'active'
+			if task.git_branch_status != status:
+				updates[status] = updates.get(status, Task) | task
+
+		with metrics.timer('db'):
+			for status, status_tasks in updates.items():
+				status_tasks.write({'git_branch_status': status})
+		changed = sum(len(status_tasks) for status_tasks in updates.values())
+		metrics.count_rows(updated=changed, skipped=len(tasks) - changed)
+		return changed
+
+	def _git_merged_branches(self, client, tasks, heads):
+		"""
+		Returns the names of the existing dev branches of `tasks` merged into the
+		default branch, and of the ones left undecided, which keep their status.
+		A head the default branch contains only means merged for a branch seen
+		diverged before, or off the default branch's own line, so a branch just
+		created is not mistaken for a merged one.
+		"""
+		self.ensure_one()
+		names = {name for name in tasks.mapped('git_dev_branch') if name in heads}
+		default_branch = self.git_default_branch
+		if not names or default_branch not in heads:
+			return set(), set()
+		branches = {branch.name: branch for branch in self.env['git.branch']._get_or_create_many(self, names)}
+
+		if self.git_sync_backend == 'mirror':
+			mirror = self.env['git.github.service']._get_mirror(self)
+			reachable = names & mirror.merged_heads(default_branch)
+			self.env['git.branch'].union(*(branches[name] for name in names - reachable)).filtered(
+				lambda branch: not branch.diverged).write({'diverged': True})
+			mainline = mirror.first_parent_shas(default_branch)
+			merged = {name for name in reachable if branches[name].diverged or heads[name] not in mainline}
+			return merged, reachable - merged
+
+		pr_statuses = {}
+		for branch_name, status in self.env['git.pull.request']._read_group(
+				[('task_id', 'in', tasks.ids), ('pr_source_branch', 'in', list(branches))],
+				['pr_source_branch', 'pr_status']):
+			pr_statuses.setdefault(branch_name, set()).add(status)
+		merged = {name for name, statuses in pr_statuses.items() if 'merged' in statuses and 'open' not in statuses}
+
+		candidates = {name for name in names if not pr_statuses.get(name, set()) & {'merged', 'open'}}
+		# Diverged heads found in the stored history of the default branch need no request
+		diverged = {name for name in candidates if branches[name].diverged}
+		default = self.env['git.branch'].search([('project_id', '=', self.id), ('name', '=', default_branch)], limit=1)
+		if default and diverged:
+			in_history = set(self.env['git.commit'].search([
+				('branch_ids', 'in', default.ids),
+				('sha', 'in', [heads[name] for name in diverged]),
+			]).mapped('sha'))
+			reached = {name for name in diverged if heads[name] in in_history}
+			merged |= reached
+			candidates -= reached
+
+		# The least recently compared first, so every branch gets its turn
+		to_compare = sorted(candidates, key=lambda name: (
+			branches[name].compared_on or fields.Datetime.to_datetime('1970-01-01'), name,
+		))[:MAX_BRANCH_COMPARES]
+		undecided = candidates.difference(to_compare)
+		base = f"repos/{self.git_repository_owner}/{self.git_repository_name}/compare/{default_branch}..."
+
+		def compare(branch_name):
+			# The first page carries the counts; the commits listed are not needed
+			return itertools.islice(fetch_pages(client, base + branch_name, {'per_page': 1}), 1)
+
+		jobs = {branch_name: functools.partial(compare, branch_name) for branch_name in to_compare}
+		ahead = self.env['git.branch']
+		try:
+			for branch_name, page in self.env['git.github.service']._get_fetch_engine().imap(jobs):
+				if page.status_code != 200:
+					undecided.add(branch_name)
+				elif page.data.get('ahead_by'):
+					ahead |= branches[branch_name]
+				elif branches[branch_name].diverged:
+					merged.add(branch_name)
+				else:
+					undecided.add(branch_name)
+		except requests.exceptions.RequestException as e:
+			raise UserError(f"Network error comparing branches: {str(e)}")
+		self.env['git.branch'].union(*(branches[name] for name in to_compare)).write({'compared_on': fields.Datetime.now()})
+		ahead.filtered(lambda branch: not branch.diverged).write({'diverged': True})
+		if undecided:
+			_logger.info("GitHub branch status of project %s: %s branches left for the next run", self.id, len(undecided))
+		return merged, undecided
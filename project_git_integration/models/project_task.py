@@ -1,11 +1,31 @@
 # -*- coding: utf-8 -*-
 
+import functools
+import logging
+import time
+from datetime import timedelta
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 import requests
 from dateutil import parser
 import pytz
 
+from ..tools.circuit_breaker import CircuitOpen
+from ..tools.fetch_engine import PageBudget, fetch_pages
+from ..tools.github_client import error_message
+from ..tools.github_graphql import CHECKPOINT_PREFIX, iter_activity as iter_graphql_activity
+from ..tools.rate_limit import RateLimitExceeded
+from ..tools.sync_metrics import NULL_METRICS
+from ..tools.task_references import branch_slug
+
+_logger = logging.getLogger(__name__)
+
+# Tasks with commits this recent are synced before the idle ones
+RECENT_ACTIVITY = timedelta(days=7)
+
+# Commits written per statement when syncing from a local mirror
+MIRROR_WRITE_BATCH = 1000
 
 
 class ProjectTask(models.Model):
@@ -30,228 +50,830 @@ class ProjectTask(models.Model):
     git_branch_created_by = fields.Many2one('res.users', string="Branch Created By")
     git_branch_created_on = fields.Datetime(string="Branch Created On")
     git_branch_last_synced = fields.Datetime(string="Last Synced On")
+    git_sync_attempted_on = fields.Datetime(string="Last Background Sync Attempt", index=True, copy=False)
     
     commit_ids = fields.One2many('git.commit.log', 'task_id', string="Commits")
     pr_ids = fields.One2many('git.pull.request', 'task_id', string="Pull Requests")
+    git_commit_count = fields.Integer(string="Commit Count", compute='_compute_git_commit_stats', store=True)
+    git_last_commit_date = fields.Datetime(string="Last Commit", compute='_compute_git_commit_stats', store=True)
+    git_open_pr_count = fields.Integer(string="Open Pull Requests", compute='_compute_git_open_pr_count', store=True)
+    git_job_ids = fields.Many2many('git.job', 'git_job_task_rel', 'task_id', 'job_id', string="GitHub Jobs", copy=False)
+
+    @api.depends('commit_ids')
+    def _compute_git_commit_stats(self):
+        # Commit logs are bulk-inserted in SQL, which marks these fields to
+        # recompute explicitly (see git.commit.log)
+        stats = {
+            task: (count, last_date)
+            for task, count, last_date in self.env['git.commit.log']._read_group(
+                [('task_id', 'in', self.ids)], ['task_id'], ['__count', 'commit_date:max'])
+        }
+        for task in self:
+            task.git_commit_count, task.git_last_commit_date = stats.get(task, (0, False))
 
-    def action_fetch_pull_requests(self):
+    @api.depends('pr_ids.pr_status')
+    def _compute_git_open_pr_count(self):
+        counts = dict(self.env['git.pull.request']._read_group(
+            [('task_id', 'in', self.ids), ('pr_status', '=', 'open')], ['task_id'], ['__count']))
+        for task in self:
+            task.git_open_pr_count = counts.get(task, 0)
+
+    def action_view_git_commits(self):
         """
-        Fetches pull requests from GitHub filtered by the task's dev branch.
+        Opens the task's commits in a paginated, searchable list.
         """
         self.ensure_one()
-        
-        # Check if project is linked
-        if not self.project_id.git_repository_name:
-             raise UserError("The project must be linked to a GitHub repository first.")
+        return {
+            'type': 'ir.actions.act_window',
+            'name': "Commits",
+            'res_model': 'git.commit.log',
+            'view_mode': 'list',
+            'views': [(self.env.ref('project_git_integration.view_git_commit_log_list').id, 'list')],
+            'search_view_id': self.env.ref('project_git_integration.view_git_commit_log_search').id,
+            'domain': [('task_id', '=', self.id)],
+            'context': {'create': False},
+            'limit': 80,
+        }
+
+    def action_view_git_pull_requests(self):
+        """
+        Opens the task's pull requests in a paginated, searchable list.
+        """
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': "Pull Requests",
+            'res_model': 'git.pull.request',
+            'view_mode': 'list',
+            'views': [(self.env.ref('project_git_integration.view_git_pull_request_list').id, 'list')],
+            'search_view_id': self.env.ref('project_git_integration.view_git_pull_request_search').id,
+            'domain': [('task_id', '=', self.id)],
+            'context': {'create': False, 'search_default_open': 1 if self.git_open_pr_count else 0},
+            'limit': 80,
+        }
 
-        # Get Token
-        github_token = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
-        if not github_token:
-            raise UserError("No GitHub Token found. Please configure it in General Settings.")
+    def _git_group_by_branch(self, get_branch, missing_branch_msg, strict=False):
+        """
+        Groups the tasks by (project, branch) so every distinct branch of a repository
+        is fetched once for all the tasks sharing it. In strict mode configuration
+        problems raise; otherwise the tasks that cannot be synced are left out.
+        """
+        groups = {}
+        for task in self:
+            # Check if project is linked
+            if not task.project_id.git_repository_name:
+                if strict:
+                    raise UserError("The project must be linked to a GitHub repository first.")
+                continue
+            branch_name = get_branch(task)
+            if not branch_name:
+                if strict:
+                    raise UserError(missing_branch_msg)
+                continue
+            key = (task.project_id, branch_name)
+            groups[key] = groups.get(key, self.browse()) | task
+        return groups
+
+    def _git_sync(self, commits=True, pull_requests=True, strict=False):
+        """
+        Syncs the commits (one listing per distinct branch, dev or default) and/or
+        the pull requests (one listing per distinct dev branch) of the tasks.
+        REST listings run concurrently, one job per branch; projects using the
+        GraphQL backend get a single job fetching all of their branches with
+        aliased queries, and projects using a local mirror get one fetch and one
+        `git log` for all of their branches' commits. Pages are written here, on
+        the ORM's thread.
+        Returns the number of commits linked and of pull requests created or updated.
+        """
+        # Projects accessed with different tokens get a client each
+        service = self.env['git.github.service']
+        pools = self.project_id.grouped(service._project_tokens)
+        if len(pools) > 1:
+            counts = [
+                self.filtered(lambda task: task.project_id in projects)._git_sync(commits, pull_requests, strict)
+                for projects in pools.values()
+            ]
+            return tuple(map(sum, zip(*counts)))
 
         # Determine Branch
-        branch_name = self.git_dev_branch
-        if not branch_name:
-             raise UserError("No Dev Branch specified to filter Pull Requests.")
-
-        # GitHub API Headers
-        headers = {
-            "Authorization": f"Bearer {github_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
+        # Use dev branch if set, otherwise default branch
+        commit_groups = self._git_group_by_branch(
+            lambda task: task.git_dev_branch or task.project_id.git_default_branch,
+            "No branch specified to fetch commits from.",
+            strict=strict,
+        ) if commits else {}
+        pr_groups = self._git_group_by_branch(
+            lambda task: task.git_dev_branch,
+            "No Dev Branch specified to filter Pull Requests.",
+            strict=strict,
+        ) if pull_requests else {}
+        if not commit_groups and not pr_groups:
+            return 0, 0
+
+        # Get Client (raises if no token is configured)
+        client = service._get_client(self.project_id[:1])
+        operation = 'activity' if commits and pull_requests else 'commits' if commits else 'pull_requests'
+        project = self.project_id if len(self.project_id) == 1 else None
+        with service._instrument(client, operation, project=project, task_count=len(self)):
+            return self._git_run_sync(client, commit_groups, pr_groups, strict=strict)
+
+    def _git_run_sync(self, client, commit_groups, pr_groups, strict=False):
+        """
+        Runs the listings of `_git_sync` with the given client and writes their
+        pages. Outside strict mode, a branch missing on GitHub is left out instead
+        of failing the other branches. All listings share `github_import_max_pages`.
+        Returns the number of commits linked and of pull requests created or updated.
+        """
+        service = self.env['git.github.service']
+        ICP = self.env['ir.config_parameter'].sudo()
+        budget = PageBudget(max(1, int(ICP.get_param('project_git_integration.github_import_max_pages', 50))))
+
+        def tagged(kind, key, job):
+            return ((kind, key, page) for page in job())
+
+        def graphql_job(project, owner, repo, commit_branches, pr_branches):
+            for kind, branch_name, page in iter_graphql_activity(client, owner, repo, commit_branches, pr_branches, budget):
+                yield kind, (project, branch_name), page
+
+        def mirror_job(project, mirror, synced_heads, since, update):
+            if update:
+                mirror.update()
+            for batch in mirror.iter_history(synced_heads, MIRROR_WRITE_BATCH, since):
+                yield 'mirror', project, batch
+
+        # Projects linking by reference ingest every branch of their repository;
+        # listing them already updated the mirrors
+        known_heads = {}
+        updated = set()
+        for project in {project for project, _branch_name in commit_groups if project.git_link_by_reference}:
+            for branch_name, sha in project._git_repository_branches(client).items():
+                commit_groups.setdefault((project, branch_name), self.browse())
+                known_heads[project, branch_name] = sha
+            if project.git_sync_backend == 'mirror':
+                updated.add(project)
+
+        # Mirrored branches are compared locally, without spending API quota
+        probed = {key for key in commit_groups if key[0].git_sync_backend != 'mirror'} | set(pr_groups) | set(known_heads)
+        try:
+            unchanged = self._git_probe_heads(client, probed, known_heads)
+        except requests.exceptions.RequestException as e:
+            raise UserError(f"Network error fetching branch heads: {str(e)}")
+
+        jobs = {}
+        commit_states, pr_states = {}, {}
+        graphql_listings, mirror_listings, mirror_since = {}, {}, {}
+        for key, tasks in commit_groups.items():
+            project, branch_name = key
+            # Prepared even when unchanged: tasks new to the branch are backfilled
+            commit_states[key], job = tasks._git_commit_job(client, project, branch_name, budget)
+            if key in unchanged:
+                continue
+            if project.git_sync_backend == 'mirror':
+                mirror_listings.setdefault(project, {})[branch_name] = commit_states[key]['branch'].head_sha or None
+                if not commit_states[key]['branch'].head_sha and commit_states[key]['since']:
+                    mirror_since.setdefault(project, {})[branch_name] = commit_states[key]['since']
+            elif project.git_sync_backend == 'graphql':
+                since = commit_states[key]['since']
+                checkpoint = commit_states[key]['branch'].import_next_url or ''
+                cursor = checkpoint[len(CHECKPOINT_PREFIX):] if checkpoint.startswith(CHECKPOINT_PREFIX) else None
+                graphql_listings.setdefault(project, ({}, []))[0][branch_name] = (
+                    since and since.strftime('%Y-%m-%dT%H:%M:%SZ'), cursor,
+                )
+            else:
+                jobs['commits', key] = functools.partial(tagged, 'commits', key, job)
+        for key, tasks in pr_groups.items():
+            project, branch_name = key
+            if key in unchanged and tasks._git_pull_requests_settled(branch_name):
+                continue
+            if project.git_sync_backend == 'graphql':
+                pr_states[key] = {'metrics': client.metrics or NULL_METRICS}
+                graphql_listings.setdefault(project, ({}, []))[1].append(branch_name)
+            else:
+                pr_states[key], job = tasks._git_pull_request_job(client, project, branch_name)
+                jobs['pull_requests', key] = functools.partial(tagged, 'pull_requests', key, job)
+        for project, (commit_branches, pr_branches) in graphql_listings.items():
+            jobs['graphql', project] = functools.partial(
+                graphql_job, project, project.git_repository_owner, project.git_repository_name,
+                commit_branches, pr_branches,
+            )
+        for project, synced_heads in mirror_listings.items():
+            jobs['mirror', project] = functools.partial(
+                mirror_job, project, service._get_mirror(project), synced_heads, mirror_since.get(project, {}),
+                project not in updated,
+            )
+
+        new_commits = new_prs = 0
+        try:
+            for _job, (kind, key, page) in service._get_fetch_engine().imap(jobs):
+                if kind == 'mirror':
+                    branch_name, head, batch = page
+                    new_commits += commit_groups[key, branch_name]._git_apply_mirror_batch(
+                        commit_states[key, branch_name], head, batch,
+                    )
+                elif kind == 'commits':
+                    if page.status_code == 404 and not strict:
+                        _logger.warning("Branch '%s' of project %s not found on GitHub, skipped", key[1], key[0].id)
+                        commit_states[key]['missing'] = True
+                        continue
+                    new_commits += commit_groups[key]._git_apply_commit_page(commit_states[key], page)
+                else:
+                    new_prs += pr_groups[key]._git_apply_pull_request_page(pr_states[key], page)
+        except requests.exceptions.RequestException as e:
+            subject = "commits" if not pr_groups else "Pull Requests" if not commit_groups else "GitHub activity"
+            raise UserError(f"Network error fetching {subject}: {str(e)}")
+
+        with (client.metrics or NULL_METRICS).timer('db'):
+            for key, tasks in commit_groups.items():
+                if not commit_states[key].get('missing'):
+                    tasks._git_finish_commit_sync(commit_states[key])
+        return new_commits, new_prs
+
+    @api.model
+    def _git_cron_candidates(self):
+        """
+        Returns the tasks due for a background sync: the ones of linked projects not
+        attempted within their project's sync interval. Tasks with open pull requests
+        come first, then the ones pushed to within `RECENT_ACTIVITY`, then the
+        stalest; tasks whose branch is merged come last.
+        """
+        now = fields.Datetime.now()
+        tasks = self.browse()
+        projects = self.env['project.project'].search([
+            ('git_repository_name', '!=', False),
+            ('git_sync_interval', '>', 0),
+        ])
+        for project in projects:
+            tasks |= self.search([
+                ('project_id', '=', project.id),
+                ('git_branch_status', '!=', 'deleted'),
+                '|', ('git_sync_attempted_on', '=', False),
+                ('git_sync_attempted_on', '<', now - timedelta(minutes=project.git_sync_interval)),
+            ])
+        if not tasks:
+            return tasks
+
+        with_open_prs = {
+            task for [task] in self.env['git.pull.request']._read_group(
+                [('task_id', 'in', tasks.ids), ('pr_status', '=', 'open')], ['task_id'])
         }
+        recent = now - RECENT_ACTIVITY
+        return tasks.sorted(lambda task: (
+            task.git_branch_status == 'merged',
+            task not in with_open_prs,
+            not (task.git_last_commit_date and task.git_last_commit_date >= recent),
+            task.git_sync_attempted_on or fields.Datetime.to_datetime('1970-01-01'),
+        ))
+
+    @api.model
+    def _cron_git_sync(self):
+        """
+        Syncs the tasks due for it (see `_git_cron_candidates`) in batches, until
+        none is left or the run's time budget is spent. Each batch is marked as
+        attempted and committed before calling GitHub, then committed with its
+        results, so an interrupted run resumes with the tasks it did not reach.
+        A failing batch is retried task by task so a broken branch does not hold
+        back the others; an exhausted rate limit or an open circuit breaker ends
+        the run.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        batch_size = max(1, int(ICP.get_param('project_git_integration.github_sync_batch_size', 50)))
+        deadline = time.monotonic() + float(ICP.get_param('project_git_integration.github_sync_time_budget', 240))
+
+        tasks = self.with_context(git_sync_background=True)._git_cron_candidates()
+        for start in range(0, len(tasks), batch_size):
+            if time.monotonic() >= deadline:
+                _logger.info("GitHub sync: time budget spent, %s tasks left for the next run", len(tasks) - start)
+                break
+            batch = tasks[start:start + batch_size]
+            batch.write({'git_sync_attempted_on': fields.Datetime.now()})
+            self.env.cr.commit()
+            try:
+                if not batch._git_cron_sync_batch(deadline):
+                    break
+            finally:
+                self.env.cr.commit()
 
-        owner = self.project_id.git_repository_owner
-        repo = self.project_id.git_repository_name
+    def _git_cron_sync_batch(self, deadline):
+        """
+        Syncs one batch of the scheduled sync, falling back to one task at a time
+        when the batch fails. Returns False when the run must stop.
+        """
+        try:
+            with self.env.cr.savepoint():
+                self._git_sync()
+            return True
+        except (RateLimitExceeded, CircuitOpen) as e:
+            _logger.warning("GitHub sync: %s", e)
+            return False
+        except UserError as e:
+            if len(self) == 1:
+                _logger.warning("GitHub sync of task %s failed: %s", self.id, e)
+                return True
+        for task in self:
+            if time.monotonic() >= deadline or not task._git_cron_sync_batch(deadline):
+                return False
+        return True
+
+    @api.model
+    def _git_probe_heads(self, client, keys, known_heads=None):
+        """
+        Asks GitHub for the head of every (project, branch) of `keys` already synced
+        once, with one small ref request each, and returns the keys whose head is
+        still the one of the last sync. Their listings can be skipped. Branches that
+        are missing or fail to answer are not returned, so their regular sync runs
+        and reports the problem. Heads already known (e.g. from a branch listing)
+        are given in `known_heads` and not requested again.
+        """
+        known_heads = known_heads or {}
+        projects = self.env['project.project'].union(*(project for project, _branch_name in keys))
+        branches = {
+            (branch.project_id, branch.name): branch
+            for branch in self.env['git.branch'].search([
+                ('project_id', 'in', projects.ids),
+                ('name', 'in', list({branch_name for _project, branch_name in keys})),
+                ('head_sha', '!=', False),
+                ('import_next_url', '=', False),
+            ])
+        }
+        jobs = {
+            key: functools.partial(
+                fetch_pages, client,
+                f"repos/{key[0].git_repository_owner}/{key[0].git_repository_name}/git/ref/heads/{key[1]}",
+            )
+            for key in keys if key in branches and key not in known_heads
+        }
+        unchanged = {
+            key for key, sha in known_heads.items()
+            if key in keys and key in branches and sha == branches[key].head_sha
+        }
+        for key, page in self.env['git.github.service']._get_fetch_engine().imap(jobs):
+            if page.status_code == 200 and isinstance(page.data, dict):
+                if (page.data.get('object') or {}).get('sha') == branches[key].head_sha:
+                    unchanged.add(key)
+        return unchanged
+
+    def _git_pull_requests_settled(self, branch_name):
+        """
+        Whether the pull requests of the branch cannot have changed while its head
+        did not move: every task of `self` has them and all of them are merged.
+        Merged pull requests are final and GitHub refuses a new one without new
+        commits, whereas open or closed ones may still change.
+        """
+        statuses = {}
+        for task, status in self.env['git.pull.request']._read_group(
+                [('task_id', 'in', self.ids), ('pr_source_branch', '=', branch_name)],
+                ['task_id', 'pr_status']):
+            statuses.setdefault(task, set()).add(status)
+        return all(statuses.get(task) == {'merged'} for task in self)
+
+    def action_fetch_pull_requests(self):
+        """
+        Fetches pull requests from GitHub filtered by the tasks' dev branch, recording
+        status changes of the known ones. Tasks sharing a branch are served by a
+        single listing.
+        """
+        queued = self.env['git.job']._defer(self, 'action_fetch_pull_requests', 'pull_requests')
+        if queued:
+            return queued
+        new_count = self._git_fetch_pull_requests(strict=len(self) == 1)
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Success',
+                'message': f'{new_count} Pull Requests fetched or updated successfully!',
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
+
+    def _git_fetch_pull_requests(self, strict=False):
+        """
+        Syncs the pull requests of the tasks, one listing per distinct dev branch.
+        Returns the number of records created or updated.
+        """
+        return self._git_sync(commits=False, strict=strict)[1]
+
+    def _git_pull_request_job(self, client, project, branch_name):
+        """
+        Prepares the listing of one branch's pull requests; returns its sync state and job.
+        """
+        owner = project.git_repository_owner
+        repo = project.git_repository_name
         
         # API URL to list PRs
         # Filter by head={owner}:{branch_name}
         # Note: head parameter expects 'user:branch-name' or 'branch-name' for same repo
-        url = f"https://api.github.com/repos/{owner}/{repo}/pulls"
+        url = f"repos/{owner}/{repo}/pulls"
         params = {
             'head': f"{owner}:{branch_name}", # Filter by exact source branch
             'state': 'all', # open, closed, merged (merged are closed with merged_at set)
             'per_page': 100
         }
-
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
+        fallback_params = dict(params, head=branch_name)
+
+        service = self.env['git.github.service']
+        cache_key, headers = service._conditional_headers(client, url, params=params, scope=self)
+        fallback_key, fallback_headers = service._conditional_headers(client, url, params=fallback_params, scope=self)
+        # A 304 replays the stored listing, which only needs the fallback if it was empty
+        cached_empty = service._cached_empty(cache_key)
+
+        def job():
+            pages = fetch_pages(client, url, params, headers, cache_key)
+            first = next(pages)
+            yield first
             # Fallback: if no PRs found with owner:branch, try with just branch name
-            if response.status_code == 200 and not response.json():
-                 params['head'] = branch_name
-                 response = requests.get(url, headers=headers, params=params, timeout=10)
-                 
-        except requests.exceptions.RequestException as e:
+            if (first.status_code == 304 and cached_empty) or (first.status_code == 200 and not first.data):
+                yield from fetch_pages(client, url, fallback_params, fallback_headers, fallback_key)
+            else:
+                yield from pages
 
-             raise UserError(f"Network error fetching Pull Requests: {str(e)}")
-
-        if response.status_code == 200:
-            prs_data = response.json()
-            
-            existing_prs = self.pr_ids.mapped('pr_number')
-            new_prs = []
-            
-            for pr in prs_data:
-                number = pr.get('number')
-                if number in existing_prs:
-                    # Update existing? For now, skip or maybe update status
-                    # To allow updates, we'd need to fetch the record and write. 
-                    # Let's simple skip creation for now as per prompt "assign field value automatically"
-                    continue
-                
-                # Parsing dates
-                created_on = parser.parse(pr.get('created_at')).astimezone(pytz.UTC).replace(tzinfo=None) if pr.get('created_at') else False
-                merged_on = parser.parse(pr.get('merged_at')).astimezone(pytz.UTC).replace(tzinfo=None) if pr.get('merged_at') else False
-                
-                # Status mapping
-                status = pr.get('state') # open, closed
-                if pr.get('merged_at'):
-                    status = 'merged'
-                
-                # Try to find user
-                user_id = False
-                user_login = pr.get('user', {}).get('login')
-                # Simple lookup by login name if we stored it somewhere, or maybe email if exposed (usually not in list view)
-                # Here we will leave it empty unless we want to search res.users by name/login
-                
-                vals = {
-                    'pr_number': number,
-                    'pr_title': pr.get('title'),
-                    'pr_url': pr.get('html_url'),
-                    'pr_status': status,
-                    'pr_source_branch': pr.get('head', {}).get('ref'),
-                    'pr_target_branch': pr.get('base', {}).get('ref'),
-                    'pr_created_on': created_on,
-                    'pr_merged_on': merged_on,
-                    'task_id': self.id
-                }
-                new_prs.append(vals)
-            
-            if new_prs:
-                self.env['git.pull.request'].create(new_prs)
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Success',
-                    'message': f'{len(new_prs)} Pull Requests fetched successfully!',
-                    'type': 'success',
-                    'sticky': False,
-                    'next': {'type': 'ir.actions.client', 'tag': 'reload'},
-                }
-            }
-        else:
-            error_msg = response.text
-            try:
-                error_json = response.json()
-                if 'message' in error_json:
-                    error_msg = error_json['message']
-            except ValueError:
-                pass
-            raise UserError(f"GitHub API Error ({response.status_code}): {error_msg}")
+        return {'url': client.url(url), 'metrics': client.metrics or NULL_METRICS}, job
 
-    def action_fetch_commits(self):
+    def _git_apply_pull_request_page(self, state, page):
+        """
+        Syncs the pull requests of one listing page on every task of `self`.
+        Returns the number of records created or updated.
+        """
+        # 304: unchanged since the last sync, nothing to parse
+        if page.status_code == 304:
+            return 0
+        if page.status_code != 200:
+            raise UserError(f"GitHub API Error ({page.status_code}): {page.error}")
+        metrics = state['metrics']
+        if page.cache_key:
+            with metrics.timer('db'):
+                self.env['git.github.service']._store_validators(page.cache_key, state['url'], page.headers, empty=not page.data)
+
+        prs_data = page.data
+        if not prs_data:
+            return 0
+        with metrics.timer('parse'):
+            prs_vals = [self._git_prepare_pr_vals(pr) for pr in prs_data]
+        with metrics.timer('db'):
+            created, updated = self.env['git.pull.request']._upsert_for_tasks(self, prs_vals)
+        metrics.count_rows(inserted=created, updated=updated, skipped=len(prs_vals) * len(self) - created - updated)
+        return created + updated
+
+    def _git_upsert_pull_requests(self, prs_vals):
+        """
+        Creates the given pull requests (git.pull.request values without task) on
+        every task of `self` that does not have them yet and updates the ones whose
+        state changed. Returns the number of records created or updated.
+        """
+        created, updated = self.env['git.pull.request']._upsert_for_tasks(self, prs_vals)
+        return created + updated
 
+    @api.model
+    def _git_prepare_pr_vals(self, pr):
         """
-        Fetches commits from the linked GitHub branch for this task.
+        Maps a pull request of the GitHub REST listing to git.pull.request values.
         """
-        self.ensure_one()
+        # Parsing dates
+        created_on = parser.parse(pr.get('created_at')).astimezone(pytz.UTC).replace(tzinfo=None) if pr.get('created_at') else False
+        merged_on = parser.parse(pr.get('merged_at')).astimezone(pytz.UTC).replace(tzinfo=None) if pr.get('merged_at') else False
         
-        # Check if project is linked
-        if not self.project_id.git_repository_name:
-             raise UserError("The project must be linked to a GitHub repository first.")
+        # Status mapping
+        status = pr.get('state') # open, closed
+        if pr.get('merged_at'):
+            status = 'merged'
+        
+        return {
+            'pr_number': pr.get('number'),
+            'pr_title': pr.get('title'),
+            'pr_url': pr.get('html_url'),
+            'pr_status': status,
+            'pr_source_branch': pr.get('head', {}).get('ref'),
+            'pr_target_branch': pr.get('base', {}).get('ref'),
+            'pr_created_on': created_on,
+            'pr_merged_on': merged_on,
+            'pr_updated_on': parser.parse(pr.get('updated_at')).astimezone(pytz.UTC).replace(tzinfo=None) if pr.get('updated_at') else False,
+            'pr_author_login': (pr.get('user') or {}).get('login'),
+        }
 
-        # Get Token
-        github_token = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
-        if not github_token:
-            raise UserError("No GitHub Token found. Please configure it in General Settings.")
+    def action_fetch_commits(self):
 
-        # Determine Branch
-        # Use dev branch if set, otherwise default branch
-        branch_name = self.git_dev_branch or self.project_id.git_default_branch
-        if not branch_name:
-             raise UserError("No branch specified to fetch commits from.")
-
-        # GitHub API Headers
-        headers = {
-            "Authorization": f"Bearer {github_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
+        """
+        Fetches commits from the linked GitHub branch of the tasks.
+        Tasks sharing a branch (e.g. through the project's default branch) are served
+        by a single listing, whose commits are fanned out to all of them.
+        """
+        queued = self.env['git.job']._defer(self, 'action_fetch_commits', 'commits')
+        if queued:
+            return queued
+        new_count = self._git_fetch_commits(strict=len(self) == 1)
+        
+        params = {
+            'title': 'Success',
+            'message': f'{new_count} new commits fetched successfully!',
+            'type': 'success',
+            'sticky': False,
+            'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+        }
+        if self.project_id._git_import_pending():
+            params.update({
+                'title': 'Import Incomplete',
+                'message': f'{new_count} new commits fetched. Older history is left to import: '
+                           'fetch again, or let the scheduled sync finish it.',
+                'type': 'warning',
+            })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': params,
         }
 
-        owner = self.project_id.git_repository_owner
-        repo = self.project_id.git_repository_name
+    def _git_fetch_commits(self, strict=False):
+        """
+        Syncs the commits of the tasks, one listing per distinct branch.
+        Returns the number of records created.
+        """
+        return self._git_sync(pull_requests=False, strict=strict)[0]
+
+    def _git_commit_job(self, client, project, branch_name, budget):
+        """
+        Prepares the listing of one branch's commits newer than its high-water mark,
+        or resumes an unfinished one; returns its sync state and job.
+        """
+        owner = project.git_repository_owner
+        repo = project.git_repository_name
+        branch = self.env['git.branch']._get_or_create(project, branch_name)
+
+        # Tasks new to the branch get the history already stored for it
+        with (client.metrics or NULL_METRICS).timer('db'):
+            self._git_backfill_from_store(branch)
         
         # API URL to list commits
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits"
+        url = f"repos/{owner}/{repo}/commits"
         params = {
             'sha': branch_name,
-            'per_page': 100 # Limit to last 100 for now
+            'per_page': 100
+        }
+        since = branch.head_sha and branch.last_commit_date
+        if not since and not self and project.git_link_by_reference:
+            # Only ingested for its references: older commits cannot refer to a task
+            since = project._git_reference_matcher().oldest
+        if since:
+            params['since'] = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        state = {
+            'url': client.url(url),
+            'since': since,
+            'branch': branch,
+            'head_sha': branch.import_head_sha or False,
+            'last_commit_date': branch.import_last_commit_date or branch.last_commit_date,
+            'next_url': False,
+            'metrics': client.metrics or NULL_METRICS,
         }
+        if branch.import_next_url and not branch.import_next_url.startswith(CHECKPOINT_PREFIX):
+            resume_url = branch.import_next_url
+            return state, lambda: budget.bounded(fetch_pages(client, resume_url))
 
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-        except requests.exceptions.RequestException as e:
-             raise UserError(f"Network error fetching commits: {str(e)}")
-
-        if response.status_code == 200:
-            commits_data = response.json()
-            
-            # Create commit records
-            # We want to avoid duplicates. We can check by hash for this task.
-            existing_hashes = self.commit_ids.mapped('commit_hash')
-            
-            new_commits = []
-            for commit in commits_data:
-                sha = commit.get('sha')
-                if sha in existing_hashes:
-                    continue
-                
-                commit_info = commit.get('commit', {})
-                author_info = commit_info.get('author', {})
-                
-                vals = {
-                    'commit_hash': sha,
-                    'commit_message': commit_info.get('message'),
-                    'commit_author': author_info.get('name'),
-                    'commit_date': parser.parse(author_info.get('date')).astimezone(pytz.UTC).replace(tzinfo=None),
-                    'commit_url': commit.get('html_url'),
-
-
-                    'branch_name': branch_name,
-                    'task_id': self.id
-                }
-                new_commits.append(vals)
-            
-            if new_commits:
-                self.env['git.commit.log'].create(new_commits)
-            
-            self.git_branch_last_synced = fields.Datetime.now()
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Success',
-                    'message': f'{len(new_commits)} new commits fetched successfully!',
-                    'type': 'success',
-                    'sticky': False,
-                    'next': {'type': 'ir.actions.client', 'tag': 'reload'},
-                }
-            }
-        elif response.status_code == 404:
+        # Scoped to the branch: tasks new to it are backfilled from the store on a 304
+        cache_key, headers = self.env['git.github.service']._conditional_headers(client, url, params=params, scope=branch)
+        return state, lambda: budget.bounded(fetch_pages(client, url, params, headers, cache_key))
+
+    def _git_apply_commit_page(self, state, page):
+        """
+        Stores the commits of one listing page and links them to every task of
+        `self` that does not have them yet. Returns the number of links created.
+        """
+        branch_name = state['branch'].name
+
+        # 304: unchanged since the last sync, nothing to parse
+        if page.status_code == 304:
+            return 0
+        if page.status_code == 404:
              raise UserError(f"Branch '{branch_name}' not found on GitHub.")
+        if page.status_code != 200:
+            raise UserError(f"GitHub API Error ({page.status_code}): {page.error}")
+        metrics = state['metrics']
+        if page.cache_key:
+            with metrics.timer('db'):
+                self.env['git.github.service']._store_validators(page.cache_key, state['url'], page.headers)
+
+        commits_data = page.data
+        state['next_url'] = page.next_url
+        if not commits_data:
+            return 0
+        state['head_sha'] = state['head_sha'] or commits_data[0].get('sha')
+
+        with metrics.timer('parse'):
+            commits_vals = [self._git_prepare_commit_vals(commit) for commit in commits_data]
+            # The cursor follows the committer dates, which `since` filters on:
+            # rebased commits keep older author dates
+            committed_dates = [self._git_committed_date(commit) for commit in commits_data]
+        for committed_date in committed_dates:
+            if not state['last_commit_date'] or committed_date > state['last_commit_date']:
+                state['last_commit_date'] = committed_date
+
+        # Insert page by page so memory does not grow with the branch history
+        with metrics.timer('db'):
+            created = self._git_create_commits(state['branch'], commits_vals)
+        metrics.count_rows(inserted=created, skipped=len(commits_vals) * len(self) - created)
+        return created
+
+    def _git_apply_mirror_batch(self, state, head, commits):
+        """
+        Links a batch of commits read from the project's mirror to the tasks of `self`.
+        Returns the number of links created.
+        """
+        branch = state['branch']
+        if not head:
+            raise UserError(f"Branch '{branch.name}' not found in the repository.")
+        repository_url = branch.project_id.git_repository_url or ''
+        commit_url = repository_url.removesuffix('.git').rstrip('/') if repository_url.startswith(('http://', 'https://')) else False
+        metrics = state['metrics']
+        with metrics.timer('parse'):
+            commits_vals = [
+                {'sha': sha, 'message': message, 'author': author, 'date': date,
+                 'url': commit_url and f"{commit_url}/commit/{sha}"}
+                for sha, _parents, author, date, message in commits
+            ]
+        if head != branch.head_sha:
+            state['head_sha'] = head
+        for vals in commits_vals:
+            if not state['last_commit_date'] or vals['date'] > state['last_commit_date']:
+                state['last_commit_date'] = vals['date']
+        if not commits_vals:
+            return 0
+
+        with metrics.timer('db'):
+            created = self._git_create_commits(branch, commits_vals)
+        metrics.count_rows(inserted=created, skipped=len(commits_vals) * len(self) - created)
+        return created
+
+    def _git_create_commits(self, branch, commits_vals):
+        """
+        Stores the given commits (git.commit values) once for the repository, adds
+        them to the branch and links them to every task of `self` that does not have
+        them yet, in one batch, as well as to the tasks their messages refer to when
+        the project links commits by reference. Duplicates are dropped by the
+        database, so the cost does not depend on the existing history. Returns the
+        number of links created.
+        """
+        project = branch.project_id
+        commits = self.env['git.commit']._upsert(project._git_repository_key(), commits_vals)
+        commits._add_to_branch(branch)
+        links = [(task.id, commit) for commit in commits for task in self]
+        if project.git_link_by_reference:
+            # Also link every task the message refers to, whatever its branch
+            matcher = project._git_reference_matcher()
+            links += [(task_id, commit) for commit in commits for task_id in matcher.match(commit.message, commit.date)]
+        rows = [
+            {'task_id': task_id, 'commit_id': commit.id, 'commit_hash': commit.sha,
+             'commit_date': commit.date, 'branch_name': branch.name}
+            for task_id, commit in links
+        ]
+        return len(self.env['git.commit.log']._insert_ignore_existing(rows))
+
+    def _git_backfill_from_store(self, branch):
+        """
+        Links the commits already stored for the branch to the tasks of `self` that
+        do not have its synced head yet (e.g. a task newly falling back to the
+        default branch), without calling GitHub.
+        """
+        if not branch.head_sha:
+            return 0
+        up_to_date = {
+            row['task_id']
+            for row in self.env['git.commit.log'].search_read(
+                [('task_id', 'in', self.ids), ('commit_hash', '=', branch.head_sha)], ['task_id'], load=False)
+        }
+        lagging = self.filtered(lambda task: task.id not in up_to_date)
+        if not lagging:
+            return 0
+        return self.env['git.commit.log']._insert_from_branch(lagging, branch)
+
+    def _git_finish_commit_sync(self, state):
+        """
+        Moves the branch's high-water mark once all of its pages have been written,
+        or records where the next sync resumes when the listing was cut short.
+        """
+        now = fields.Datetime.now()
+        if state.get('next_url'):
+            state['branch'].write({
+                'import_next_url': state['next_url'],
+                'import_head_sha': state['head_sha'],
+                'import_last_commit_date': state['last_commit_date'],
+                'last_synced_on': now,
+            })
+            return
+        branch_vals = {
+            'last_commit_date': state['last_commit_date'],
+            'last_synced_on': now,
+            'import_next_url': False,
+            'import_head_sha': False,
+            'import_last_commit_date': False,
+        }
+        if state['head_sha']:
+            branch_vals['head_sha'] = state['head_sha']
+        state['branch'].write(branch_vals)
+        self.write({'git_branch_last_synced': now})
+
+    @api.model
+    def _git_prepare_commit_vals(self, commit):
+        """
+        Maps a commit of the GitHub REST listing to git.commit values.
+        """
+        commit_info = commit.get('commit', {})
+        author_info = commit_info.get('author', {})
+        return {
+            'sha': commit.get('sha'),
+            'message': commit_info.get('message'),
+            'author': author_info.get('name'),
+            'date': parser.parse(author_info.get('date')).astimezone(pytz.UTC).replace(tzinfo=None),
+            'url': commit.get('html_url'),
+        }
+
+    def _git_committed_date(self, commit):
+        """
+        Returns the committer date of a commit of the GitHub REST listing, or its
+        author date when missing.
+        """
+        commit_info = commit.get('commit', {})
+        date = (commit_info.get('committer') or {}).get('date') or (commit_info.get('author') or {}).get('date')
+        return parser.parse(date).astimezone(pytz.UTC).replace(tzinfo=None)
+
+    @api.model
+    def _git_branch_tasks(self, project, branch_name):
+        """
+        Returns the tasks of the project whose commits come from the given branch:
+        its dev branch, or the project's default branch when none is set.
+        """
+        if branch_name == project.git_default_branch:
+            branch_domain = ['|', ('git_dev_branch', '=', branch_name), ('git_dev_branch', '=', False)]
         else:
-            error_msg = response.text
-            try:
-                error_json = response.json()
-                if 'message' in error_json:
-                    error_msg = error_json['message']
-            except ValueError:
-                pass
-            raise UserError(f"GitHub API Error ({response.status_code}): {error_msg}")
+            branch_domain = [('git_dev_branch', '=', branch_name)]
+        return self.search([('project_id', '=', project.id)] + branch_domain)
+
+    @api.model
+    def _git_webhook_push(self, payload):
+        """
+        Ingests a GitHub `push` webhook payload: creates its commits on the tasks
+        working on the pushed branch. Returns the number of records created.
+        """
+        ref = payload.get('ref') or ''
+        if not ref.startswith('refs/heads/'):
+            return 0  # tag pushes
+        branch_name = ref[len('refs/heads/'):]
+
+        new_count = 0
+        for project in self.env['project.project']._git_find_by_repository(payload.get('repository') or {}):
+            tasks = self._git_branch_tasks(project, branch_name)
+            if payload.get('deleted'):
+                tasks.filtered(lambda task: task.git_dev_branch == branch_name).write({'git_branch_status': 'deleted'})
+                continue
+
+            commits_vals = [self._git_prepare_push_commit_vals(commit) for commit in payload.get('commits') or []]
+            if not commits_vals:
+                continue
+            # Tasks never synced get their full history from the next regular sync
+            branch = self.env['git.branch']._get_or_create(project, branch_name)
+            new_count += tasks.filtered('git_branch_last_synced')._git_create_commits(branch, commits_vals)
+
+            # Only move the high-water mark when the push continues the synced head,
+            # otherwise the next regular sync still has to fill the gap
+            if branch.head_sha and branch.head_sha == payload.get('before'):
+                branch.write({
+                    'head_sha': payload.get('after'),
+                    'last_commit_date': max([branch.last_commit_date] + [vals['date'] for vals in commits_vals]),
+                })
+        return new_count
+
+    @api.model
+    def _git_webhook_pull_request(self, payload):
+        """
+        Ingests a GitHub `pull_request` webhook payload: creates the pull request on
+        the tasks working on its head branch, or updates it where it changed.
+        Returns the number of records created or updated.
+        """
+        pr = payload.get('pull_request') or {}
+        branch_name = pr.get('head', {}).get('ref')
+        if not branch_name or not pr.get('number'):
+            return 0
+        vals = self._git_prepare_pr_vals(pr)
+
+        new_count = 0
+        for project in self.env['project.project']._git_find_by_repository(payload.get('repository') or {}):
+            tasks = self.search([('project_id', '=', project.id), ('git_dev_branch', '=', branch_name)])
+            new_count += tasks._git_upsert_pull_requests([vals])
+        return new_count
+
+    @api.model
+    def _git_prepare_push_commit_vals(self, commit):
+        """
+        Maps a commit of a GitHub push payload to git.commit values.
+        """
+        return {
+            'sha': commit.get('id'),
+            'message': commit.get('message'),
+            'author': (commit.get('author') or {}).get('name'),
+            'date': parser.parse(commit.get('timestamp')).astimezone(pytz.UTC).replace(tzinfo=None),
+            'url': commit.get('url'),
+        }
 
 
     def action_create_custom_branch(self):
@@ -264,39 +886,31 @@ class ProjectTask(models.Model):
         if not self.project_id.git_repository_name:
             raise UserError("The project must be linked to a GitHub repository first.")
 
-        # Get Token
-        github_token = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
-        if not github_token:
-            raise UserError("No GitHub Token found. Please configure it in General Settings.")
+        queued = self.env['git.job']._defer(self, 'action_create_custom_branch', 'create_branch')
+        if queued:
+            return queued
+        service = self.env['git.github.service']
+        # Get Client (raises if no token is configured)
+        client = service._get_client(self.project_id)
+        with service._instrument(client, 'create_branch', project=self.project_id, task_count=1):
+            return self._git_create_custom_branch(client)
 
+    def _git_create_custom_branch(self, client):
+        """
+        Creates the task's branch on GitHub with the given client.
+        """
         # Sanitize Task Name for Branch
-        # Format: task-{id}-{name}
-        task_name_clean = "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in self.name)
-        while '--' in task_name_clean:
-            task_name_clean = task_name_clean.replace('--', '-')
-        task_name_clean = task_name_clean.strip('-').lower()
-        
-        branch_name = task_name_clean
-        # Truncate if too long (optional, but safe)
-        if len(branch_name) > 100:
-            branch_name = branch_name[:100]
-
-        # GitHub API Headers
-        headers = {
-            "Authorization": f"Bearer {github_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        branch_name = branch_slug(self.name)
 
         owner = self.project_id.git_repository_owner
         repo = self.project_id.git_repository_name
         default_branch = self.project_id.git_default_branch or 'main'
 
         # 1. Get SHA of default branch
-        ref_url = f"https://api.github.com/repos/{owner}/{repo}/git/refs/heads/{default_branch}"
+        ref_url = f"repos/{owner}/{repo}/git/refs/heads/{default_branch}"
         
         try:
-            ref_response = requests.get(ref_url, headers=headers, timeout=10)
+            ref_response = client.get(ref_url)
             if ref_response.status_code == 404:
                  raise UserError(f"Default branch '{default_branch}' not found in repository.")
             ref_response.raise_for_status()
@@ -305,14 +919,14 @@ class ProjectTask(models.Model):
             raise UserError(f"Failed to fetch default branch info: {str(e)}")
 
         # 2. Create New Branch (Reference)
-        create_ref_url = f"https://api.github.com/repos/{owner}/{repo}/git/refs"
+        create_ref_url = f"repos/{owner}/{repo}/git/refs"
         data = {
             "ref": f"refs/heads/{branch_name}",
             "sha": sha
         }
 
         try:
-            create_response = requests.post(create_ref_url, json=data, headers=headers, timeout=10)
+            create_response = client.post(create_ref_url, json=data)
         except requests.exceptions.RequestException as e:
              raise UserError(f"Failed to create branch: {str(e)}")
 
@@ -345,11 +959,4 @@ class ProjectTask(models.Model):
         elif create_response.status_code == 422:
              raise UserError(f"Branch '{branch_name}' already exists.")
         else:
-            error_msg = create_response.text
-            try:
-                error_json = create_response.json()
-                if 'message' in error_json:
-                    error_msg = error_json['message']
-            except ValueError:
-                pass
-            raise UserError(f"GitHub API Error ({create_response.status_code}): {error_msg}")
+            raise UserError(f"GitHub API Error ({create_response.status_code}): {error_message(create_response)}")
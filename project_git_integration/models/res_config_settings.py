@@ -4,16 +4,62 @@ class ResConfigSettings(models.TransientModel):
     _inherit = "res.config.settings"
 
     github_token = fields.Char(string="GitHub Token")
+    github_webhook_secret = fields.Char(string="GitHub Webhook Secret")
+    github_api_url = fields.Char(string="GitHub API URL", default="https://api.github.com")
+    github_timeout = fields.Float(string="GitHub Request Timeout (s)", default=10)
+    github_max_retries = fields.Integer(string="GitHub Max Retries", default=3)
+    github_retry_backoff = fields.Float(string="GitHub Retry Backoff Factor", default=0.5)
+    github_pool_size = fields.Integer(string="GitHub Connection Pool Size", default=10)
+    github_max_workers = fields.Integer(string="GitHub Concurrent Requests", default=4)
+    github_rate_limit_reserve = fields.Integer(string="Rate Limit Reserved for Users", default=200)
+    github_rate_limit_max_wait = fields.Float(string="Max Wait on Rate Limit (s)", default=30)
+    github_sync_batch_size = fields.Integer(string="Background Sync Batch Size", default=50)
+    github_sync_time_budget = fields.Float(string="Background Sync Time Budget (s)", default=240)
+    github_import_max_pages = fields.Integer(string="Commit Pages per Sync", default=50)
+    github_background_actions = fields.Boolean(string="Run GitHub Actions in the Background")
+    github_circuit_threshold = fields.Integer(string="Failures Before Pausing Calls", default=5)
+    github_circuit_cooldown = fields.Float(string="Pause on Failures (s)", default=60)
 
     def set_values(self):
         super(ResConfigSettings, self).set_values()
-        self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', self.github_token)
+        ICP = self.env['ir.config_parameter'].sudo()
+        ICP.set_param('project_git_integration.github_token', self.github_token)
+        ICP.set_param('project_git_integration.github_webhook_secret', self.github_webhook_secret)
+        ICP.set_param('project_git_integration.github_api_url', self.github_api_url)
+        ICP.set_param('project_git_integration.github_timeout', self.github_timeout)
+        ICP.set_param('project_git_integration.github_max_retries', self.github_max_retries)
+        ICP.set_param('project_git_integration.github_retry_backoff', self.github_retry_backoff)
+        ICP.set_param('project_git_integration.github_pool_size', self.github_pool_size)
+        ICP.set_param('project_git_integration.github_max_workers', self.github_max_workers)
+        ICP.set_param('project_git_integration.github_rate_limit_reserve', self.github_rate_limit_reserve)
+        ICP.set_param('project_git_integration.github_rate_limit_max_wait', self.github_rate_limit_max_wait)
+        ICP.set_param('project_git_integration.github_sync_batch_size', self.github_sync_batch_size)
+        ICP.set_param('project_git_integration.github_sync_time_budget', self.github_sync_time_budget)
+        ICP.set_param('project_git_integration.github_import_max_pages', self.github_import_max_pages)
+        ICP.set_param('project_git_integration.github_background_actions', self.github_background_actions)
+        ICP.set_param('project_git_integration.github_circuit_threshold', self.github_circuit_threshold)
+        ICP.set_param('project_git_integration.github_circuit_cooldown', self.github_circuit_cooldown)
+        # Drop the cached GitHub credentials and identity (see git.github.service._get_credentials)
+        self.env.registry.clear_cache()
 
     @api.model
     def get_values(self):
         res = super(ResConfigSettings, self).get_values()
-        res['github_token'] = self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_token')
+        ICP = self.env['ir.config_parameter'].sudo()
+        res['github_token'] = ICP.get_param('project_git_integration.github_token')
+        res['github_webhook_secret'] = ICP.get_param('project_git_integration.github_webhook_secret')
+        res['github_api_url'] = ICP.get_param('project_git_integration.github_api_url', 'https://api.github.com')
+        res['github_timeout'] = float(ICP.get_param('project_git_integration.github_timeout', 10))
+        res['github_max_retries'] = int(ICP.get_param('project_git_integration.github_max_retries', 3))
+        res['github_retry_backoff'] = float(ICP.get_param('project_git_integration.github_retry_backoff', 0.5))
+        res['github_pool_size'] = int(ICP.get_param('project_git_integration.github_pool_size', 10))
+        res['github_max_workers'] = int(ICP.get_param('project_git_integration.github_max_workers', 4))
+        res['github_rate_limit_reserve'] = int(ICP.get_param('project_git_integration.github_rate_limit_reserve', 200))
+        res['github_rate_limit_max_wait'] = float(ICP.get_param('project_git_integration.github_rate_limit_max_wait', 30))
+        res['github_sync_batch_size'] = int(ICP.get_param('project_git_integration.github_sync_batch_size', 50))
+        res['github_sync_time_budget'] = float(ICP.get_param('project_git_integration.github_sync_time_budget', 240))
+        res['github_import_max_pages'] = int(ICP.get_param('project_git_integration.github_import_max_pages', 50))
+        res['github_background_actions'] = bool(ICP.get_param('project_git_integration.github_background_actions'))
+        res['github_circuit_threshold'] = int(ICP.get_param('project_git_integration.github_circuit_threshold', 5))
+        res['github_circuit_cooldown'] = float(ICP.get_param('project_git_integration.github_circuit_cooldown', 60))
         return res
-
-
-
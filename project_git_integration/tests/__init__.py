@@ -1 +1,3 @@
 from . import test_project_git
+from . import test_webhook
+from . import test_benchmark
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the GitHub REST endpoints used by the module, serving a
+synthetic repository. Used by the benchmarks (see test_benchmark.py); can also be
+started on its own to point a database at it:
+
+    python github_stub.py --port 8765 --commits 50000 --prs 2000 --branches 1000
+
+then set the `project_git_integration.github_api_url` system parameter to
+http://127.0.0.1:8765.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlsplit, parse_qsl
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class SyntheticRepository:
+    """
+    A repository whose commits and pull requests are computed on demand from their
+    index, so large repositories cost no memory. `main_share` of the commits are on
+    the default branch, the others are spread over `branches` feature branches
+    named feature-0, feature-1, ...; pull requests are spread over the same feature
+    branches. Commits of a branch are one minute apart, newest first.
+    """
+
+    def __init__(self, owner='bench', name='bench-repo', commits=50000, prs=2000, branches=1000,
+                 default_branch='main', main_share=0.2):
+        self.owner = owner
+        self.name = name
+        self.default_branch = default_branch
+        self.branch_names = [f'feature-{i}' for i in range(branches)]
+        self.main_commits = int(commits * main_share) if branches else commits
+        self.branch_commits = (commits - self.main_commits) // branches if branches else 0
+        self.prs = prs
+        # Bumped to simulate pushes; part of every ETag
+        self.version = Counter()
+
+    def commit_count(self, branch):
+        if branch == self.default_branch:
+            return self.main_commits
+        if branch in self.branch_names:
+            return self.branch_commits
+        return None
+
+    def commit(self, branch, index):
+        """ Commit `index` of the branch, 0 being the head. """
+        count = self.commit_count(branch) + self.version[branch]
+        sha = hashlib.sha1(f'{branch}:{count - index}'.encode()).hexdigest()
+        date = (EPOCH + timedelta(minutes=count - index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return {
+            'sha': sha,
+            'html_url': f'https://github.com/{self.owner}/{self.name}/commit/{sha}',
+            'commit': {'message': f'Commit {count - index} on {branch}', 'author': {'name': 'Bench', 'date': date}},
+        }
+
+    def commits(self, branch, since=None):
+        count = self.commit_count(branch)
+        if count is None:
+            return None
+        count += self.version[branch]
+        if since:
+            since_dt = datetime.strptime(since, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+            count = min(count, max(0, int((EPOCH - since_dt).total_seconds() // 60) + count + 1))
+        return _LazyList(count, lambda index: self.commit(branch, index))
+
+    def pull_requests(self, branch=None):
+        numbers = range(1, self.prs + 1)
+        if branch is not None:
+            if branch not in self.branch_names or not self.branch_names:
+                return []
+            position = self.branch_names.index(branch)
+            numbers = numbers[position::len(self.branch_names)]
+        return _LazyList(len(numbers), lambda index: self.pull_request(numbers[index]))
+
+    def pull_request(self, number):
+        branch = self.branch_names[(number - 1) % len(self.branch_names)]
+        created = EPOCH + timedelta(hours=number)
+        merged = number % 3 == 0
+        return {
+            'number': number,
+            'title': f'PR {number}',
+            'html_url': f'https://github.com/{self.owner}/{self.name}/pull/{number}',
+            'state': 'open' if number % 3 == 1 else 'closed',
+            'created_at': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'updated_at': (created + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'merged_at': (created + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ') if merged else None,
+            'head': {'ref': branch},
+            'base': {'ref': self.default_branch},
+            'user': {'login': 'bench'},
+        }
+
+    def push(self, branch, count=1):
+        """ Adds `count` commits on top of the branch. """
+        self.version[branch] += count
+
+
+class _LazyList:
+    def __init__(self, length, getter):
+        self.length = length
+        self.getter = getter
+
+    def __len__(self):
+        return self.length
+
+    def slice(self, start, stop):
+        return [self.getter(index) for index in range(start, min(stop, self.length))]
+
+
+class GitHubStub:
+    """
+    Threaded HTTP server answering like GitHub for one `SyntheticRepository`:
+    Link pagination, ETag / If-None-Match, X-RateLimit-* headers (with 403 once
+    the budget is spent) and a fixed artificial latency per request. Counts the
+    requests it served by endpoint and status.
+    """
+
+    def __init__(self, repository, latency=0.0, rate_limit=1000000, port=0):
+        self.repository = repository
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _route(self, path, query):
+        repo = self.repository
+        prefix = f'/repos/{repo.owner}/{repo.name}/'
+        if not path.startswith(prefix):
+            return 'unknown', None
+        rest = path[len(prefix):]
+        if rest == 'commits':
+            return 'commits', repo.commits(query.get('sha', repo.default_branch), query.get('since'))
+        if rest == 'pulls':
+            head = query.get('head')
+            return 'pulls', repo.pull_requests(head.split(':')[-1] if head else None)
+        for ref_prefix in ('git/ref/heads/', 'git/refs/heads/'):
+            if rest.startswith(ref_prefix):
+                branch = rest[len(ref_prefix):]
+                if repo.commit_count(branch) is None:
+                    return 'ref', None
+                return 'ref', {'ref': f'refs/heads/{branch}', 'object': {'sha': repo.commit(branch, 0)['sha']}}
+        return 'unknown', None
+
+    def _handle(self, handler):
+        if self.latency:
+            time.sleep(self.latency)
+        split = urlsplit(handler.path)
+        query = dict(parse_qsl(split.query))
+        endpoint, data = self._route(split.path, query)
+
+        if data is None:
+            return self._send(handler, endpoint, 404, {'message': 'Not Found'})
+        if isinstance(data, _LazyList):
+            per_page = int(query.get('per_page', 30))
+            page = int(query.get('page', 1))
+            body = data.slice((page - 1) * per_page, page * per_page)
+            headers = {}
+            if page * per_page < len(data):
+                next_query = urlencode(dict(query, page=page + 1))
+                headers['Link'] = f'<{self.url}{split.path}?{next_query}>; rel="next"'
+        else:
+            body, headers = data, {}
+
+        etag = 'W/"%s"' % hashlib.sha1(
+            f'{handler.path}|{sorted(self.repository.version.items())}'.encode()).hexdigest()
+        headers['ETag'] = etag
+        if handler.headers.get('If-None-Match') == etag:
+            # Conditional hits do not count against GitHub's rate limit
+            return self._send(handler, endpoint, 304, None, headers, consume=False)
+        return self._send(handler, endpoint, 200, body, headers)
+
+    def _send(self, handler, endpoint, status, body, headers=None, consume=True):
+        with self._lock:
+            if consume:
+                if self.remaining <= 0:
+                    status, body, headers = 403, {'message': 'API rate limit exceeded'}, {}
+                else:
+                    self.remaining -= 1
+            remaining = self.remaining
+            self.stats[endpoint, status] += 1
+        payload = json.dumps(body).encode() if body is not None else b''
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('X-RateLimit-Limit', str(self.rate_limit))
+        handler.send_header('X-RateLimit-Remaining', str(remaining))
+        handler.send_header('X-RateLimit-Reset', str(self.reset_at))
+        handler.send_header('X-RateLimit-Resource', 'core')
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--owner', default='bench')
+    arg_parser.add_argument('--name', default='bench-repo')
+    arg_parser.add_argument('--commits', type=int, default=50000)
+    arg_parser.add_argument('--prs', type=int, default=2000)
+    arg_parser.add_argument('--branches', type=int, default=1000)
+    arg_parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every request")
+    arg_parser.add_argument('--rate-limit', type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    repository = SyntheticRepository(args.owner, args.name, args.commits, args.prs, args.branches)
+    stub = GitHubStub(repository, latency=args.latency, rate_limit=args.rate_limit, port=args.port)
+    print(f'Serving {args.owner}/{args.name} on {stub.url}')
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
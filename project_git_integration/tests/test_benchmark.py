@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import requests
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from .github_stub import GitHubStub, SyntheticRepository
+
+_logger = logging.getLogger(__name__)
+
+
+def _env_number(name, default, cast=int):
+	return cast(os.environ.get(name, default))
+
+
+@tagged('-standard', 'git_benchmark')
+class TestSyncBenchmark(TransactionCase):
+	"""
+	Sync benchmarks against a local GitHub stub. Not part of the standard run:
+
+		odoo-bin -d <db> -i project_git_integration --test-tags git_benchmark
+
+	The repository size and the stub's latency come from GIT_BENCH_COMMITS,
+	GIT_BENCH_PRS, GIT_BENCH_TASKS and GIT_BENCH_LATENCY (seconds per request).
+	"""
+
+	@classmethod
+	def setUpClass(cls):
+		super(TestSyncBenchmark, cls).setUpClass()
+		cls.task_count = _env_number('GIT_BENCH_TASKS', 1000)
+		cls.repository = SyntheticRepository(
+			commits=_env_number('GIT_BENCH_COMMITS', 50000),
+			prs=_env_number('GIT_BENCH_PRS', 2000),
+			branches=cls.task_count,
+		)
+		cls.stub = GitHubStub(cls.repository, latency=_env_number('GIT_BENCH_LATENCY', 0.02, float)).start()
+		cls.addClassCleanup(cls.stub.stop)
+
+		ICP = cls.env['ir.config_parameter'].sudo()
+		ICP.set_param('project_git_integration.github_token', 'bench_token')
+		ICP.set_param('project_git_integration.github_api_url', cls.stub.url)
+		cls.project = cls.env['project.project'].create({
+			'name': 'Benchmark',
+			'git_repository_name': cls.repository.name,
+			'git_repository_owner': cls.repository.owner,
+			'git_default_branch': cls.repository.default_branch,
+		})
+		cls.main_task = cls.env['project.task'].create({'name': 'Main', 'project_id': cls.project.id})
+		cls.branch_tasks = cls.env['project.task'].create([
+			{'name': f'Task {branch}', 'project_id': cls.project.id, 'git_dev_branch': branch}
+			for branch in cls.repository.branch_names
+		])
+
+	def setUp(self):
+		super(TestSyncBenchmark, self).setUp()
+		self.repository.version.clear()
+
+	def _measure(self, label, func):
+		""" Runs `func` and logs its duration, throughput, request latencies and peak memory. """
+		original_request = requests.Session.request
+		latencies = []
+		lock = threading.Lock()
+
+		def timed_request(session, *args, **kwargs):
+			start = time.perf_counter()
+			try:
+				return original_request(session, *args, **kwargs)
+			finally:
+				with lock:
+					latencies.append(time.perf_counter() - start)
+
+		Log, PullRequest = self.env['git.commit.log'], self.env['git.pull.request']
+		records_before = Log.search_count([]) + PullRequest.search_count([])
+		self.stub.reset_stats()
+		tracemalloc.start()
+		start = time.perf_counter()
+		with patch.object(requests.Session, 'request', timed_request):
+			func()
+		self.env.flush_all()
+		elapsed = time.perf_counter() - start
+		_current, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		records = Log.search_count([]) + PullRequest.search_count([]) - records_before
+
+		latencies.sort()
+		def percentile(p):
+			return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+		_logger.info(
+			"%-28s %8.2fs %8d records %9.1f rec/s | %5d requests (%s) | p50 %6.1fms p95 %6.1fms p99 %6.1fms | peak %7.1f MiB",
+			label, elapsed, records, records / elapsed if elapsed else 0.0,
+			len(latencies), ', '.join(f'{endpoint} {status}: {count}' for (endpoint, status), count in sorted(self.stub.stats.items())),
+			percentile(0.5), percentile(0.95), percentile(0.99), peak / 2**20,
+		)
+		return records
+
+	def _fetch_commits_until_imported(self):
+		""" Syncs the main task until its branch has no import left to resume; returns the number of syncs. """
+		self.main_task.action_fetch_commits()
+		branch = self.env['git.branch'].search([('project_id', '=', self.project.id), ('name', '=', self.repository.default_branch)])
+		runs = 1
+		while branch.import_next_url:
+			self.main_task.action_fetch_commits()
+			runs += 1
+		return runs
+
+	def test_fetch_commits(self):
+		""" One task on the default branch: the longest listing, imported in capped chunks, then an incremental sync """
+		max_pages = int(self.env['ir.config_parameter'].sudo().get_param('project_git_integration.github_import_max_pages', 50))
+		runs = []
+		records = self._measure("fetch_commits cold", lambda: runs.append(self._fetch_commits_until_imported()))
+		self.assertEqual(records, self.repository.main_commits)
+		self.assertEqual(runs, [max(1, -(-self.repository.main_commits // (100 * max_pages)))])
+		self.repository.push('main', 10)
+		records = self._measure("fetch_commits after push", self.main_task.action_fetch_commits)
+		self.assertEqual(records, 10)
+		self._measure("fetch_commits unchanged", self.main_task.action_fetch_commits)
+
+	def test_fetch_pull_requests(self):
+		""" Every task's pull requests, one listing per dev branch """
+		records = self._measure("fetch_pull_requests cold", self.branch_tasks.action_fetch_pull_requests)
+		self.assertEqual(records, self.repository.prs)
+		self._measure("fetch_pull_requests warm", self.branch_tasks.action_fetch_pull_requests)
+
+	def test_multi_task_sync(self):
+		""" Commits and pull requests of the whole project """
+		self._measure("project sync cold", self.project.action_fetch_git_activity)
+		self.repository.push('feature-0')
+		self._measure("project sync one push", self.project.action_fetch_git_activity)
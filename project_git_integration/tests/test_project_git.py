@@ -1,8 +1,22 @@
 # -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import UserError
 from unittest.mock import patch, MagicMock
 import logging
+import os
+import requests
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from ..tools.fetch_engine import FetchEngine
+from ..tools.git_mirror import GitMirror
+from ..tools.rate_limit import RateLimitExceeded, RateLimitGovernor
 
 _logger = logging.getLogger(__name__)
 
@@ -17,7 +31,7 @@ class TestProjectGit(TransactionCase):
 
 	def test_create_repository_success(self):
 		""" Test successful repository creation """
-		with patch('requests.post') as mock_post:
+		with patch('requests.Session.request') as mock_post:
 			mock_response = MagicMock()
 			mock_response.status_code = 201
 			mock_response.json.return_value = {
@@ -44,7 +58,7 @@ class TestProjectGit(TransactionCase):
 
 	def test_assign_repo_success(self):
 		""" Test successful linking of existing repository """
-		with patch('requests.get') as mock_get:
+		with patch('requests.Session.request') as mock_get:
 			# Mock User Info Response
 			mock_user_response = MagicMock()
 			mock_user_response.status_code = 200
@@ -71,7 +85,7 @@ class TestProjectGit(TransactionCase):
 
 	def test_assign_repo_not_found(self):
 		""" Test failure when repo does not exist """
-		with patch('requests.get') as mock_get:
+		with patch('requests.Session.request') as mock_get:
 			# Mock User Info Response
 			mock_user_response = MagicMock()
 			mock_user_response.status_code = 200
@@ -88,7 +102,7 @@ class TestProjectGit(TransactionCase):
 
 	def test_create_repository_api_error(self):
 		""" Test handling of API errors """
-		with patch('requests.post') as mock_post:
+		with patch('requests.Session.request') as mock_post:
 			mock_response = MagicMock()
 			mock_response.status_code = 401
 			mock_response.text = 'Bad credentials'
@@ -98,6 +112,72 @@ class TestProjectGit(TransactionCase):
 			with self.assertRaises(UserError):
 				self.project.action_create_repository()
 
+	def test_bulk_provision_report(self):
+		""" Test that bulk provisioning asks the login once and reports every project """
+		other = self.env['project.project'].create({'name': 'Other Project'})
+		linked = self.env['project.project'].create({'name': 'Linked', 'git_repository_name': 'Linked'})
+
+		def respond(method, url, **kwargs):
+			response = MagicMock()
+			if url.endswith('/user'):
+				response.status_code = 200
+				response.json.return_value = {'login': 'testuser'}
+			elif url.endswith('/repos/testuser/Test-Project'):
+				response.status_code = 200
+				response.json.return_value = {
+					'name': 'Test-Project',
+					'html_url': 'https://github.com/testuser/Test-Project',
+					'id': 1,
+					'owner': {'login': 'testuser'},
+					'default_branch': 'main',
+				}
+			else:
+				response.status_code = 404
+				response.text = 'Not Found'
+				response.json.return_value = {'message': 'Not Found'}
+			return response
+
+		wizard = self.env['git.repository.provision'].with_context(
+			active_model='project.project', active_ids=[self.project.id, other.id, linked.id],
+		).create({})
+		with patch('requests.Session.request', side_effect=respond) as mock_request:
+			wizard.action_provision()
+
+		user_calls = [call for call in mock_request.call_args_list if call.args[1].endswith('/user')]
+		self.assertEqual(len(user_calls), 1)
+		self.assertEqual(self.project.git_repository_name, 'Test-Project')
+		self.assertEqual(self.project.git_connection_status, 'connected')
+		self.assertFalse(other.git_repository_name)
+		report = {line.project_id: line.status for line in wizard.line_ids}
+		self.assertEqual(report, {self.project: 'linked', other: 'failed', linked: 'skipped'})
+
+	def test_identity_cached_until_rejected(self):
+		""" Test that the token's login is asked once, and again after a 401 """
+		service = self.env['git.github.service']
+		with patch('requests.Session.request') as mock_request:
+			mock_response = MagicMock()
+			mock_response.status_code = 200
+			mock_response.json.return_value = {'login': 'testuser'}
+			mock_request.return_value = mock_response
+
+			self.assertEqual(service._get_login(service._get_client()), 'testuser')
+			self.assertEqual(service._get_login(service._get_client()), 'testuser')
+			self.assertEqual(mock_request.call_count, 1)
+
+			mock_response.status_code = 401
+			service._get_client().get('repos/testuser/Test-Project')
+			mock_response.status_code = 200
+			service._get_login(service._get_client())
+			self.assertEqual(mock_request.call_count, 3)
+
+	def test_client_reuses_session(self):
+		""" Test that every client shares the worker's pooled session """
+		service = self.env['git.github.service']
+		client_a = service._get_client()
+		client_b = service._get_client()
+		self.assertIs(client_a.session, client_b.session)
+		self.assertEqual(client_a.headers['Authorization'], 'Bearer test_token')
+
 class TestProjectTaskGit(TransactionCase):
 
 	def setUp(self):
@@ -117,19 +197,17 @@ class TestProjectTaskGit(TransactionCase):
 
 	def test_create_branch_success(self):
 		""" Test successful branch creation """
-		with patch('requests.get') as mock_get, patch('requests.post') as mock_post:
+		with patch('requests.Session.request') as mock_request:
 			# Mock Default Branch SHA
 			mock_ref_response = MagicMock()
 			mock_ref_response.status_code = 200
 			mock_ref_response.json.return_value = {'object': {'sha': 'abcdef123456'}}
-			
-			mock_get.return_value = mock_ref_response
 
 			# Mock Create Branch
 			mock_create_response = MagicMock()
 			mock_create_response.status_code = 201
-			
-			mock_post.return_value = mock_create_response
+
+			mock_request.side_effect = [mock_ref_response, mock_create_response]
 
 			self.task.action_create_custom_branch()
 
@@ -149,3 +227,870 @@ class TestProjectTaskGit(TransactionCase):
 		self.project.git_repository_name = False
 		with self.assertRaises(UserError):
 			self.task.action_create_custom_branch()
+
+	def _mock_response(self, status_code, payload=None, headers=None, next_url=None):
+		mock_response = MagicMock()
+		mock_response.status_code = status_code
+		mock_response.json.return_value = payload
+		mock_response.headers = headers or {}
+		mock_response.links = {'next': {'url': next_url}} if next_url else {}
+		return mock_response
+
+	def _commit_payload(self, sha, date, committed=None):
+		return {
+			'sha': sha,
+			'html_url': f'https://github.com/testuser/Test-Project/commit/{sha}',
+			'commit': {'message': f'Commit {sha}', 'author': {'name': 'Dev', 'date': date},
+					   'committer': {'date': committed or date}},
+		}
+
+	def test_fetch_commits_not_modified(self):
+		""" Test that a 304 replay sends the stored ETag and skips processing """
+		commits = [{
+			'sha': 'abc123',
+			'html_url': 'https://github.com/testuser/Test-Project/commit/abc123',
+			'commit': {'message': 'Initial commit', 'author': {'name': 'Dev', 'date': '2024-01-01T10:00:00Z'}},
+		}]
+		with patch('requests.Session.request') as mock_request:
+			mock_request.side_effect = [
+				self._mock_response(200, commits, {'ETag': 'W/"v1"'}),
+				self._mock_response(200, {'object': {'sha': 'def456'}}),
+				self._mock_response(200, commits, {'ETag': 'W/"v2"'}),
+				self._mock_response(200, {'object': {'sha': 'def456'}}),
+				self._mock_response(304),
+			]
+			self.task.action_fetch_commits()
+			self.assertEqual(len(self.task.commit_ids), 1)
+
+			# The second listing asks for commits since the first one: a new request
+			self.task.action_fetch_commits()
+			self.assertFalse(mock_request.call_args_list[2].kwargs['headers'].get('If-None-Match'))
+
+			self.task.action_fetch_commits()
+			third_headers = mock_request.call_args_list[4].kwargs['headers']
+			self.assertEqual(third_headers.get('If-None-Match'), 'W/"v2"')
+			self.assertEqual(len(self.task.commit_ids), 1)
+
+	def test_stale_validators_vacuumed(self):
+		""" Test that cache entries not written for long are dropped, so scopes that stopped syncing do not pile up """
+		Cache = self.env['git.http.cache']
+		stale, fresh = Cache.create([{'key': 'stale', 'etag': 'W/"a"'}, {'key': 'fresh', 'etag': 'W/"b"'}])
+		self.env.cr.execute("UPDATE git_http_cache SET write_date = now() - interval '31 days' WHERE id = %s", [stale.id])
+		Cache.invalidate_model(['write_date'])
+		Cache._gc_stale_entries()
+		self.assertFalse(stale.exists())
+		self.assertTrue(fresh.exists())
+
+	def test_fetch_commits_paginated_incremental(self):
+		""" Test that every page is read and the next sync only asks for newer commits """
+		next_url = 'https://api.github.com/repos/testuser/Test-Project/commits?sha=main&per_page=100&page=2'
+		with patch('requests.Session.request') as mock_request:
+			mock_request.side_effect = [
+				self._mock_response(200, [self._commit_payload('c3', '2024-01-03T10:00:00Z')], next_url=next_url),
+				self._mock_response(200, [
+					self._commit_payload('c2', '2024-01-02T10:00:00Z'),
+					self._commit_payload('c1', '2024-01-01T10:00:00Z'),
+				]),
+				self._mock_response(200, {'object': {'sha': 'c4'}}),
+				self._mock_response(200, [self._commit_payload('c4', '2024-01-04T10:00:00Z')]),
+			]
+			self.task.action_fetch_commits()
+			self.assertEqual(mock_request.call_args_list[1].args[1], next_url)
+			self.assertEqual(sorted(self.task.commit_ids.mapped('commit_hash')), ['c1', 'c2', 'c3'])
+
+			branch = self.env['git.branch'].search([('project_id', '=', self.project.id), ('name', '=', 'main')])
+			self.assertEqual(branch.head_sha, 'c3')
+
+			self.task.action_fetch_commits()
+			self.assertEqual(mock_request.call_args_list[2].kwargs['params']['since'], '2024-01-03T10:00:00Z')
+			self.assertEqual(len(self.task.commit_ids), 4)
+			self.assertEqual(branch.head_sha, 'c4')
+
+	def test_fetch_commits_since_committer_date(self):
+		""" Test that the next listing starts from the latest committer date, not the author date of a rebased commit """
+		with patch('requests.Session.request') as mock_request:
+			mock_request.side_effect = [
+				self._mock_response(200, [self._commit_payload('r1', '2023-06-01T10:00:00Z', '2024-02-01T10:00:00Z')]),
+				self._mock_response(200, {'object': {'sha': 'r2'}}),
+				self._mock_response(200, []),
+			]
+			self.task.action_fetch_commits()
+			self.task.action_fetch_commits()
+			self.assertEqual(mock_request.call_args_list[2].kwargs['params']['since'], '2024-02-01T10:00:00Z')
+
+	def test_fetch_commits_resumes_checkpoint(self):
+		""" Test that a listing cut at the page limit is checkpointed and resumed by the next sync """
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_import_max_pages', 1)
+		next_url = 'https://api.github.com/repos/testuser/Test-Project/commits?sha=main&per_page=100&page=2'
+		with patch('requests.Session.request') as mock_request:
+			mock_request.side_effect = [
+				self._mock_response(200, [self._commit_payload('c2', '2024-01-02T10:00:00Z')], next_url=next_url),
+				self._mock_response(200, [self._commit_payload('c1', '2024-01-01T10:00:00Z')]),
+			]
+			result = self.task.action_fetch_commits()
+			branch = self.env['git.branch'].search([('project_id', '=', self.project.id), ('name', '=', 'main')])
+			self.assertEqual(result['params']['type'], 'warning', "The user is told the import is incomplete")
+			self.assertEqual(self.task.commit_ids.mapped('commit_hash'), ['c2'])
+			self.assertEqual(branch.import_next_url, next_url)
+			self.assertFalse(branch.head_sha, "The high-water mark only moves once the listing is complete")
+
+			self.task.action_fetch_commits()
+			self.assertEqual(mock_request.call_args_list[1].args[1], next_url)
+			self.assertEqual(sorted(self.task.commit_ids.mapped('commit_hash')), ['c1', 'c2'])
+			self.assertFalse(branch.import_next_url)
+			self.assertEqual(branch.head_sha, 'c2')
+
+	def test_fetch_commits_unchanged_head(self):
+		""" Test that a branch whose head did not move is only probed """
+		with patch('requests.Session.request') as mock_request:
+			mock_request.side_effect = [
+				self._mock_response(200, [self._commit_payload('c1', '2024-01-01T10:00:00Z')]),
+				self._mock_response(200, {'object': {'sha': 'c1'}}),
+			]
+			self.task.action_fetch_commits()
+			task_2 = self.env['project.task'].create({
+				'name': 'Test Task 2',
+				'project_id': self.project.id,
+			})
+			(self.task | task_2).action_fetch_commits()
+
+			self.assertEqual(mock_request.call_count, 2)
+			self.assertTrue(mock_request.call_args_list[1].args[1].endswith('/git/ref/heads/main'))
+			self.assertEqual(task_2.commit_ids.commit_hash, 'c1')
+
+	def test_fetch_commits_shared_branch(self):
+		""" Test that tasks sharing a branch are served by one request """
+		task_2 = self.env['project.task'].create({
+			'name': 'Test Task 2',
+			'project_id': self.project.id,
+		})
+		tasks = self.task | task_2
+		with patch('requests.Session.request') as mock_request:
+			mock_request.return_value = self._mock_response(200, [
+				self._commit_payload('c1', '2024-01-01T10:00:00Z'),
+				self._commit_payload('c2', '2024-01-02T10:00:00Z'),
+			])
+			tasks.action_fetch_commits()
+
+			self.assertEqual(mock_request.call_count, 1)
+			self.assertEqual(len(self.task.commit_ids), 2)
+			self.assertEqual(len(task_2.commit_ids), 2)
+			self.assertEqual(task_2.git_commit_count, 2)
+			self.assertEqual(task_2.git_last_commit_date, fields.Datetime.to_datetime('2024-01-02 10:00:00'))
+
+	def test_activity_stats_maintained(self):
+		""" Test that synced commits are counted per day and match a full rebuild """
+		with patch('requests.Session.request') as mock_request:
+			mock_request.return_value = self._mock_response(200, [
+				self._commit_payload('c1', '2024-01-01T10:00:00Z'),
+				self._commit_payload('c2', '2024-01-01T12:00:00Z'),
+				self._commit_payload('c3', '2024-01-02T10:00:00Z'),
+			])
+			self.task.action_fetch_commits()
+
+		Stat = self.env['git.activity.stat']
+		def counts():
+			return {
+				(str(stat.day), stat.author): stat.commit_count
+				for stat in Stat.search([('task_id', '=', self.task.id)])
+			}
+		expected = {('2024-01-01', 'Dev'): 2, ('2024-01-02', 'Dev'): 1}
+		self.assertEqual(counts(), expected)
+		Stat._rebuild()
+		self.assertEqual(counts(), expected)
+
+	def test_sync_run_recorded(self):
+		""" Test that a sync records its requests, status codes and rows """
+		with patch('requests.Session.request') as mock_request:
+			mock_request.return_value = self._mock_response(200, [
+				self._commit_payload('c1', '2024-01-01T10:00:00Z'),
+				self._commit_payload('c2', '2024-01-02T10:00:00Z'),
+			], {'X-RateLimit-Remaining': '4999'})
+			self.task.action_fetch_commits()
+
+		run = self.env['git.sync.run'].search([('project_id', '=', self.project.id)], limit=1)
+		self.assertEqual(run.operation, 'commits')
+		self.assertEqual(run.state, 'done')
+		self.assertEqual(run.http_requests, 1)
+		self.assertEqual(run.status_codes, '200: 1')
+		self.assertEqual(run.rate_limit_remaining, 4999)
+		self.assertEqual(run.rows_inserted, 2)
+		self.assertEqual(run.rows_skipped, 0)
+
+	def test_insert_ignore_existing(self):
+		""" Test that the bulk insert lets the unique index drop known commits """
+		commits = self.env['git.commit']._upsert('testuser/Test-Project', [
+			{'sha': sha, 'message': 'Init', 'date': '2024-01-01 10:00:00'} for sha in ('abc', 'def', 'ghi')
+		])
+		self.assertEqual(len(commits), 3)
+		abc, def_, ghi = commits
+
+		CommitLog = self.env['git.commit.log']
+		def link(commit):
+			return {'commit_id': commit.id, 'commit_hash': commit.sha, 'commit_date': commit.date,
+					'branch_name': 'main', 'task_id': self.task.id}
+		created = CommitLog._insert_ignore_existing([link(abc), link(def_)])
+		self.assertEqual(len(created), 2)
+
+		created = CommitLog._insert_ignore_existing([link(abc), link(ghi)])
+		self.assertEqual(created.commit_hash, 'ghi')
+		self.assertEqual(len(self.task.commit_ids), 3)
+
+		# The same commits upserted again resolve to the stored rows
+		self.assertEqual(self.env['git.commit']._upsert('testuser/Test-Project', [{'sha': 'abc'}]), abc)
+
+	def test_shared_commit_store(self):
+		""" Test that tasks sharing a branch share one stored commit """
+		task_2 = self.env['project.task'].create({
+			'name': 'Test Task 2',
+			'project_id': self.project.id,
+		})
+		with patch('requests.Session.request') as mock_request:
+			mock_request.return_value = self._mock_response(200, [self._commit_payload('c1', '2024-01-01T10:00:00Z')])
+			self.task.action_fetch_commits()
+
+			# The second task is served from the store, then asks only for newer commits
+			mock_request.return_value = self._mock_response(200, [])
+			task_2.action_fetch_commits()
+			self.assertEqual(mock_request.call_args.kwargs['params']['since'], '2024-01-01T10:00:00Z')
+
+		self.assertEqual(task_2.commit_ids.commit_message, 'Commit c1')
+		self.assertEqual(self.env['git.commit'].search_count([('sha', '=', 'c1')]), 1)
+		self.assertEqual(self.task.commit_ids.commit_id, task_2.commit_ids.commit_id)
+
+class TestFetchEngine(TransactionCase):
+
+	def test_imap_runs_jobs_concurrently(self):
+		""" Test that every item reaches the calling thread, in order per job """
+		caller = threading.current_thread()
+		workers = set()
+
+		def make_job(n):
+			def job():
+				workers.add(threading.current_thread())
+				yield from range(n)
+			return job
+
+		engine = FetchEngine(max_workers=3)
+		results = {}
+		for key, item in engine.imap({key: make_job(key) for key in (2, 3, 4)}):
+			self.assertIs(threading.current_thread(), caller)
+			results.setdefault(key, []).append(item)
+
+		self.assertEqual(results, {2: [0, 1], 3: [0, 1, 2], 4: [0, 1, 2, 3]})
+		self.assertNotIn(caller, workers)
+
+	def test_imap_reraises_job_error(self):
+		""" Test that a failing job surfaces its exception on the calling thread """
+		def failing_job():
+			yield 1
+			raise ValueError("boom")
+
+		engine = FetchEngine(max_workers=2)
+		with self.assertRaises(ValueError):
+			list(engine.imap({'ok': lambda: iter([1, 2]), 'ko': failing_job}))
+
+
+class TestRateLimitGovernor(TransactionCase):
+
+	def setUp(self):
+		super(TestRateLimitGovernor, self).setUp()
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+		self.client = self.env['git.github.service']._get_client()
+		self.url = self.client.url('repos/testuser/Test-Project/commits')
+
+	def _record(self, governor, remaining, status_code=200):
+		response = MagicMock()
+		response.status_code = status_code
+		response.headers = {
+			'X-RateLimit-Limit': '5000',
+			'X-RateLimit-Remaining': str(remaining),
+			'X-RateLimit-Reset': str(int(time.time()) + 3600),
+			'X-RateLimit-Resource': 'core',
+		}
+		governor.after_response(self.client, 'GET', self.url, response)
+
+	def test_background_keeps_headroom(self):
+		""" Test that background calls stop at the reserve while users still pass """
+		background = RateLimitGovernor(self.env.registry, interactive=False, reserve=200, max_wait=0)
+		interactive = RateLimitGovernor(self.env.registry, interactive=True, reserve=200, max_wait=0)
+		self._record(background, 150)
+
+		with self.assertRaises(RateLimitExceeded):
+			background.before_request(self.client, 'GET', self.url)
+		interactive.before_request(self.client, 'GET', self.url)
+
+		budget = self.env['git.rate.limit'].search([('key', '=', f'{self.client.fingerprint}:core')])
+		self.assertEqual(budget.remaining, 140, "A block of budget is reserved at once")
+
+	def test_block_spent_without_locking(self):
+		""" Test that the calls of a reserved block do not touch the budget row, the next block does """
+		governor = RateLimitGovernor(self.env.registry, interactive=True, reserve=200, max_wait=0, block=5)
+		self._record(governor, 100)
+		budget = self.env['git.rate.limit'].search([('key', '=', f'{self.client.fingerprint}:core')])
+		for _call in range(5):
+			governor.before_request(self.client, 'GET', self.url)
+		budget.invalidate_recordset()
+		self.assertEqual(budget.remaining, 95)
+		governor.before_request(self.client, 'GET', self.url)
+		budget.invalidate_recordset()
+		self.assertEqual(budget.remaining, 90)
+
+	def test_exhausted_budget_blocks_everyone(self):
+		""" Test that a spent budget refuses calls until its reset """
+		governor = RateLimitGovernor(self.env.registry, interactive=True, reserve=200, max_wait=0)
+		self._record(governor, 0, status_code=403)
+		with self.assertRaises(RateLimitExceeded):
+			governor.before_request(self.client, 'GET', self.url)
+
+
+	def test_pool_rotates_to_token_with_budget(self):
+		""" Test that reads go to the pooled token with the most budget, skipping spent ones """
+		self.env['git.credential'].create([
+			{'name': 'Pool A', 'token': 'pool_token_a'},
+			{'name': 'Other Org', 'token': 'org_token', 'owner': 'other-org'},
+		])
+		service = self.env['git.github.service']
+		client = service._get_client()
+		self.assertEqual(len(client.tokens), 2)
+		self.assertEqual(len(service._get_client(self.env['project.project'].new({'git_repository_owner': 'Other-Org'})).tokens), 1)
+
+		governor = RateLimitGovernor(self.env.registry, interactive=True, reserve=200, max_wait=0)
+		primary, pooled = client.tokens
+		self._record(governor, 100)
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {'X-RateLimit-Remaining': '300', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+		governor.after_response(client, 'GET', self.url, response, pooled)
+		self.assertEqual(governor.before_request(client, 'GET', self.url, (primary, pooled)), pooled)
+
+		self._record(governor, 0, status_code=403)
+		response.status_code = 403
+		response.headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+		governor.after_response(client, 'GET', self.url, response, pooled)
+		with self.assertRaises(RateLimitExceeded):
+			governor.before_request(client, 'GET', self.url, (primary, pooled))
+
+	def test_rejected_token_left_out_of_pool(self):
+		""" Test that a read refused to a pooled token is replayed with another one, which later reads prefer """
+		self.env['git.credential'].create({'name': 'Pool A', 'token': 'pool_token_a'})
+		client = self.env['git.github.service']._get_client()
+		primary, pooled = client.tokens
+		governor = RateLimitGovernor(self.env.registry, interactive=True, reserve=200, max_wait=0)
+		self._record(governor, 100)
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {'X-RateLimit-Remaining': '300', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+		governor.after_response(client, 'GET', self.url, response, pooled)
+
+		with patch('requests.Session.request') as mock_request:
+			rejected, accepted = MagicMock(status_code=401, headers={}), MagicMock(status_code=200, headers={})
+			mock_request.side_effect = [rejected, accepted]
+			self.assertIs(client.get(self.url), accepted)
+			self.assertEqual(mock_request.call_args_list[0].kwargs['headers']['Authorization'], 'Bearer pool_token_a')
+			self.assertEqual(mock_request.call_args_list[1].kwargs['headers']['Authorization'], 'Bearer test_token')
+
+		budget = self.env['git.rate.limit'].search([('key', '=', f'{pooled}:core')])
+		self.assertTrue(budget.rejected_until)
+		self.assertEqual(governor.before_request(client, 'GET', self.url, (primary, pooled)), primary)
+
+	def test_forbidden_returned_to_caller(self):
+		""" Test that a 403 without rate limit is a permission error: not replayed, and the token is kept """
+		self.env['git.credential'].create({'name': 'Pool A', 'token': 'pool_token_a'})
+		client = self.env['git.github.service']._get_client()
+		with patch('requests.Session.request') as mock_request:
+			forbidden = MagicMock(status_code=403, headers={})
+			mock_request.return_value = forbidden
+			self.assertIs(client.get(self.url), forbidden)
+			self.assertEqual(mock_request.call_count, 1)
+		self.assertFalse(client.rejected)
+
+
+class TestGraphqlSync(TransactionCase):
+
+	def setUp(self):
+		super(TestGraphqlSync, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+			'git_sync_backend': 'graphql',
+		})
+		self.tasks = self.env['project.task'].create([
+			{'name': 'Task A', 'project_id': self.project.id, 'git_dev_branch': 'feature-a'},
+			{'name': 'Task B', 'project_id': self.project.id, 'git_dev_branch': 'feature-b'},
+		])
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+
+	def _history(self, sha, date):
+		return {'target': {'history': {
+			'pageInfo': {'hasNextPage': False, 'endCursor': None},
+			'nodes': [{'oid': sha, 'message': f'Commit {sha}', 'url': f'https://github.com/c/{sha}',
+					   'author': {'name': 'Dev', 'date': date}}],
+		}}}
+
+	def test_project_sync_single_query(self):
+		""" Test that all branches' commits and PRs come from one aliased query """
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.json.return_value = {'data': {'repository': {
+			'b0': self._history('a1', '2024-01-01T10:00:00Z'),
+			'b1': self._history('b1', '2024-01-02T10:00:00Z'),
+			'b2': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': [{
+				'number': 3, 'title': 'Feature A', 'url': 'https://github.com/p/3', 'state': 'MERGED',
+				'createdAt': '2024-01-01T12:00:00Z', 'updatedAt': '2024-01-03T12:00:00Z',
+				'mergedAt': '2024-01-03T12:00:00Z', 'headRefName': 'feature-a', 'baseRefName': 'main',
+				'author': {'login': 'dev'},
+			}]},
+			'b3': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []},
+		}}}
+		with patch('requests.Session.request', return_value=response) as mock_request:
+			self.project.action_fetch_git_activity()
+
+		self.assertEqual(mock_request.call_count, 1)
+		task_a, task_b = self.tasks
+		self.assertEqual(task_a.commit_ids.commit_hash, 'a1')
+		self.assertEqual(task_b.commit_ids.commit_hash, 'b1')
+		self.assertEqual(task_a.pr_ids.pr_status, 'merged')
+		self.assertFalse(task_b.pr_ids)
+
+	def test_missing_branch_skipped(self):
+		""" Test that a deleted branch does not stop the other listings of the query """
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.json.return_value = {'data': {'repository': {
+			'b0': None,
+			'b1': self._history('b1', '2024-01-02T10:00:00Z'),
+			'b2': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []},
+			'b3': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []},
+		}}}
+		with patch('requests.Session.request', return_value=response):
+			self.project.action_fetch_git_activity()
+
+		task_a, task_b = self.tasks
+		self.assertFalse(task_a.commit_ids)
+		self.assertEqual(task_b.commit_ids.commit_hash, 'b1')
+
+	def test_history_capped_and_resumed(self):
+		""" Test that a GraphQL history cut at the page limit is checkpointed, reported and resumed from its cursor """
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_import_max_pages', 1)
+		history = self._history('a2', '2024-01-02T10:00:00Z')
+		history['target']['history']['pageInfo'] = {'hasNextPage': True, 'endCursor': 'cursor-1'}
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.json.return_value = {'data': {'repository': {
+			'b0': history,
+			'b1': self._history('b1', '2024-01-02T10:00:00Z'),
+			'b2': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []},
+			'b3': {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []},
+		}}}
+		with patch('requests.Session.request', return_value=response) as mock_request:
+			result = self.project.action_fetch_git_activity()
+
+		self.assertEqual(mock_request.call_count, 1, "The page limit stops the cursors from being followed")
+		self.assertEqual(result['params']['type'], 'warning')
+		branch = self.env['git.branch'].search([('project_id', '=', self.project.id), ('name', '=', 'feature-a')])
+		self.assertEqual(branch.import_next_url, 'graphql:cursor-1')
+		self.assertFalse(branch.head_sha)
+
+		response.json.return_value = {'data': {'repository': {}}}
+		with patch('requests.Session.request', return_value=response) as mock_request:
+			self.project.action_fetch_git_activity()
+		queries = [call.kwargs['json']['query'] for call in mock_request.call_args_list if call.args[1].endswith('/graphql')]
+		self.assertIn('after: "cursor-1"', queries[0])
+
+
+class TestPullRequestSync(TransactionCase):
+
+	def setUp(self):
+		super(TestPullRequestSync, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+		})
+		self.task = self.env['project.task'].create({
+			'name': 'Test Task',
+			'project_id': self.project.id,
+			'git_dev_branch': 'feature-x',
+		})
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+
+	def _pr_response(self, merged_at=None):
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.links = {}
+		response.json.return_value = [{
+			'number': 12,
+			'title': 'Feature X',
+			'html_url': 'https://github.com/testuser/Test-Project/pull/12',
+			'state': 'closed' if merged_at else 'open',
+			'created_at': '2024-01-01T10:00:00Z',
+			'updated_at': merged_at or '2024-01-01T10:00:00Z',
+			'merged_at': merged_at,
+			'head': {'ref': 'feature-x'},
+			'base': {'ref': 'main'},
+			'user': {'login': 'dev'},
+		}]
+		return response
+
+	def test_status_transition_recorded(self):
+		""" Test that a known PR is updated when it gets merged, and left alone otherwise """
+		with patch('requests.Session.request') as mock_request:
+			mock_request.return_value = self._pr_response()
+			self.task.action_fetch_pull_requests()
+			self.assertEqual(self.task.pr_ids.pr_status, 'open')
+			self.assertEqual(self.task.git_open_pr_count, 1)
+
+			with patch.object(type(self.env['git.pull.request']), 'write') as mock_write:
+				self.task.action_fetch_pull_requests()
+				mock_write.assert_not_called()
+
+			mock_request.return_value = self._pr_response(merged_at='2024-01-02T10:00:00Z')
+			self.task.action_fetch_pull_requests()
+
+		self.assertEqual(len(self.task.pr_ids), 1)
+		self.assertEqual(self.task.pr_ids.pr_status, 'merged')
+		self.assertTrue(self.task.pr_ids.pr_merged_on)
+		self.assertEqual(self.task.git_open_pr_count, 0)
+
+		stats = self.env['git.activity.stat'].search([('task_id', '=', self.task.id)])
+		self.assertEqual(sum(stats.mapped('pr_opened_count')), 1)
+		self.assertEqual(sum(stats.mapped('pr_merged_count')), 1)
+		self.assertAlmostEqual(sum(stats.mapped('pr_lead_time_hours')), 24.0)
+
+	def test_not_modified_listing_skips_fallback(self):
+		""" Test that a 304 replaying a non-empty owner:branch listing does not query the unprefixed head """
+		with patch('requests.Session.request') as mock_request:
+			response = self._pr_response()
+			response.headers = {'ETag': 'W/"prs"'}
+			not_modified = MagicMock(status_code=304, headers={}, links={})
+			mock_request.side_effect = [response, not_modified]
+			self.task.action_fetch_pull_requests()
+			self.task.action_fetch_pull_requests()
+
+		self.assertEqual(mock_request.call_count, 2)
+		self.assertEqual(mock_request.call_args_list[1].kwargs['params']['head'], 'testuser:feature-x')
+		self.assertEqual(len(self.task.pr_ids), 1)
+
+
+class TestGitCron(TransactionCase):
+
+	def setUp(self):
+		super(TestGitCron, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+			'git_sync_interval': 30,
+		})
+
+	def test_candidates_by_staleness_and_priority(self):
+		""" Test that fresh tasks are left out and urgent ones come first """
+		now = fields.Datetime.now()
+		stale, merged, with_pr, fresh, pushed = self.env['project.task'].create([
+			{'name': 'Stale', 'project_id': self.project.id, 'git_sync_attempted_on': now - timedelta(hours=3)},
+			{'name': 'Merged', 'project_id': self.project.id, 'git_branch_status': 'merged'},
+			{'name': 'Open PR', 'project_id': self.project.id, 'git_sync_attempted_on': now - timedelta(hours=1)},
+			{'name': 'Fresh', 'project_id': self.project.id, 'git_sync_attempted_on': now - timedelta(minutes=5)},
+			{'name': 'Pushed', 'project_id': self.project.id, 'git_sync_attempted_on': now - timedelta(hours=2)},
+		])
+		self.env['git.pull.request'].create({'pr_number': 1, 'pr_status': 'open', 'task_id': with_pr.id})
+		commit = self.env['git.commit'].create({'repository': 'testuser/Test-Project', 'sha': 'abc', 'date': now - timedelta(days=1)})
+		self.env['git.commit.log'].create({'commit_id': commit.id, 'task_id': pushed.id})
+
+		candidates = self.env['project.task']._git_cron_candidates()
+		self.assertEqual(candidates.ids, [with_pr.id, pushed.id, stale.id, merged.id])
+
+		self.project.git_sync_interval = 0
+		self.assertFalse(self.env['project.task']._git_cron_candidates())
+
+	def test_open_breaker_ends_run(self):
+		""" Test that a batch refused by the circuit breaker stops the run instead of retrying task by task """
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+		tasks = self.env['project.task'].create([
+			{'name': f'Task {index}', 'project_id': self.project.id} for index in range(3)
+		])
+		self.env['git.circuit.breaker'].create({
+			'host': 'api.github.com',
+			'failure_count': 5,
+			'opened_until': fields.Datetime.now() + timedelta(minutes=1),
+		})
+		with patch('requests.Session.request') as mock_request:
+			self.assertFalse(tasks._git_cron_sync_batch(time.monotonic() + 60))
+		mock_request.assert_not_called()
+
+
+class TestGitMirrorSync(TransactionCase):
+
+	def setUp(self):
+		super(TestGitMirrorSync, self).setUp()
+		self.tmp_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.tmp_dir)
+		self.source = os.path.join(self.tmp_dir, 'source')
+		subprocess.run(['git', 'init', '--quiet', '--initial-branch', 'main', self.source], check=True)
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_repository_url': f'file://{self.source}',
+			'git_default_branch': 'main',
+			'git_sync_backend': 'mirror',
+		})
+		self.main_task, self.feature_task = self.env['project.task'].create([
+			{'name': 'Main Task', 'project_id': self.project.id},
+			{'name': 'Feature Task', 'project_id': self.project.id, 'git_dev_branch': 'feature'},
+		])
+		ICP = self.env['ir.config_parameter'].sudo()
+		ICP.set_param('project_git_integration.github_token', 'test_token')
+		ICP.set_param('project_git_integration.git_mirror_dir', os.path.join(self.tmp_dir, 'mirrors'))
+
+	def _git(self, *args):
+		env = dict(os.environ, GIT_AUTHOR_NAME='Dev', GIT_AUTHOR_EMAIL='dev@example.com',
+				   GIT_COMMITTER_NAME='Dev', GIT_COMMITTER_EMAIL='dev@example.com')
+		subprocess.run(['git', '-C', self.source, *args], env=env, check=True, capture_output=True)
+
+	def _messages(self, task):
+		return sorted(task.commit_ids.mapped('commit_message'))
+
+	def test_sync_from_mirror(self):
+		""" Test that commits come from the mirror, incrementally and without the API """
+		self._git('commit', '--allow-empty', '-m', 'c1')
+		self._git('checkout', '--quiet', '-b', 'feature')
+		self._git('commit', '--allow-empty', '-m', 'f1')
+		tasks = self.main_task | self.feature_task
+
+		with patch('requests.Session.request') as mock_request:
+			tasks.action_fetch_commits()
+			self.assertEqual(self._messages(self.main_task), ['c1'])
+			self.assertEqual(self._messages(self.feature_task), ['c1', 'f1'])
+
+			self._git('checkout', '--quiet', 'main')
+			self._git('commit', '--allow-empty', '-m', 'c2')
+			self._git('checkout', '--quiet', 'feature')
+			self._git('merge', '--quiet', '--no-edit', 'main')
+			tasks.action_fetch_commits()
+
+			mock_request.assert_not_called()
+		self.assertEqual(self._messages(self.main_task), ['c1', 'c2'])
+		self.assertEqual(len(self.feature_task.commit_ids), 4)
+		branch = self.env['git.branch'].search([('project_id', '=', self.project.id), ('name', '=', 'main')])
+		head = subprocess.run(['git', '-C', self.source, 'rev-parse', 'main'], capture_output=True, text=True, check=True)
+		self.assertEqual(branch.head_sha, head.stdout.strip())
+
+	def test_mirror_fetched_once_per_sync(self):
+		""" Test that listing the branches for reference linking and reading them share one mirror fetch """
+		self.project.git_link_by_reference = True
+		self._git('commit', '--allow-empty', '-m', 'c1')
+		with patch.object(GitMirror, 'update', autospec=True, side_effect=GitMirror.update) as update:
+			self.main_task.action_fetch_commits()
+		self.assertEqual(update.call_count, 1)
+		self.assertEqual(self._messages(self.main_task), ['c1'])
+
+
+class TestReferenceLinking(TransactionCase):
+
+	def setUp(self):
+		super(TestReferenceLinking, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+			'git_link_by_reference': True,
+		})
+		self.main_task, self.login_task, self.other_task = self.env['project.task'].create([
+			{'name': 'Main Task', 'project_id': self.project.id},
+			{'name': 'Fix Login Page', 'project_id': self.project.id},
+			{'name': 'Other Task', 'project_id': self.project.id},
+		])
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+
+	def _response(self, payload):
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.links = {}
+		response.json.return_value = payload
+		return response
+
+	def _commit(self, sha, message, date=None):
+		date = date or fields.Datetime.now() + timedelta(hours=1)
+		return {
+			'sha': sha,
+			'html_url': f'https://github.com/testuser/Test-Project/commit/{sha}',
+			'commit': {'message': message, 'author': {'name': 'Dev', 'date': date.strftime('%Y-%m-%dT%H:%M:%SZ')}},
+		}
+
+	def test_commits_linked_by_reference(self):
+		""" Test that every branch is ingested and commits reach the tasks they mention """
+		listings = {
+			'/branches': [
+				{'name': 'main', 'commit': {'sha': 'm1'}},
+				{'name': 'hotfix', 'commit': {'sha': 'h1'}},
+			],
+			'/commits?main': [self._commit('m1', "Merge branch 'fix-login-page'")],
+			'/commits?hotfix': [
+				self._commit('h1', f"Hotfix for #{self.other_task.id}"),
+				self._commit('h0', f"Merge pull request #{self.login_task.id} from someone/patch"),
+				self._commit('h00', f"Old fix for #{self.other_task.id}", fields.Datetime.now() - timedelta(days=30)),
+			],
+		}
+
+		def dispatch(method, url, params=None, **kwargs):
+			path = url.rsplit('/Test-Project', 1)[1]
+			if path == '/commits':
+				path += '?' + params['sha']
+			return self._response(listings[path])
+
+		with patch('requests.Session.request', side_effect=dispatch) as mock_request:
+			self.main_task.action_fetch_commits()
+		self.assertEqual(mock_request.call_count, 3)
+		hotfix_params = next(call.kwargs['params'] for call in mock_request.call_args_list if (call.kwargs.get('params') or {}).get('sha') == 'hotfix')
+		self.assertIn('since', hotfix_params, "A branch without tasks is only listed from the oldest task on")
+
+		self.assertEqual(self.main_task.commit_ids.commit_hash, 'm1')
+		self.assertEqual(self.login_task.commit_ids.commit_hash, 'm1', "GitHub's pull request number is not a task id")
+		self.assertEqual(self.other_task.commit_ids.commit_hash, 'h1', "Commits older than the task do not refer to it")
+		self.assertEqual(self.other_task.commit_ids.branch_name, 'hotfix')
+
+
+class TestBranchStatus(TransactionCase):
+
+	def setUp(self):
+		super(TestBranchStatus, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+		})
+		self.gone, self.with_pr, self.merged, self.active, self.fresh, self.reached, self.new = self.env['project.task'].create([
+			{'name': name, 'project_id': self.project.id, 'git_dev_branch': name}
+			for name in ('feat-gone', 'feat-pr', 'feat-merged', 'feat-active', 'feat-fresh', 'feat-reached', 'feat-new')
+		])
+		self.env['git.pull.request'].create({
+			'pr_number': 1, 'pr_status': 'merged', 'pr_source_branch': 'feat-pr', 'task_id': self.with_pr.id,
+		})
+		main = self.env['git.branch']._get_or_create(self.project, 'main')
+		commit = self.env['git.commit'].create({'repository': 'testuser/Test-Project', 'sha': 'm1'})
+		commit._add_to_branch(main)
+		# A fresh branch inherits the default branch's history
+		self.env['git.commit.log'].create({'commit_id': commit.id, 'task_id': self.new.id})
+		self.env['git.branch']._get_or_create_many(self.project, ['feat-merged', 'feat-reached']).write({'diverged': True})
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_token', 'test_token')
+
+	def _respond(self, method, url, **kwargs):
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.links = {}
+		if url.endswith('/branches'):
+			response.json.return_value = [
+				{'name': name, 'commit': {'sha': name}}
+				for name in ('main', 'feat-pr', 'feat-merged', 'feat-active', 'feat-fresh')
+			] + [{'name': name, 'commit': {'sha': 'm1'}} for name in ('feat-reached', 'feat-new')]
+		elif url.endswith(('/compare/main...feat-merged', '/compare/main...feat-fresh', '/compare/main...feat-new')):
+			response.json.return_value = {'ahead_by': 0, 'behind_by': 3}
+		elif url.endswith('/compare/main...feat-active'):
+			response.json.return_value = {'ahead_by': 2, 'behind_by': 0}
+		else:
+			raise AssertionError(f"Unexpected request to {url}")
+		return response
+
+	def test_reconcile_statuses(self):
+		""" Test that one branch listing, the stored history and the needed comparisons set every status """
+		with patch('requests.Session.request', side_effect=self._respond) as mock_request:
+			self.project.action_git_reconcile_branches()
+
+		self.assertEqual(mock_request.call_count, 5)
+		self.assertEqual(self.gone.git_branch_status, 'deleted')
+		self.assertEqual(self.with_pr.git_branch_status, 'merged')
+		self.assertEqual(self.merged.git_branch_status, 'merged')
+		self.assertEqual(self.active.git_branch_status, 'active')
+		self.assertEqual(self.fresh.git_branch_status, 'active')
+		self.assertEqual(self.reached.git_branch_status, 'merged', "Its head is in the stored history of main")
+		self.assertEqual(self.new.git_branch_status, 'active', "Never diverged from main")
+		self.assertTrue(self.env['git.branch'].search([('name', '=', 'feat-active')]).diverged)
+
+	def test_comparisons_bounded(self):
+		""" Test that branches beyond the comparison budget keep their status and get their turn next run """
+		self.active.git_branch_status = 'merged'
+		with patch('odoo.addons.project_git_integration.models.project.MAX_BRANCH_COMPARES', 1), \
+				patch('requests.Session.request', side_effect=self._respond) as mock_request:
+			self.project.action_git_reconcile_branches()
+			self.assertEqual(mock_request.call_count, 2)
+			self.assertEqual(self.active.git_branch_status, 'active')
+			self.assertEqual(self.merged.git_branch_status, 'active', "Not compared yet")
+
+			self.project.action_git_reconcile_branches()
+			self.assertTrue(mock_request.call_args_list[-1].args[1].endswith('/compare/main...feat-fresh'))
+
+
+class TestGitJobs(TransactionCase):
+
+	def setUp(self):
+		super(TestGitJobs, self).setUp()
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+		})
+		self.task = self.env['project.task'].create({
+			'name': 'Test Task',
+			'project_id': self.project.id,
+			'git_dev_branch': 'feature-x',
+		})
+		ICP = self.env['ir.config_parameter'].sudo()
+		ICP.set_param('project_git_integration.github_token', 'test_token')
+		ICP.set_param('project_git_integration.github_background_actions', True)
+
+	def _start(self, job):
+		# As the cron does before running a job
+		job.write({'state': 'running', 'attempts': job.attempts + 1})
+		job._run()
+
+	def test_action_queued_and_retried(self):
+		""" Test that a button queues a job, retried on network errors and paused while GitHub fails """
+		with patch('requests.Session.request') as mock_request:
+			action = self.task.action_fetch_commits()
+			mock_request.assert_not_called()
+		self.assertEqual(action['params']['title'], 'Queued')
+		job = self.task.git_job_ids
+		self.assertEqual((job.state, job.operation), ('pending', 'commits'))
+
+		with patch('requests.Session.request', side_effect=requests.exceptions.ConnectionError("down")):
+			self._start(job)
+		self.assertEqual((job.state, job.attempts), ('pending', 1))
+		self.assertGreater(job.next_attempt_on, fields.Datetime.now())
+
+		# While the breaker is open, attempts are postponed without calling GitHub
+		self.env['git.circuit.breaker'].create({
+			'host': 'api.github.com',
+			'failure_count': 1,
+			'opened_until': fields.Datetime.now() + timedelta(minutes=1),
+		})
+		with patch('requests.Session.request') as mock_request:
+			self._start(job)
+			mock_request.assert_not_called()
+		self.assertEqual((job.state, job.attempts), ('pending', 1))
+		self.assertIn('paused', job.last_error)
+
+		self.env['git.circuit.breaker'].search([]).unlink()
+		response = MagicMock()
+		response.status_code = 200
+		response.headers = {}
+		response.links = {}
+		response.json.return_value = []
+		with patch('requests.Session.request', return_value=response):
+			self._start(job)
+		self.assertEqual(job.state, 'done')
+		self.assertEqual(job.result, '0 new commits fetched successfully!')
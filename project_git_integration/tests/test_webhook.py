@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+import json
+
+from odoo.tests import tagged
+from odoo.tests.common import HttpCase
+from odoo.tools.misc import file_open
+
+WEBHOOK_URL = '/project_git_integration/webhook'
+
+
+@tagged('post_install', '-at_install')
+class TestGitWebhook(HttpCase):
+
+	def setUp(self):
+		super(TestGitWebhook, self).setUp()
+		self.secret = 'webhook-secret'
+		self.env['ir.config_parameter'].sudo().set_param('project_git_integration.github_webhook_secret', self.secret)
+		self.project = self.env['project.project'].create({
+			'name': 'Test Project',
+			'git_repository_name': 'Test-Project',
+			'git_repository_owner': 'testuser',
+			'git_default_branch': 'main',
+		})
+		self.task = self.env['project.task'].create({
+			'name': 'Webhook Task',
+			'project_id': self.project.id,
+			'git_dev_branch': 'feature-x',
+			'git_branch_last_synced': '2024-02-28 00:00:00',
+		})
+
+	def _replay(self, event, fixture, secret=None):
+		with file_open(f'project_git_integration/tests/data/{fixture}', 'rb') as f:
+			body = f.read()
+		signature = 'sha256=' + hmac.new((secret or self.secret).encode(), body, hashlib.sha256).hexdigest()
+		return self.url_open(WEBHOOK_URL, data=body, headers={
+			'Content-Type': 'application/json',
+			'X-GitHub-Event': event,
+			'X-Hub-Signature-256': signature,
+		})
+
+	def test_push_creates_commits(self):
+		""" Test that a recorded push payload is upserted on the branch's task """
+		response = self._replay('push', 'push_event.json')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(json.loads(response.content)['synced'], 2)
+		self.assertEqual(
+			sorted(self.task.commit_ids.mapped('commit_hash')),
+			['2222222222222222222222222222222222222222', '3333333333333333333333333333333333333333'],
+		)
+
+		# Redelivery of the same payload does not duplicate anything
+		self._replay('push', 'push_event.json')
+		self.assertEqual(len(self.task.commit_ids), 2)
+
+	def test_pull_request_upsert(self):
+		""" Test that a recorded pull_request payload creates then updates the PR """
+		self.env['git.pull.request'].create({
+			'pr_number': 7,
+			'pr_title': 'Webhook receiver',
+			'pr_status': 'open',
+			'task_id': self.task.id,
+		})
+		response = self._replay('pull_request', 'pull_request_event.json')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(self.task.pr_ids), 1)
+		self.assertEqual(self.task.pr_ids.pr_status, 'merged')
+
+	def test_invalid_signature_rejected(self):
+		""" Test that payloads signed with another secret are refused """
+		response = self._replay('push', 'push_event.json', secret='wrong-secret')
+		self.assertEqual(response.status_code, 403)
+		self.assertFalse(self.task.commit_ids)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+from . import github_client
+from . import fetch_engine
+from . import rate_limit
+from . import sync_metrics
+from . import git_mirror
+from . import task_references
+from . import circuit_breaker
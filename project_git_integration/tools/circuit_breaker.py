@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from odoo.exceptions import UserError
+
+from .rate_limit import _utcnow
+
+_logger = logging.getLogger(__name__)
+
+# How long a breaker trusts the state it last read from the table
+CHECK_INTERVAL = timedelta(seconds=5)
+
+
+class CircuitOpen(UserError):
+    """
+    Raised instead of calling a host whose circuit breaker is open. The call
+    may be retried after `retry_at`.
+    """
+
+    def __init__(self, message, retry_at=None):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker shared by every worker process through the
+    `git_circuit_breaker` table. `threshold` consecutive failures (server
+    errors, network errors and timeouts) open it for `cooldown` seconds, during
+    which calls to the host are refused with `CircuitOpen` instead of tying up
+    workers in timeouts. Afterwards calls go through again: the first success
+    closes the breaker, a failure opens it for another cooldown. The state is
+    read at most every `CHECK_INTERVAL` and written only when it changes.
+    """
+
+    def __init__(self, registry, threshold=5, cooldown=60):
+        self.registry = registry
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        # host -> (read at, failure count, opened until), as last read or written
+        self.states = {}
+
+    def _state(self, host):
+        now = _utcnow()
+        state = self.states.get(host)
+        if state is None or state[0] + CHECK_INTERVAL <= now:
+            with self.registry.cursor() as cr:
+                cr.execute("SELECT failure_count, opened_until FROM git_circuit_breaker WHERE host = %s", [host])
+                failure_count, opened_until = cr.fetchone() or (0, None)
+            state = self.states[host] = (now, failure_count or 0, opened_until)
+        return state
+
+    def opened_until(self, host):
+        """
+        Returns the time until which calls to the host are refused, or None.
+        """
+        _read_at, _failure_count, opened_until = self._state(host)
+        if opened_until and opened_until > _utcnow():
+            return opened_until
+        return None
+
+    def record_failure(self, host):
+        now = _utcnow()
+        opened_until = now + timedelta(seconds=self.cooldown)
+        with self.registry.cursor() as cr:
+            cr.execute("""
+                INSERT INTO git_circuit_breaker (host, failure_count, last_failure_on, opened_until, create_date, write_date)
+                VALUES (%(host)s, 1, %(now)s, CASE WHEN %(threshold)s <= 1 THEN %(opened_until)s END, %(now)s, %(now)s)
+                ON CONFLICT (host) DO UPDATE
+                   SET failure_count = git_circuit_breaker.failure_count + 1,
+                       last_failure_on = EXCLUDED.last_failure_on,
+                       opened_until = CASE WHEN git_circuit_breaker.failure_count + 1 >= %(threshold)s
+                                           THEN %(opened_until)s
+                                           ELSE git_circuit_breaker.opened_until END,
+                       write_date = EXCLUDED.write_date
+             RETURNING failure_count, opened_until
+            """, {'host': host, 'now': now, 'threshold': self.threshold, 'opened_until': opened_until})
+            failure_count, host_opened_until = cr.fetchone()
+        self.states[host] = (now, failure_count, host_opened_until)
+        if failure_count == self.threshold:
+            _logger.warning("GitHub circuit breaker opened for %s until %s", host, opened_until)
+
+    def record_success(self, host):
+        # Nothing to close while no failure is known
+        if not self._state(host)[1]:
+            return
+        with self.registry.cursor() as cr:
+            cr.execute("""
+                UPDATE git_circuit_breaker
+                   SET failure_count = 0, opened_until = NULL, write_date = now() at time zone 'UTC'
+                 WHERE host = %s AND failure_count > 0
+            """, [host])
+        self.states[host] = (_utcnow(), 0, None)
+
+    def before_request(self, client, method, url, fingerprints=None):
+        host = urlsplit(url).netloc
+        opened_until = self.opened_until(host)
+        if opened_until:
+            raise CircuitOpen(
+                f"GitHub is failing, calls to {host} are paused until {opened_until:%Y-%m-%d %H:%M:%S} UTC.",
+                retry_at=opened_until,
+            )
+
+    def after_response(self, client, method, url, response, fingerprint=None):
+        if response.status_code >= 500:
+            self.record_failure(urlsplit(url).netloc)
+        else:
+            self.record_success(urlsplit(url).netloc)
+
+    def on_error(self, client, method, url, error):
+        self.record_failure(urlsplit(url).netloc)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .github_client import error_message
+from .sync_metrics import NULL_METRICS
+
+# One page of a GitHub listing, parsed in the worker thread. `cache_key` is only
+# set on the first page of a listing, the one whose validators may be stored;
+# `next_url` is the URL of the following page, if any.
+Page = namedtuple('Page', ['status_code', 'headers', 'data', 'error', 'cache_key', 'next_url'], defaults=[None])
+
+
+def fetch_pages(client, path, params=None, headers=None, cache_key=None):
+    """
+    Requests a listing and yields every page of it as a `Page`.
+    """
+    metrics = client.metrics or NULL_METRICS
+    response = client.get(path, params=params, headers=headers)
+    for response in client.iter_pages(response):
+        if response.status_code == 200:
+            with metrics.timer('json'):
+                data = response.json()
+            yield Page(200, response.headers, data, None, cache_key, response.links.get('next', {}).get('url'))
+        elif response.status_code == 304:
+            yield Page(304, response.headers, None, None, cache_key)
+        else:
+            yield Page(response.status_code, response.headers, None, error_message(response), cache_key)
+        cache_key = None
+
+
+class PageBudget:
+    """
+    Pages the listings of one sync may fetch together; first pages are always fetched.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.lock = threading.Lock()
+
+    def spend(self):
+        with self.lock:
+            self.pages -= 1
+
+    def take(self):
+        with self.lock:
+            if self.pages <= 0:
+                return False
+            self.pages -= 1
+            return True
+
+    def bounded(self, pages):
+        """
+        Yields the pages of one listing until the budget is spent.
+        """
+        self.spend()
+        for page in pages:
+            yield page
+            if not page.next_url or not self.take():
+                return
+
+
+_DONE = object()
+
+
+class FetchEngine:
+    """
+    Runs network-bound jobs on a bounded thread pool and hands their results back
+    to the calling thread, which keeps sole ownership of the database cursor.
+    """
+
+    def __init__(self, max_workers=4, queue_size=64):
+        self.max_workers = max(1, max_workers)
+        self.queue_size = queue_size
+
+    def imap(self, jobs):
+        """
+        Runs `jobs`, a dict mapping a key to a callable returning an iterable, and
+        yields `(key, item)` on the calling thread as items are produced. Items of a
+        job keep their order; jobs interleave. The first exception raised by a job
+        is re-raised here, and closing the generator stops the remaining jobs.
+        """
+        if self.max_workers == 1 or len(jobs) <= 1:
+            for key, job in jobs.items():
+                for item in job():
+                    yield key, item
+            return
+
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def put(entry):
+            # Bounded queue: block while the consumer is busy, unless we are stopping
+            while not stop.is_set():
+                try:
+                    results.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker(key, job):
+            try:
+                for item in job():
+                    if not put((key, item, None)):
+                        return
+                put((key, _DONE, None))
+            except Exception as e:  # handed over to the consumer thread
+                put((key, _DONE, e))
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(jobs)),
+            thread_name_prefix='github_fetch',
+        )
+        try:
+            for key, job in jobs.items():
+                executor.submit(worker, key, job)
+            pending = len(jobs)
+            while pending:
+                key, item, error = results.get()
+                if item is _DONE:
+                    pending -= 1
+                    if error is not None:
+                        raise error
+                    continue
+                yield key, item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import fcntl
+import os
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from odoo.exceptions import UserError
+
+# Fields and records of `git log` output are separated by ASCII unit / record
+# separators, which do not appear in commit metadata.
+LOG_FORMAT = '%H%x1f%P%x1f%an%x1f%aI%x1f%B%x1e'
+
+class GitMirrorError(UserError):
+    """
+    Raised when a git command on the mirror fails.
+    """
+
+
+class GitMirror:
+    """
+    Bare clone of a repository's branches on the local disk, read with `git log`.
+    Concurrent updates of the same mirror are serialized with a file lock.
+    """
+
+    def __init__(self, path, url, token=None, timeout=600):
+        self.path = path
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def _env(self):
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        if self.token and self.url.startswith(('http://', 'https://')):
+            # Passed through the environment so the token never shows in process lists
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            env.update({
+                'GIT_CONFIG_COUNT': '1',
+                'GIT_CONFIG_KEY_0': 'http.extraHeader',
+                'GIT_CONFIG_VALUE_0': f"Authorization: Basic {credentials}",
+            })
+        return env
+
+    def _git(self, *args, check=True):
+        try:
+            result = subprocess.run(
+                ['git', '--git-dir', self.path, *args],
+                env=self._env(), capture_output=True, text=True, timeout=self.timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise GitMirrorError(f"Git mirror error: {e}")
+        if check and result.returncode:
+            raise GitMirrorError(f"Git mirror error (git {args[0]}): {result.stderr.strip()}")
+        return result
+
+    @contextmanager
+    def _lock(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def update(self):
+        """
+        Creates the mirror on first use and fetches the new objects of every branch,
+        dropping the branches deleted upstream.
+        """
+        with self._lock():
+            if not os.path.isdir(self.path):
+                self._git('init', '--bare', '--quiet')
+                self._git('remote', 'add', 'origin', self.url)
+                # Branches only: GitHub's refs/pull/* would multiply the objects fetched
+                self._git('config', 'remote.origin.fetch', '+refs/heads/*:refs/heads/*')
+            else:
+                self._git('remote', 'set-url', 'origin', self.url)
+            self._git('fetch', '--prune', '--quiet', 'origin')
+
+    def heads(self):
+        """
+        Returns the sha of every branch of the mirror.
+        """
+        output = self._git('for-each-ref', '--format=%(refname:strip=2) %(objectname)', 'refs/heads/').stdout
+        return dict(line.rsplit(' ', 1) for line in output.splitlines() if line)
+
+    def merged_heads(self, target):
+        """
+        Returns the branches whose head is reachable from the `target` branch,
+        i.e. already merged into it.
+        """
+        output = self._git('for-each-ref', f'--merged=refs/heads/{target}',
+                           '--format=%(refname:strip=2)', 'refs/heads/').stdout
+        return set(output.split())
+
+    def first_parent_shas(self, target):
+        """
+        Returns the shas of the commits made on the `target` branch itself,
+        following first parents only.
+        """
+        return set(self._git('rev-list', '--first-parent', f'refs/heads/{target}').stdout.split())
+
+    def iter_log(self, revisions, exclude=(), since=None):
+        """
+        Streams the commits reachable from `revisions` but not from `exclude`, and
+        committed after the UTC datetime `since` if given, as (sha, parent shas,
+        author, UTC date, message), from a single `git log`.
+        """
+        args = ['git', '--git-dir', self.path, 'log', f'--format={LOG_FORMAT}', *revisions]
+        if since:
+            args.append(f"--since={since.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+        if exclude:
+            args += ['--not', *exclude]
+        process = subprocess.Popen(args, env=self._env(), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, encoding='utf-8', errors='replace')
+        buffer = ''
+        try:
+            while True:
+                chunk = process.stdout.read(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                *records, buffer = buffer.split('\x1e')
+                for record in records:
+                    yield self._parse_record(record)
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            if process.wait(timeout=self.timeout):
+                raise GitMirrorError(f"Git mirror error (git log): {stderr.strip()}")
+
+    @staticmethod
+    def _parse_record(record):
+        sha, parents, author, date, message = record.lstrip('\n').split('\x1f', 4)
+        date = datetime.fromisoformat(date).astimezone(timezone.utc).replace(tzinfo=None)
+        return sha, tuple(parents.split()), author, date, message.rstrip('\n')
+
+    def has_commit(self, sha):
+        """
+        Returns whether the mirror holds the commit `sha`.
+        """
+        return self._git('cat-file', '-e', f'{sha}^{{commit}}', check=False).returncode == 0
+
+    def iter_history(self, synced_heads, batch_size=1000, since=None):
+        """
+        Streams the commits each branch gained since its synced head (or `since` date)
+        as (branch, head, commits) batches; `head` is None for a missing branch.
+        """
+        since = since or {}
+        heads = self.heads()
+        for branch, synced_head in synced_heads.items():
+            head = heads.get(branch)
+            if not head or head == synced_head:
+                yield branch, head, []
+                continue
+            exclude = (synced_head,) if synced_head and self.has_commit(synced_head) else ()
+            batch = []
+            for commit in self.iter_log([head], exclude, since.get(branch)):
+                batch.append(commit)
+                if len(batch) >= batch_size:
+                    yield branch, head, batch
+                    batch = []
+            yield branch, head, batch
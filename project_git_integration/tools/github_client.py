@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GITHUB_API_URL = "https://api.github.com"
+
+# Status codes worth retrying on idempotent requests
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Server errors as reported by the callers, e.g. "GitHub API Error (502): ..."
+SERVER_ERROR = re.compile(r'GitHub API Error \(5\d\d\)')
+
+# Network failures worth retrying later
+TRANSIENT_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.RetryError,
+)
+
+_session_lock = threading.Lock()
+_session = None
+_session_key = None
+
+
+def _build_session(pool_size, max_retries, backoff_factor):
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),  # never replay a POST
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        "Accept": "application/vnd.github+json",
+        "Accept-Encoding": "gzip, deflate",
+        "X-GitHub-Api-Version": "2022-11-28",
+    })
+    return session
+
+
+def get_session(pool_size=10, max_retries=3, backoff_factor=0.5):
+    """
+    Returns the keep-alive session shared by every GitHub call of this worker process.
+    The session is rebuilt only when the pool/retry settings change.
+    """
+    global _session, _session_key
+    key = (pool_size, max_retries, backoff_factor)
+    if _session is None or _session_key != key:
+        with _session_lock:
+            if _session is None or _session_key != key:
+                _session = _build_session(pool_size, max_retries, backoff_factor)
+                _session_key = key
+    return _session
+
+
+def token_fingerprint(token):
+    """
+    Returns a stable, non-reversible identifier of a token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def error_message(response):
+    """
+    Extracts the GitHub error message from a response, falling back to the raw body.
+    """
+    error_msg = response.text
+    try:
+        error_json = response.json()
+        if 'message' in error_json:
+            error_msg = error_json['message']
+    except ValueError:
+        pass
+    return error_msg
+
+
+def is_transient_error(error):
+    """
+    Tells whether a failed GitHub operation may succeed when retried later:
+    network errors and timeouts, also when wrapped in another exception, and
+    server errors.
+    """
+    cause, depth = error, 0
+    while cause is not None and depth < 10:
+        if isinstance(cause, TRANSIENT_EXCEPTIONS):
+            return True
+        cause, depth = cause.__cause__ or cause.__context__, depth + 1
+    return bool(SERVER_ERROR.search(str(error)))
+
+
+def header_int(headers, name):
+    """
+    Returns an integer response header, or None when missing or malformed.
+    """
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(str(value))
+    except ValueError:
+        return None
+
+
+def is_rate_limited(response):
+    """
+    Tells whether GitHub refused the request because of a primary or secondary
+    rate limit.
+    """
+    if response.status_code not in (403, 429):
+        return False
+    return (header_int(response.headers, 'Retry-After') is not None
+            or header_int(response.headers, 'X-RateLimit-Remaining') == 0)
+
+
+class GitHubClient:
+    """
+    Thin wrapper around the shared session: resolves API paths and carries the
+    authorization header and timeout of one token, or of a pool of tokens
+    giving access to the same repositories.
+
+    `before_request` hooks are called as hook(client, method, url, fingerprints)
+    with the fingerprints of the tokens the request may use; they may block,
+    raise, or return the fingerprint of the token to use (by default the first
+    one). `after_response` hooks are called as
+    hook(client, method, url, response, fingerprint). A request answered with a
+    rate-limit error is replayed once, after the hooks had a chance to wait for
+    the limit to reset or to pick another token. A request whose token is
+    refused (401) is replayed with the other tokens it may use, and the refused
+    token is left out of the client's later calls; a 403 that is not a rate
+    limit is a permission error and returned as is. `on_error` hooks are called
+    as hook(client, method, url, error) when the request fails without a response.
+    """
+
+    def __init__(self, token, timeout=10, pool_size=10, max_retries=3, backoff_factor=0.5,
+                 base_url=GITHUB_API_URL, pool=()):
+        self.session = get_session(pool_size, max_retries, backoff_factor)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = {"Authorization": f"Bearer {token}"}
+        # Stable, non-reversible identifier of the token (cache keys, logs)
+        self.fingerprint = token_fingerprint(token)
+        # Authorization header of every token by fingerprint, the primary token first
+        self.tokens = {self.fingerprint: self.headers}
+        for pool_token in pool:
+            self.tokens.setdefault(token_fingerprint(pool_token), {"Authorization": f"Bearer {pool_token}"})
+        # Fingerprints of the tokens GitHub refused during this client's calls
+        self.rejected = set()
+        self.before_request = []
+        self.after_response = []
+        self.on_error = []
+        # Replaced by a SyncMetrics for instrumented syncs
+        self.metrics = None
+
+    def url(self, path):
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, params=None, json=None, headers=None, timeout=None, rotate=None):
+        """
+        Sends a request. By default reads may be served by any token of the pool
+        while writes use the primary token, as GitHub attributes them to the
+        token's user; `rotate` overrides this, e.g. for read-only POSTs.
+        """
+        url = self.url(path)
+        if rotate is None:
+            rotate = method in ('GET', 'HEAD')
+        fingerprints = tuple(self.tokens) if rotate else (self.fingerprint,)
+        fingerprints = tuple(fp for fp in fingerprints if fp not in self.rejected) or fingerprints
+        replayed = False
+        while True:
+            fingerprint = fingerprints[0]
+            for hook in self.before_request:
+                fingerprint = hook(self, method, url, fingerprints) or fingerprint
+            request_headers = self.tokens[fingerprint]
+            if headers:
+                request_headers = dict(request_headers, **headers)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, url,
+                    params=params, json=json, headers=request_headers,
+                    timeout=timeout or self.timeout,
+                )
+            except requests.exceptions.RequestException as e:
+                for hook in self.on_error:
+                    hook(self, method, url, e)
+                raise
+            if self.metrics is not None:
+                self.metrics.record_response(response, time.perf_counter() - start)
+            for hook in self.after_response:
+                hook(self, method, url, response, fingerprint)
+            if response.status_code == 401:
+                self.rejected.add(fingerprint)
+                others = tuple(fp for fp in fingerprints if fp != fingerprint)
+                if not others:
+                    return response
+                fingerprints = others
+                continue
+            if replayed or not self.before_request or not is_rate_limited(response):
+                return response
+            replayed = True
+
+    def get(self, path, params=None, headers=None, timeout=None, rotate=None):
+        return self.request('GET', path, params=params, headers=headers, timeout=timeout, rotate=rotate)
+
+    def post(self, path, json=None, headers=None, timeout=None, rotate=None):
+        return self.request('POST', path, json=json, headers=headers, timeout=timeout, rotate=rotate)
+
+    def iter_pages(self, response):
+        """
+        Yields the given response and then every following page of the listing,
+        following the `Link: rel=next` header. Iteration stops at the first
+        non-200 page, which is yielded so the caller can report it.
+        """
+        while True:
+            yield response
+            next_url = response.links.get('next', {}).get('url')
+            if response.status_code != 200 or not next_url:
+                return
+            response = self.get(next_url)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from .fetch_engine import Page
+from .github_client import error_message
+from .sync_metrics import NULL_METRICS
+
+# Aliases per query: keeps each query well under GitHub's node limit
+BRANCHES_PER_QUERY = 20
+PAGE_SIZE = 100
+# Marks a commit listing checkpoint holding a GraphQL cursor rather than a REST URL
+CHECKPOINT_PREFIX = 'graphql:'
+
+COMMIT_FIELDS = "oid message url committedDate author { name date }"
+PULL_REQUEST_FIELDS = (
+    "number title url state createdAt updatedAt mergedAt headRefName baseRefName author { login }"
+)
+
+
+def _literal(value):
+    # JSON string escaping is valid GraphQL string syntax
+    return json.dumps(value)
+
+
+def _commits_selection(alias, branch_name, since, cursor):
+    args = [f"first: {PAGE_SIZE}"]
+    if since:
+        args.append(f"since: {_literal(since)}")
+    if cursor:
+        args.append(f"after: {_literal(cursor)}")
+    return (
+        f"{alias}: ref(qualifiedName: {_literal('refs/heads/' + branch_name)}) {{"
+        f" target {{ ... on Commit {{ history({', '.join(args)}) {{"
+        f" pageInfo {{ hasNextPage endCursor }} nodes {{ {COMMIT_FIELDS} }} }} }} }} }}"
+    )
+
+
+def _pull_requests_selection(alias, branch_name, cursor):
+    args = [f"headRefName: {_literal(branch_name)}", f"first: {PAGE_SIZE}"]
+    if cursor:
+        args.append(f"after: {_literal(cursor)}")
+    return (
+        f"{alias}: pullRequests({', '.join(args)}) {{"
+        f" pageInfo {{ hasNextPage endCursor }} nodes {{ {PULL_REQUEST_FIELDS} }} }}"
+    )
+
+
+def build_query(pending):
+    """
+    Builds one aliased query for the pending listings, a dict mapping an alias to
+    (kind, branch_name, since, cursor) where kind is 'commits' or 'pull_requests'.
+    """
+    selections = []
+    for alias, (kind, branch_name, since, cursor) in pending.items():
+        if kind == 'commits':
+            selections.append(_commits_selection(alias, branch_name, since, cursor))
+        else:
+            selections.append(_pull_requests_selection(alias, branch_name, cursor))
+    return (
+        "query($owner: String!, $name: String!) { repository(owner: $owner, name: $name) { "
+        + " ".join(selections)
+        + " } }"
+    )
+
+
+def commit_to_rest(node):
+    """
+    Shapes a GraphQL commit node like an item of the REST commit listing.
+    """
+    author = node.get('author') or {}
+    return {
+        'sha': node.get('oid'),
+        'html_url': node.get('url'),
+        'commit': {
+            'message': node.get('message'),
+            'author': {'name': author.get('name'), 'date': author.get('date')},
+            'committer': {'date': node.get('committedDate')},
+        },
+    }
+
+
+def pull_request_to_rest(node):
+    """
+    Shapes a GraphQL pull request node like an item of the REST PR listing.
+    """
+    return {
+        'number': node.get('number'),
+        'title': node.get('title'),
+        'html_url': node.get('url'),
+        'state': 'open' if node.get('state') == 'OPEN' else 'closed',
+        'created_at': node.get('createdAt'),
+        'updated_at': node.get('updatedAt'),
+        'merged_at': node.get('mergedAt'),
+        'head': {'ref': node.get('headRefName')},
+        'base': {'ref': node.get('baseRefName')},
+        'user': {'login': (node.get('author') or {}).get('login')},
+    }
+
+
+def iter_activity(client, owner, name, commit_branches, pull_request_branches, budget=None):
+    """
+    Fetches the commits of `commit_branches` (branch name -> (since, cursor)) and
+    the pull requests of `pull_request_branches` with aliased queries, following
+    cursors while `budget` lasts. Yields (kind, branch_name, Page) shaped like the
+    REST listings.
+    """
+    listings = [('commits', branch, since) for branch, (since, _cursor) in commit_branches.items()]
+    listings += [('pull_requests', branch, None) for branch in pull_request_branches]
+    cursors = {}
+
+    for start in range(0, len(listings), BRANCHES_PER_QUERY):
+        chunk = {f"b{start + index}": listing for index, listing in enumerate(listings[start:start + BRANCHES_PER_QUERY])}
+        for alias, (kind, branch, _since) in chunk.items():
+            if kind == 'commits' and commit_branches[branch][1]:
+                cursors[alias] = commit_branches[branch][1]
+        pending = dict(chunk)
+        if budget is not None:
+            budget.spend()
+        while pending:
+            query = build_query({
+                alias: (kind, branch, since, cursors.get(alias))
+                for alias, (kind, branch, since) in pending.items()
+            })
+            # Queries only read, so any token of the pool may run them
+            response = client.post('graphql', json={'query': query, 'variables': {'owner': owner, 'name': name}},
+                                   rotate=True)
+            with (client.metrics or NULL_METRICS).timer('json'):
+                payload = response.json() if response.status_code == 200 else {}
+            repository = (payload.get('data') or {}).get('repository')
+            if repository is None:
+                if response.status_code == 200:
+                    message = '; '.join(e.get('message', '') for e in payload.get('errors') or []) or "Repository not found"
+                    status_code = 404
+                else:
+                    message, status_code = error_message(response), response.status_code
+                kind, branch, _since = next(iter(pending.values()))
+                yield kind, branch, Page(status_code, response.headers, None, message, None)
+                return
+
+            for alias, (kind, branch, since) in list(pending.items()):
+                if kind == 'commits':
+                    ref = repository.get(alias)
+                    if ref is None:
+                        # e.g. a deleted branch: the other listings of the batch go on
+                        yield kind, branch, Page(404, response.headers, None, "Not Found", None)
+                        del pending[alias]
+                        continue
+                    connection = (ref.get('target') or {}).get('history') or {}
+                    items = [commit_to_rest(node) for node in connection.get('nodes') or []]
+                else:
+                    connection = repository.get(alias) or {}
+                    items = [pull_request_to_rest(node) for node in connection.get('nodes') or []]
+
+                page_info = connection.get('pageInfo') or {}
+                next_url = None
+                if page_info.get('hasNextPage'):
+                    cursors[alias] = page_info.get('endCursor')
+                    if kind == 'commits':
+                        next_url = CHECKPOINT_PREFIX + cursors[alias]
+                else:
+                    del pending[alias]
+                yield kind, branch, Page(200, response.headers, items, None, None, next_url)
+
+            # Commit listings cut here resume from their cursor on the next sync
+            if pending and budget is not None and not budget.take():
+                break
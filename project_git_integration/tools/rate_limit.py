@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from odoo.exceptions import UserError
+
+from .github_client import header_int, is_rate_limited
+
+_logger = logging.getLogger(__name__)
+
+# Buckets a token is counted against, all of them refused with the token
+RESOURCES = ('core', 'graphql', 'search')
+
+# How long a token refused by GitHub (401) is left out of its pool
+REJECTED_COOLDOWN = timedelta(hours=1)
+
+# Units of budget a governor reserves at once, then spends without locking
+RESERVATION_BLOCK = 10
+
+
+class RateLimitExceeded(UserError):
+    """
+    Raised instead of calling GitHub when the rate limit budget would not allow
+    the call before `reset_at`. Background jobs should retry after that time.
+    """
+
+    def __init__(self, message, reset_at=None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def rate_limit_resource(url):
+    """
+    Returns the GitHub rate limit bucket a request URL is counted against.
+    """
+    if url.rstrip('/').endswith('/graphql'):
+        return 'graphql'
+    if '/search/' in url:
+        return 'search'
+    return 'core'
+
+
+class RateLimitGovernor:
+    """
+    Token bucket shared by every worker process through the `git_rate_limit`
+    table. Each call reserves one unit of the budget last reported by GitHub,
+    every response refreshes it, and calls are delayed (or refused with
+    `RateLimitExceeded` when the wait would be too long) once the budget is spent.
+    Background calls stop `reserve` units earlier, keeping headroom for users.
+    When a call may use several tokens, it is given the one with the most
+    budget left; spent tokens are skipped until they reset, so the calls
+    rotate through the pool, and tokens GitHub refused are skipped for
+    `REJECTED_COOLDOWN` while another one remains. Units are reserved `block`
+    at a time and spent locally, so concurrent calls do not queue on the rows.
+    """
+
+    def __init__(self, registry, interactive=True, reserve=200, max_wait=30, block=RESERVATION_BLOCK):
+        self.registry = registry
+        self.interactive = interactive
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.block = max(1, block)
+        self.lock = threading.Lock()
+        # key -> units reserved and not spent yet
+        self.allowances = {}
+        # key -> (remaining, reset_at) as last written
+        self.written = {}
+
+    def before_request(self, client, method, url, fingerprints=None):
+        """
+        Reserves one unit of budget for the call on one of the tokens of
+        `fingerprints` (by default the client's own) and returns its fingerprint.
+        """
+        resource = rate_limit_resource(url)
+        keys = {f"{fingerprint}:{resource}": fingerprint for fingerprint in fingerprints or (client.fingerprint,)}
+        with self.lock:
+            for key in keys:
+                if self.allowances.get(key):
+                    self.allowances[key] -= 1
+                    return keys[key]
+        floor = 0 if self.interactive else self.reserve
+        while True:
+            with self.registry.cursor() as cr:
+                cr.execute("""
+                    INSERT INTO git_rate_limit (key, resource, create_date, write_date)
+                    SELECT key, %s, now() at time zone 'UTC', now() at time zone 'UTC'
+                      FROM unnest(%s::varchar[]) AS key
+                    ON CONFLICT (key) DO NOTHING
+                """, [resource, list(keys)])
+                # Locked in a stable order, so concurrent calls on the same pool cannot deadlock
+                cr.execute("""
+                    SELECT key, remaining, reset_at, blocked_until, rejected_until
+                      FROM git_rate_limit
+                     WHERE key = ANY(%s)
+                     ORDER BY key
+                       FOR UPDATE
+                """, [list(keys)])
+
+                now = _utcnow()
+                rows = cr.fetchall()
+                accepted = [row for row in rows if not (row[4] and row[4] > now)]
+                if not accepted:
+                    # Every token was refused: the call reports GitHub's error
+                    return next(iter(keys.values()))
+                available, waits = [], []
+                for key, remaining, reset_at, blocked_until, _rejected_until in accepted:
+                    if blocked_until and blocked_until > now:
+                        waits.append(blocked_until)
+                    elif remaining is not None and remaining <= floor and reset_at and reset_at > now:
+                        waits.append(reset_at)
+                    else:
+                        available.append((key, remaining))
+
+                if available:
+                    # Unknown budgets first (their response reports them), then the fullest
+                    key, remaining = min(available, key=lambda entry: (entry[1] is not None, -(entry[1] or 0)))
+                    if remaining is not None:
+                        # At least the call's unit, at most a block above the floor
+                        units = max(1, min(self.block, remaining - floor))
+                        cr.execute("UPDATE git_rate_limit SET remaining = remaining - %s WHERE key = %s", [units, key])
+                        with self.lock:
+                            self.allowances[key] = self.allowances.get(key, 0) + units - 1
+                    return keys[key]
+                wait_until = min(waits)
+
+            wait = (wait_until - now).total_seconds()
+            if wait > self.max_wait:
+                raise RateLimitExceeded(
+                    f"GitHub rate limit reached, calls are paused until {wait_until:%Y-%m-%d %H:%M:%S} UTC.",
+                    reset_at=wait_until,
+                )
+            _logger.info("GitHub rate limit reached for %s, waiting %.1fs", ', '.join(keys), wait)
+            time.sleep(wait)
+
+    def after_response(self, client, method, url, response, fingerprint=None):
+        fingerprint = fingerprint or client.fingerprint
+        if response.status_code == 401 or is_rate_limited(response):
+            # The units reserved for a refused token are not spent
+            with self.lock:
+                for resource in RESOURCES:
+                    self.allowances.pop(f"{fingerprint}:{resource}", None)
+        if response.status_code == 401:
+            # Bad credentials: the budget headers are the anonymous ones, not the token's
+            with self.registry.cursor() as cr:
+                cr.execute("""
+                    INSERT INTO git_rate_limit (key, resource, rejected_until, create_date, write_date)
+                    SELECT %s || ':' || resource, resource, %s, now() at time zone 'UTC', now() at time zone 'UTC'
+                      FROM unnest(%s::varchar[]) AS resource
+                    ON CONFLICT (key) DO UPDATE
+                       SET rejected_until = EXCLUDED.rejected_until,
+                           write_date = EXCLUDED.write_date
+                """, [fingerprint, _utcnow() + REJECTED_COOLDOWN, list(RESOURCES)])
+            _logger.warning("GitHub rejected the token %s, leaving it out of its pool", fingerprint)
+            return
+
+        headers = response.headers
+        remaining = header_int(headers, 'X-RateLimit-Remaining')
+        limit = header_int(headers, 'X-RateLimit-Limit')
+        reset = header_int(headers, 'X-RateLimit-Reset')
+        reset_at = datetime.fromtimestamp(reset, timezone.utc).replace(tzinfo=None) if reset else None
+
+        blocked_until = None
+        if is_rate_limited(response):
+            retry_after = header_int(headers, 'Retry-After')
+            if retry_after is not None:
+                blocked_until = _utcnow() + timedelta(seconds=retry_after)
+            else:
+                blocked_until = reset_at
+        if remaining is None and blocked_until is None:
+            return
+
+        # The resource reported by GitHub wins over the one guessed from the URL
+        resource = headers.get('X-RateLimit-Resource') or rate_limit_resource(url)
+        key = f"{fingerprint}:{resource}"
+        floor = 0 if self.interactive else self.reserve
+        with self.lock:
+            written = self.written.get(key)
+            if (blocked_until is None and written and written[0] is not None and remaining is not None
+                    and written[1] == reset_at and written[0] - remaining < self.block
+                    and remaining > floor + self.block):
+                return
+            self.written[key] = (remaining, reset_at)
+        with self.registry.cursor() as cr:
+            cr.execute("""
+                INSERT INTO git_rate_limit (key, resource, rate_limit, remaining, reset_at, blocked_until, create_date, write_date)
+                VALUES (%s, %s, %s, %s, %s, %s, now() at time zone 'UTC', now() at time zone 'UTC')
+                ON CONFLICT (key) DO UPDATE
+                   SET rate_limit = COALESCE(EXCLUDED.rate_limit, git_rate_limit.rate_limit),
+                       remaining = COALESCE(EXCLUDED.remaining, git_rate_limit.remaining),
+                       reset_at = COALESCE(EXCLUDED.reset_at, git_rate_limit.reset_at),
+                       blocked_until = COALESCE(EXCLUDED.blocked_until, git_rate_limit.blocked_until),
+                       rejected_until = NULL,
+                       write_date = EXCLUDED.write_date
+            """, [key, resource, limit, remaining, reset_at, blocked_until])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from .github_client import header_int
+
+# Phases timed during a sync; `http` and `json` add up the time of every worker
+# thread, so they can exceed the wall-clock duration of a concurrent sync.
+PHASES = ('http', 'json', 'parse', 'db')
+
+
+class SyncMetrics:
+    """
+    Thread-safe counters of one sync: time spent per phase, GitHub requests and
+    bytes received, status codes, lowest rate limit headroom seen, and rows
+    inserted / updated / skipped. Attached to a client, it is fed by every
+    request the client makes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.phases = Counter()
+        self.status_codes = Counter()
+        self.rows = Counter()
+        self.requests = 0
+        self.bytes_received = 0
+        self.rate_limit_remaining = None
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[phase] += elapsed
+
+    def record_response(self, response, elapsed):
+        remaining = header_int(response.headers, 'X-RateLimit-Remaining')
+        size = header_int(response.headers, 'Content-Length') or 0
+        with self._lock:
+            self.phases['http'] += elapsed
+            self.requests += 1
+            self.bytes_received += size
+            self.status_codes[response.status_code] += 1
+            if remaining is not None and (self.rate_limit_remaining is None or remaining < self.rate_limit_remaining):
+                self.rate_limit_remaining = remaining
+
+    def count_rows(self, inserted=0, updated=0, skipped=0):
+        with self._lock:
+            self.rows['inserted'] += inserted
+            self.rows['updated'] += updated
+            self.rows['skipped'] += skipped
+
+    def duration(self):
+        return time.monotonic() - self.started
+
+
+class NullMetrics(SyncMetrics):
+    """
+    Metrics sink of clients used outside of an instrumented sync.
+    """
+
+    @contextmanager
+    def timer(self, phase):
+        yield
+
+    def record_response(self, response, elapsed):
+        pass
+
+    def count_rows(self, inserted=0, updated=0, skipped=0):
+        pass
+
+
+NULL_METRICS = NullMetrics()
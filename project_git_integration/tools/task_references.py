@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+# "#123" (not part of a word or of an owner/repo#123 cross-reference) and
+# "task-123" / "task_123" / "task 123"
+TASK_ID_REFERENCE = re.compile(r'(?:(?<![\w/])#|\btask[-_ ]?)(\d+)\b', re.IGNORECASE)
+
+# Pull request numbers GitHub writes into merge commits: "Merge pull request #12
+# from owner/branch" and the "Title (#12)" of squash merges
+GITHUB_PR_NUMBER = re.compile(r'^Merge pull request #\d+|\(#\d+\)$', re.IGNORECASE | re.MULTILINE)
+
+# Anything shaped like a branch name, e.g. "fix-login" in "Merge branch 'fix-login'"
+# or "owner/fix-login" in "Merge pull request #4 from owner/fix-login"
+BRANCH_TOKEN = re.compile(r'[\w./-]+')
+
+
+def branch_slug(name):
+    """
+    Returns the branch name derived from a task name when creating its branch:
+    alphanumerics, hyphens and underscores only, lowercased, at most 100 chars.
+    """
+    slug = "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in name or '')
+    while '--' in slug:
+        slug = slug.replace('--', '-')
+    return slug.strip('-').lower()[:100]
+
+
+class TaskReferenceMatcher:
+    """
+    Finds the tasks a commit message refers to, by id (`#123`, `task-123`) or by
+    branch name (the task's dev branch, or the slug its branch would be created
+    with); the pull request numbers of GitHub's merge commits are not task ids.
+    Matching tokenizes the message once and looks every token up in a
+    dict, so its cost does not depend on the number of tasks. Single-word branch
+    names are ignored, as they would match ordinary words.
+    """
+
+    def __init__(self, tasks):
+        """
+        `tasks` is an iterable of (task id, task name, dev branch, creation date)
+        tuples.
+        """
+        self.created = {}
+        self.branches = {}
+        for task_id, name, dev_branch, created in tasks:
+            self.created[task_id] = created
+            for branch in {branch_slug(name), (dev_branch or '').lower()}:
+                if '-' in branch or '_' in branch or '/' in branch:
+                    self.branches.setdefault(branch, set()).add(task_id)
+        # Commits older than every task cannot refer to one
+        self.oldest = min(self.created.values(), default=None)
+
+    def match(self, message, date=None):
+        """
+        Returns the ids of the tasks referenced by the message, leaving out the
+        tasks created after `date` when given.
+        """
+        if not message:
+            return set()
+        found = {
+            int(task_id) for task_id in TASK_ID_REFERENCE.findall(GITHUB_PR_NUMBER.sub('', message))
+            if int(task_id) in self.created
+        }
+        if self.branches:
+            for token in BRANCH_TOKEN.findall(message.lower()):
+                # "owner/feat/x" may name the branch "feat/x"
+                parts = token.strip('./-').split('/')
+                for start in range(len(parts)):
+                    found.update(self.branches.get('/'.join(parts[start:]), ()))
+        if date:
+            found = {task_id for task_id in found if self.created[task_id] <= date}
+        return found